@@ -4,7 +4,7 @@ Main API router that combines all endpoint routers.
 
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import auth, videos, clips, splices, exports
+from app.api.v1.endpoints import auth, videos, clips, splices, exports, media
 
 api_router = APIRouter()
 
@@ -14,3 +14,4 @@ api_router.include_router(videos.router, prefix="/videos", tags=["Videos"])
 api_router.include_router(clips.router, prefix="/clips", tags=["Clips"])
 api_router.include_router(splices.router, prefix="/splices", tags=["Splices"])
 api_router.include_router(exports.router, prefix="/exports", tags=["Exports"])
+api_router.include_router(media.router, prefix="/media", tags=["Media"])
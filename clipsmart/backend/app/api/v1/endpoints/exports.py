@@ -8,11 +8,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc
 
 from app.core.database import get_db
-from app.core.security import get_current_user
+from app.core.security import get_current_user, sign_media_url
 from app.models.user import User
 from app.models.export import Export, ExportPlatform
-from app.schemas.export import ExportCreate, ExportResponse
+from app.schemas.export import ExportCreate, ExportBatchCreate, ExportResponse
+from app.schemas.progress import JobProgressResponse
 from app.services.export_service import ExportService
+from app.services.progress import get_progress
 
 router = APIRouter()
 export_service = ExportService()
@@ -43,6 +45,27 @@ async def create_export(
     return export
 
 
+@router.post("/batch", response_model=List[ExportResponse], status_code=status.HTTP_201_CREATED)
+async def create_exports(
+    export_data: ExportBatchCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Export a splice to several platforms, decoding it only once.
+    """
+    exports = await export_service.create_exports(
+        db=db,
+        user_id=current_user.id,
+        splice_id=export_data.splice_id,
+        targets=[target.model_dump() for target in export_data.targets],
+        watermark=export_data.watermark,
+        settings_dict=export_data.settings
+    )
+
+    return exports
+
+
 @router.get("/", response_model=List[ExportResponse])
 async def list_exports(
     splice_id: Optional[str] = None,
@@ -93,6 +116,43 @@ async def get_export(
     return export
 
 
+@router.get("/{export_id}/progress", response_model=JobProgressResponse)
+async def get_export_progress(
+    export_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get live encode progress for an export.
+    """
+    result = await db.execute(
+        select(Export.id, Export.status, Export.progress, Export.eta_seconds, Export.encode_speed).where(
+            Export.id == export_id,
+            Export.user_id == current_user.id
+        )
+    )
+    row = result.one_or_none()
+
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export not found"
+        )
+
+    live = await get_progress("export", export_id) or {}
+
+    return JobProgressResponse(
+        id=row.id,
+        status=row.status.value,
+        percent=live.get("percent", row.progress),
+        eta=live.get("eta", row.eta_seconds),
+        fps=live.get("fps"),
+        speed=live.get("speed", row.encode_speed),
+        out_time=live.get("out_time"),
+        updated_at=live.get("updated_at"),
+    )
+
+
 @router.get("/{export_id}/download")
 async def download_export(
     export_id: str,
@@ -108,6 +168,10 @@ async def download_export(
         user_id=current_user.id
     )
 
+    if download_url:
+        # Signed so a plain link can fetch it, as an attachment
+        download_url = sign_media_url(f"{download_url}?download=true")
+
     return {
         "download_url": download_url
     }
@@ -0,0 +1,287 @@
+"""
+Media endpoints: range-aware streaming of videos, thumbnails, splices, exports
+and their HLS/DASH previews, plus byte-range playlists of virtual clips.
+"""
+
+import os
+from datetime import datetime
+from typing import Literal, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.core.database import get_db
+from app.core.security import create_media_token, get_media_user
+from app.core.exceptions import ProcessingError, ResourceNotFoundError
+from app.models.user import User
+from app.models.video import Video
+from app.models.clip import Clip
+from app.models.splice import Splice
+from app.models.export import Export, ExportStatus
+from app.services.media_streaming import HLS_PLAYLIST_TYPE, MANIFEST_CACHE_CONTROL, MediaStreamer
+from app.services.stream_packager import StreamPackager
+from app.services.thumbnail_service import ThumbnailService
+from app.services.virtual_clips import VirtualClipService
+
+router = APIRouter()
+media_streamer = MediaStreamer()
+virtual_clip_service = VirtualClipService()
+
+
+def _serve(request: Request, path: Optional[str], filename: Optional[str] = None, attachment: bool = False) -> Response:
+    """Stream a file, mapping missing media to 404."""
+    try:
+        return media_streamer.response(request, path, filename=filename, attachment=attachment)
+    except ResourceNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=e.detail
+        )
+
+
+def _serve_signed(request: Request, path: str, index_extensions: Tuple[str, ...]) -> Response:
+    """
+    Serve a file, passing a signed URL's token on to the URIs inside a
+    playlist, manifest or sprite index so the player's follow-up requests
+    work too.
+    """
+    token = request.query_params.get("token")
+    if not token or not path.endswith(index_extensions):
+        return _serve(request, path)
+
+    try:
+        return media_streamer.rewritten_response(path, {"token": token})
+    except ResourceNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=e.detail
+        )
+
+
+def _serve_package_file(request: Request, output_dir: str, version: str, filename: str) -> Response:
+    """Serve a file of a streaming package version."""
+    if os.path.basename(version) != version or os.path.basename(filename) != filename:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Stream file not found"
+        )
+
+    return _serve_signed(request, os.path.join(output_dir, version, filename), (".m3u8", ".mpd"))
+
+
+async def _get_video(db: AsyncSession, video_id: str, user: Optional[User]) -> Video:
+    query = select(Video).where(Video.id == video_id)
+    if user is not None:
+        # Signed URLs are already scoped to this video
+        query = query.where(Video.user_id == user.id)
+    result = await db.execute(query)
+    video = result.scalar_one_or_none()
+
+    if not video:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Video not found"
+        )
+
+    return video
+
+
+@router.api_route("/videos/{video_id}", methods=["GET", "HEAD"])
+async def stream_video(
+    video_id: str,
+    request: Request,
+    rendition: Literal["source", "mezzanine", "proxy"] = "source",
+    current_user: Optional[User] = Depends(get_media_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Stream a video's upload or one of its ingest renditions.
+    """
+    video = await _get_video(db, video_id, current_user)
+
+    paths = {
+        "source": video.file_path,
+        "mezzanine": video.edit_source_path,
+        "proxy": video.analysis_source_path,
+    }
+    filename = video.filename if rendition == "source" else None
+
+    return _serve(request, paths[rendition], filename=filename)
+
+
+@router.api_route("/videos/{video_id}/thumbnails/{filename}", methods=["GET", "HEAD"])
+async def get_thumbnail(
+    video_id: str,
+    filename: str,
+    request: Request,
+    current_user: Optional[User] = Depends(get_media_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Serve a poster, sprite sheet or sprite VTT of a video.
+    """
+    await _get_video(db, video_id, current_user)
+
+    if os.path.basename(filename) != filename:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Thumbnail not found"
+        )
+
+    return _serve_signed(request, os.path.join(ThumbnailService.output_dir(video_id), filename), (".vtt",))
+
+
+@router.api_route("/videos/{video_id}/stream/{version}/{filename}", methods=["GET", "HEAD"])
+async def get_video_stream_file(
+    video_id: str,
+    version: str,
+    filename: str,
+    request: Request,
+    current_user: Optional[User] = Depends(get_media_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Serve a playlist, manifest or segment of a video's streaming preview.
+    """
+    video = await _get_video(db, video_id, current_user)
+
+    return _serve_package_file(request, StreamPackager.output_dir(video.file_path), version, filename)
+
+
+@router.get("/clips/{clip_id}/playlist.m3u8")
+async def get_clip_playlist(
+    clip_id: str,
+    request: Request,
+    rendition: Literal["proxy", "mezzanine"] = "proxy",
+    current_user: Optional[User] = Depends(get_media_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Play a clip without extracting it: a byte-range HLS playlist into the
+    parent video's fragmented rendition.
+    """
+    query = select(Clip, Video).join(Video, Clip.video_id == Video.id).where(Clip.id == clip_id)
+    if current_user is not None:
+        query = query.where(Video.user_id == current_user.id)
+    result = await db.execute(query)
+    row = result.one_or_none()
+
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Clip not found"
+        )
+
+    clip, video = row
+    query = None
+    if request.query_params.get("token"):
+        # Segments live under the parent video, outside this clip's scope
+        query = {"token": create_media_token(f"videos/{video.id}")}
+    try:
+        playlist = virtual_clip_service.playlist(
+            video,
+            clip.start_time,
+            clip.end_time,
+            rendition=rendition,
+            query=query
+        )
+    except ResourceNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=e.detail
+        )
+    except ProcessingError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=e.detail
+        )
+
+    return Response(
+        playlist,
+        media_type=HLS_PLAYLIST_TYPE,
+        headers={"cache-control": MANIFEST_CACHE_CONTROL}
+    )
+
+
+async def _get_splice_path(db: AsyncSession, splice_id: str, user: Optional[User]) -> Optional[str]:
+    query = select(Splice.file_path).where(Splice.id == splice_id)
+    if user is not None:
+        query = query.where(Splice.user_id == user.id)
+    result = await db.execute(query)
+    row = result.one_or_none()
+
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Splice not found"
+        )
+
+    return row.file_path
+
+
+@router.api_route("/splices/{splice_id}", methods=["GET", "HEAD"])
+async def stream_splice(
+    splice_id: str,
+    request: Request,
+    current_user: Optional[User] = Depends(get_media_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Stream a splice's rendered video.
+    """
+    return _serve(request, await _get_splice_path(db, splice_id, current_user))
+
+
+@router.api_route("/splices/{splice_id}/stream/{version}/{filename}", methods=["GET", "HEAD"])
+async def get_splice_stream_file(
+    splice_id: str,
+    version: str,
+    filename: str,
+    request: Request,
+    current_user: Optional[User] = Depends(get_media_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Serve a playlist, manifest or segment of a splice's streaming preview.
+    """
+    file_path = await _get_splice_path(db, splice_id, current_user)
+    if not file_path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Splice has not been rendered"
+        )
+
+    return _serve_package_file(request, StreamPackager.output_dir(file_path), version, filename)
+
+
+@router.api_route("/exports/{export_id}", methods=["GET", "HEAD"])
+async def stream_export(
+    export_id: str,
+    request: Request,
+    download: bool = False,
+    current_user: Optional[User] = Depends(get_media_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Stream a finished export, or download it with ?download=true.
+    """
+    query = select(Export).where(Export.id == export_id)
+    if current_user is not None:
+        query = query.where(Export.user_id == current_user.id)
+    result = await db.execute(query)
+    export = result.scalar_one_or_none()
+
+    if not export or export.status != ExportStatus.COMPLETED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export not found"
+        )
+
+    if export.expires_at and datetime.utcnow() > export.expires_at:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Export download link has expired"
+        )
+
+    return _serve(request, export.file_path, attachment=download)
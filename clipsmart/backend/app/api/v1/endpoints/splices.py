@@ -12,7 +12,10 @@ from app.core.security import get_current_user
 from app.models.user import User
 from app.models.splice import Splice, SpliceMode
 from app.schemas.splice import SpliceCreate, SpliceResponse, SpliceUpdate, SpliceGenerateRequest
+from app.schemas.progress import JobProgressResponse
 from app.services.splice_generator import SpliceGeneratorService
+from app.services.stream_packager import StreamPackager
+from app.services.progress import get_progress
 
 router = APIRouter()
 splice_service = SpliceGeneratorService()
@@ -164,6 +167,43 @@ async def get_splice(
     return splice
 
 
+@router.get("/{splice_id}/progress", response_model=JobProgressResponse)
+async def get_splice_progress(
+    splice_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get live render progress for a splice.
+    """
+    result = await db.execute(
+        select(Splice.id, Splice.status, Splice.progress, Splice.eta_seconds, Splice.encode_speed).where(
+            Splice.id == splice_id,
+            Splice.user_id == current_user.id
+        )
+    )
+    row = result.one_or_none()
+
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Splice not found"
+        )
+
+    live = await get_progress("splice", splice_id) or {}
+
+    return JobProgressResponse(
+        id=row.id,
+        status=row.status.value,
+        percent=live.get("percent", row.progress),
+        eta=live.get("eta", row.eta_seconds),
+        fps=live.get("fps"),
+        speed=live.get("speed", row.encode_speed),
+        out_time=live.get("out_time"),
+        updated_at=live.get("updated_at"),
+    )
+
+
 @router.patch("/{splice_id}", response_model=SpliceResponse)
 async def update_splice(
     splice_id: str,
@@ -210,6 +250,7 @@ async def delete_splice(
     Delete a splice.
     """
     import os
+    import shutil
 
     result = await db.execute(
         select(Splice).where(
@@ -225,9 +266,11 @@ async def delete_splice(
             detail="Splice not found"
         )
 
-    # Delete file
+    # Delete file and its streaming preview
     if splice.file_path and os.path.exists(splice.file_path):
         os.remove(splice.file_path)
+    if splice.file_path:
+        shutil.rmtree(StreamPackager.output_dir(splice.file_path), ignore_errors=True)
 
     await db.delete(splice)
     await db.commit()
@@ -18,7 +18,12 @@ from app.models.video import Video, VideoStatus, VideoSource
 from app.models.clip import Clip
 from app.schemas.video import VideoCreate, VideoResponse, VideoUpdate, VideoAnalysisResponse
 from app.services.video_processor import VideoProcessorService
+from app.services.keyframe_index import KeyframeIndex
+from app.services.audio_cache import AudioCache
 from app.services.minimax import MinimaxService
+from app.services.thumbnail_service import ThumbnailService
+from app.services.stream_packager import StreamPackager
+from app.tasks.video_tasks import process_video_task, analyze_video_task
 from app.core.config import get_settings
 
 settings = get_settings()
@@ -100,7 +105,8 @@ async def upload_video(
             height=metadata['height'],
             fps=metadata['fps'],
             codec=metadata['codec'],
-            status=VideoStatus.UPLOADED,
+            # Ingest marks it UPLOADED once renditions and indexes exist
+            status=VideoStatus.UPLOADING,
         )
 
         db.add(video)
@@ -111,6 +117,9 @@ async def upload_video(
         await db.commit()
         await db.refresh(video)
 
+        # Create mezzanine/proxy, keyframe index and thumbnail in the background
+        process_video_task.delay(video.id)
+
         return video
 
     except ProcessingError as e:
@@ -230,23 +239,29 @@ async def delete_video(
             detail="Video not found"
         )
 
-    # Delete file
-    if os.path.exists(video.file_path):
-        os.remove(video.file_path)
+    # Delete files and their sidecars
+    for media_path in (video.file_path, video.mezzanine_path, video.proxy_path):
+        if not media_path:
+            continue
+        for path in (media_path, KeyframeIndex.path_for(media_path), AudioCache.path_for(media_path)):
+            if os.path.exists(path):
+                os.remove(path)
+    shutil.rmtree(ThumbnailService.output_dir(video.id), ignore_errors=True)
+    shutil.rmtree(StreamPackager.output_dir(video.file_path), ignore_errors=True)
 
     # Delete from database (cascades to clips)
     await db.delete(video)
     await db.commit()
 
 
-@router.post("/{video_id}/analyze", response_model=VideoAnalysisResponse)
+@router.post("/{video_id}/analyze", response_model=VideoAnalysisResponse, status_code=status.HTTP_202_ACCEPTED)
 async def analyze_video(
     video_id: str,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Analyze video with AI and extract clips.
+    Start AI analysis and clip extraction; poll the video for its status.
     """
     result = await db.execute(
         select(Video).where(
@@ -262,67 +277,29 @@ async def analyze_video(
             detail="Video not found"
         )
 
-    try:
-        # Update status
-        video.status = VideoStatus.ANALYZING
-        await db.commit()
-
-        # Analyze with MiniMax
-        analysis_result = await minimax_service.analyze_video(
-            video_path=video.file_path
+    if video.status == VideoStatus.ANALYZING:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Video is already being analyzed"
         )
 
-        # Extract clips
-        clips_data = await minimax_service.extract_clips(
-            video_path=video.file_path,
-            analysis_result=analysis_result,
-            sensitivity=settings.CLIP_SENSITIVITY_DEFAULT,
-            min_duration=settings.MIN_CLIP_DURATION,
-            max_duration=settings.MAX_CLIP_DURATION,
-            max_clips=settings.MAX_CLIPS_PER_VIDEO
+    # Analysis reads the proxy, keyframe index and decoded audio built at ingest
+    if video.status == VideoStatus.UPLOADING:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Video is still being processed"
         )
 
-        # Save clips to database
-        for clip_data in clips_data:
-            clip = Clip(
-                video_id=video.id,
-                start_time=clip_data['start_time'],
-                end_time=clip_data['end_time'],
-                duration=clip_data['end_time'] - clip_data['start_time'],
-                attention_score=clip_data.get('attention_score'),
-                engagement_score=clip_data.get('engagement_score'),
-                virality_score=clip_data.get('virality_score'),
-                keywords=clip_data.get('keywords'),
-                entities=clip_data.get('entities'),
-                sentiment=clip_data.get('sentiment'),
-                caption=clip_data.get('caption'),
-            )
-            db.add(clip)
-
-        # Update video
-        video.analysis_result = analysis_result
-        video.transcript = analysis_result.get('transcript')
-        video.audio_analysis = analysis_result.get('audio_analysis')
-        video.status = VideoStatus.ANALYZED
-        video.analyzed_at = datetime.utcnow()
-
-        await db.commit()
-
-        return VideoAnalysisResponse(
-            video_id=video.id,
-            analysis_result=video.analysis_result,
-            transcript=video.transcript,
-            audio_analysis=video.audio_analysis,
-            clips_extracted=len(clips_data),
-            status=video.status.value
-        )
+    # Decoding the whole video for local analysis takes minutes on long
+    # uploads, so it runs in the worker like ingest processing
+    video.status = VideoStatus.ANALYZING
+    video.processing_error = None
+    await db.commit()
 
-    except Exception as e:
-        video.status = VideoStatus.FAILED
-        video.processing_error = str(e)
-        await db.commit()
+    analyze_video_task.delay(video.id)
 
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail=f"Analysis failed: {str(e)}"
-        )
+    return VideoAnalysisResponse(
+        video_id=video.id,
+        clips_extracted=0,
+        status=video.status.value
+    )
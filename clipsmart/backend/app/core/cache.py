@@ -0,0 +1,35 @@
+"""
+Redis client management for caching and job status.
+"""
+
+import asyncio
+import weakref
+
+import redis.asyncio as aioredis
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# Redis connections are bound to the event loop that opened them; Celery tasks
+# run each job in a fresh loop, so keep one client per loop.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_redis() -> aioredis.Redis:
+    """
+    Get the Redis client for the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = aioredis.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_timeout=2,
+            socket_connect_timeout=2,
+        )
+        _clients[loop] = client
+    return client
@@ -3,7 +3,7 @@ Configuration settings for ClipSmart backend application.
 """
 
 import os
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
@@ -74,11 +74,89 @@ class Settings(BaseSettings):
     
     # Video Processing
     FFMPPEG_PATH: str = Field(default="ffmpeg", description="FFmpeg executable path")
+    FFPROBE_PATH: str = Field(default="ffprobe", description="FFprobe executable path")
+    FFMPEG_MAX_CONCURRENCY: int = Field(default=2, description="Maximum concurrent FFmpeg processes per event loop")
+    FFMPEG_TIMEOUT: int = Field(default=25 * 60, description="FFmpeg process timeout in seconds")
+    FFPROBE_TIMEOUT: int = Field(default=60, description="FFprobe process timeout in seconds")
+    FFPROBE_PROBESIZE: int = Field(default=5 * 1024 * 1024, description="FFprobe -probesize limit in bytes")
+    FFPROBE_ANALYZEDURATION: int = Field(default=5_000_000, description="FFprobe -analyzeduration limit in microseconds")
     VIDEO_RESOLUTIONS: List[str] = Field(
         default=["720x1280", "1080x1920"],
         description="Supported video resolutions"
     )
     DEFAULT_FPS: int = Field(default=30, description="Default frame rate")
+    SMART_CUT_ENABLED: bool = Field(default=True, description="Stream-copy whole GOPs when extracting clips")
+    SMART_CUT_MIN_COPY_SECONDS: float = Field(
+        default=1.0,
+        description="Minimum stream-copyable span for a smart cut to be worth it"
+    )
+    SPLICE_SINGLE_PASS_RENDER: bool = Field(
+        default=True,
+        description="Render splices in one FFmpeg pass from source videos instead of extracting clips first"
+    )
+    LAYOUT_FILL_COLOR: str = Field(default="black", description="Background colour for uncovered and letterboxed layout areas")
+    LAYOUT_AUDIO_WEIGHTS: Dict[str, List[float]] = Field(
+        default={"split_screen": [1.0, 0.5], "pip": [1.0, 0.3], "spotlight": [1.0, 0.4]},
+        description="Audio mix weight per clip position for each layout; later clips reuse the last weight"
+    )
+    LOUDNESS_NORMALIZATION_ENABLED: bool = Field(default=True, description="Normalize clip and export loudness from cached measurements")
+    LOUDNESS_TARGET_LUFS: float = Field(default=-14.0, description="Target integrated loudness in LUFS")
+    LOUDNESS_TRUE_PEAK_CEILING: float = Field(default=-1.0, description="Maximum true peak after normalization in dBTP")
+    FRAGMENTED_MP4_ENABLED: bool = Field(
+        default=False,
+        description="Write renders and exports as fragmented MP4 (CMAF) instead of fast-start MP4"
+    )
+    FRAGMENT_DURATION_SECONDS: float = Field(default=2.0, description="Fragment (and forced keyframe) interval of fragmented MP4 outputs")
+    HLS_PACKAGING_ENABLED: bool = Field(default=False, description="Package renders and ingest renditions into HLS previews by stream copy")
+    DASH_PACKAGING_ENABLED: bool = Field(default=False, description="Also write a DASH manifest over the same preview segments")
+    HLS_SEGMENT_SECONDS: float = Field(default=2.0, description="Target preview segment length (and forced render keyframe interval) in seconds")
+    INGEST_RENDITIONS_ENABLED: bool = Field(
+        default=True,
+        description="Create a normalized mezzanine and a low-res proxy for every upload"
+    )
+    MEZZANINE_GOP_SECONDS: float = Field(default=1.0, description="Fixed keyframe interval of the mezzanine in seconds")
+    MEZZANINE_CRF: int = Field(default=18, description="x264 CRF for the mezzanine")
+    MEZZANINE_PRESET: str = Field(default="veryfast", description="x264 preset for the mezzanine")
+    MEZZANINE_MAX_FPS: float = Field(default=60.0, description="Frame rate cap for the mezzanine")
+    PROXY_HEIGHT: int = Field(default=360, description="Short-side size of the analysis proxy in pixels")
+    PROXY_CRF: int = Field(default=28, description="x264 CRF for the analysis proxy")
+    VIRTUAL_CLIPS_ENABLED: bool = Field(
+        default=False,
+        description="Write ingest renditions as fragmented MP4 so clips preview as byte-range HLS without encoding"
+    )
+    THUMBNAIL_DIR: str = Field(default="/tmp/clipsmart/thumbnails", description="Thumbnail output directory")
+    THUMBNAIL_FORMAT: str = Field(default="jpeg", description="Thumbnail image format (jpeg or webp)")
+    THUMBNAIL_POSTER_SIZES: List[int] = Field(
+        default=[160, 320, 640],
+        description="Long-side sizes of the video poster in pixels"
+    )
+    THUMBNAIL_CLIP_SIZE: int = Field(default=320, description="Long-side size of clip thumbnails in pixels")
+    SPRITE_INTERVAL: float = Field(default=2.0, description="Seconds between scrub sprite tiles")
+    SPRITE_MAX_TILES: int = Field(default=1000, description="Maximum sprite tiles per video; the interval grows to fit")
+    SPRITE_TILE_WIDTH: int = Field(default=160, description="Scrub sprite tile width in pixels")
+    SPRITE_COLUMNS: int = Field(default=10, description="Tiles per row in a sprite sheet")
+    SPRITE_ROWS: int = Field(default=10, description="Tile rows per sprite sheet")
+    FRAME_SAMPLER_MAX_SIDE: int = Field(default=256, description="Long-side size of frames decoded for local analysis")
+    FRAME_SAMPLER_BATCH_SIZE: int = Field(default=64, description="Frames per batch yielded by the frame sampler")
+    AUDIO_ANALYSIS_SAMPLE_RATE: int = Field(default=22050, description="Sample rate of the decoded mono audio used for analysis")
+    DISTRIBUTED_ENCODE_ENABLED: bool = Field(
+        default=False,
+        description="Split long encodes into keyframe-aligned segments encoded by parallel Celery tasks"
+    )
+    DISTRIBUTED_ENCODE_MIN_SECONDS: float = Field(
+        default=180.0,
+        description="Minimum output duration before an encode is distributed"
+    )
+    DISTRIBUTED_SEGMENT_SECONDS: float = Field(default=30.0, description="Target segment length for distributed encodes")
+    SEGMENT_DIR: str = Field(
+        default="/tmp/clipsmart/segments",
+        description="Scratch directory for distributed encode segments (must be shared by all workers)"
+    )
+    
+    # Job progress
+    PROGRESS_PUBLISH_INTERVAL: float = Field(default=1.0, description="Minimum seconds between progress publishes to Redis")
+    PROGRESS_PERSIST_INTERVAL: float = Field(default=15.0, description="Minimum seconds between progress writes to the database")
+    PROGRESS_TTL: int = Field(default=24 * 3600, description="Redis progress entry TTL in seconds")
     
     # Celery
     CELERY_BROKER_URL: str = Field(default="redis://localhost:6379/0", description="Celery broker URL")
@@ -103,6 +181,17 @@ class Settings(BaseSettings):
     
     # Static Files
     STATIC_FILES_DISABLED: bool = Field(default=False, description="Disable static file serving")
+    MEDIA_OFFLOAD: str = Field(
+        default="",
+        description="Let a front proxy send media bytes: '' (stream from the app), 'x-accel' (nginx) or 'x-sendfile'"
+    )
+    MEDIA_ACCEL_LOCATIONS: Dict[str, str] = Field(
+        default={},
+        description="Media directory -> internal nginx location used for X-Accel-Redirect"
+    )
+    MEDIA_CHUNK_SIZE: int = Field(default=256 * 1024, description="Bytes read per chunk when streaming media from the app")
+    MEDIA_CACHE_MAX_AGE: int = Field(default=3600, description="Cache-Control max-age of media responses in seconds")
+    MEDIA_TOKEN_EXPIRE_MINUTES: int = Field(default=60, description="Lifetime of the resource-scoped tokens in signed media URLs")
     
     # AI Processing
     MINIMAX_ANALYSIS_TIMEOUT: int = Field(default=30, description="MiniMax analysis timeout in seconds")
@@ -110,10 +199,33 @@ class Settings(BaseSettings):
     MAX_CLIPS_PER_VIDEO: int = Field(default=50, description="Maximum clips per video")
     MIN_CLIP_DURATION: float = Field(default=3.0, description="Minimum clip duration in seconds")
     MAX_CLIP_DURATION: float = Field(default=30.0, description="Maximum clip duration in seconds")
+    SCENE_DETECTION_ENABLED: bool = Field(default=True, description="Detect shot boundaries locally before AI clip extraction")
+    SCENE_SAMPLE_FPS: float = Field(default=10.0, description="Frames per second sampled for scene detection")
+    SCENE_CUT_THRESHOLD: float = Field(default=0.3, description="Minimum frame difference (0-1) for a scene cut")
+    SCENE_MIN_SHOT_SECONDS: float = Field(default=1.0, description="Minimum spacing between scene cuts in seconds")
+    SCENE_SNAP_TOLERANCE: float = Field(default=1.0, description="Maximum seconds a clip edge moves to snap onto a cut")
+    AUDIO_ANALYSIS_ENABLED: bool = Field(default=True, description="Analyze loudness, peaks and speech/music activity locally")
+    BOUNDARY_REFINEMENT_ENABLED: bool = Field(default=True, description="Trim silent black or frozen stretches off clip edges")
+    SILENCE_THRESHOLD_DB: float = Field(default=-45.0, description="Audio level in dBFS below which a clip edge counts as silent")
+    BLACK_LUMA_THRESHOLD: float = Field(default=0.1, description="Luma level (0-1) below which a pixel counts as black")
+    DEAD_CLIP_MAX_RATIO: float = Field(default=0.6, description="Clips with a larger share of silent black or frozen frames are dropped")
+    VISUAL_FEATURES_ENABLED: bool = Field(default=True, description="Score motion, brightness and contrast locally for clip ranking")
+    VISUAL_FACE_DETECTION_ENABLED: bool = Field(default=True, description="Detect faces (OpenCV) once per second for visual scoring")
+    REFRAME_ENABLED: bool = Field(default=True, description="Crop clips to their layout cell along a face/motion track instead of letterboxing")
+    REFRAME_SAMPLE_FPS: float = Field(default=5.0, description="Frames per second sampled for reframing crop tracks")
+    REFRAME_SMOOTHING_SECONDS: float = Field(default=1.0, description="Smoothing window of reframing crop tracks in seconds")
+    BEAT_SYNC_ENABLED: bool = Field(default=True, description="Track beats locally and snap splice clip edges to them")
+    BEAT_MIN_CONFIDENCE: float = Field(default=0.3, description="Minimum beat grid periodicity (0-1) before clip edges are snapped to it")
+    BEAT_SNAP_TOLERANCE: float = Field(default=0.3, description="Maximum seconds a clip edge moves to land on a beat")
     
     # Performance
     CACHE_TTL: int = Field(default=3600, description="Cache TTL in seconds")
     ENABLE_CACHING: bool = Field(default=True, description="Enable response caching")
+    PROBE_CACHE_SIZE: int = Field(default=1024, description="In-process probe cache entries")
+    PROBE_CACHE_TTL: int = Field(default=7 * 24 * 3600, description="Redis probe cache TTL in seconds")
+    CLIP_CACHE_ENABLED: bool = Field(default=True, description="Reuse previously extracted clip renditions")
+    CLIP_CACHE_DIR: str = Field(default="/tmp/clipsmart/clip_cache", description="Clip render cache directory")
+    CLIP_CACHE_MAX_BYTES: int = Field(default=20 * 1024 ** 3, description="Clip render cache size budget in bytes")
     
     # Monitoring
     SENTRY_DSN: str = Field(default="", description="Sentry DSN for error tracking")
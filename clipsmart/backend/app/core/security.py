@@ -4,9 +4,10 @@ Security utilities for authentication and authorization.
 
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
+from urllib.parse import urlencode, urlsplit
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -22,6 +23,13 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # HTTP Bearer token
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+# "typ" claim of tokens that only grant access to one media resource
+MEDIA_TOKEN_TYPE = "media"
+
+# URL prefix of the media endpoint (see app.api.v1.endpoints.media)
+MEDIA_URL_PREFIX = "/api/v1/media"
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -75,16 +83,69 @@ def decode_access_token(token: str) -> Dict[str, Any]:
         raise AuthenticationError(f"Invalid token: {str(e)}")
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
-):
+def create_media_token(scope: str, expires_delta: Optional[timedelta] = None) -> str:
     """
-    Dependency to get the current authenticated user.
+    Create a short-lived token granting read access to one media resource.
+
+    Signed media URLs carry it as ?token= because <video> and <img> cannot
+    send headers. It names no user and is useless outside its scope, so
+    unlike the session token it is harmless in logs and Referer headers.
+
+    Args:
+        scope: Resource the token is valid for, e.g. "videos/<id>"
+        expires_delta: Lifetime (default: MEDIA_TOKEN_EXPIRE_MINUTES)
     """
-    from app.models.user import User
+    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.MEDIA_TOKEN_EXPIRE_MINUTES))
+
+    return jwt.encode(
+        {"typ": MEDIA_TOKEN_TYPE, "scope": scope, "exp": expire},
+        settings.SECRET_KEY,
+        algorithm=settings.ALGORITHM
+    )
 
-    token = credentials.credentials
+
+def media_scope(url: str) -> Optional[str]:
+    """
+    Resource a media URL belongs to, e.g. "videos/<id>" for a video, its
+    renditions, thumbnails and streaming package. Media tokens are scoped
+    to it.
+    """
+    _, prefix, rest = urlsplit(url).path.partition(f"{MEDIA_URL_PREFIX}/")
+    parts = rest.split("/")
+    if not prefix or len(parts) < 2 or not all(parts[:2]):
+        return None
+    return "/".join(parts[:2])
+
+
+def sign_media_url(url: Optional[str]) -> Optional[str]:
+    """
+    Append a media token scoped to the URL's resource, so the URL works
+    in <video> and <img> without an Authorization header.
+
+    URLs outside the media endpoint are returned unchanged.
+    """
+    scope = media_scope(url) if url else None
+    if scope is None:
+        return url
+    return f"{url}{'&' if '?' in url else '?'}{urlencode({'token': create_media_token(scope)})}"
+
+
+def sign_media_urls(value: Any) -> Any:
+    """sign_media_url() every media URL in a JSON-like value."""
+    if isinstance(value, str):
+        return sign_media_url(value)
+    if isinstance(value, dict):
+        return {key: sign_media_urls(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [sign_media_urls(item) for item in value]
+    return value
+
+
+async def _user_for_token(token: str, db: AsyncSession):
+    """
+    Resolve a bearer token to an active user.
+    """
+    from app.models.user import User
 
     try:
         payload = decode_access_token(token)
@@ -122,6 +183,59 @@ async def get_current_user(
     return user
 
 
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Dependency to get the current authenticated user.
+    """
+    return await _user_for_token(credentials.credentials, db)
+
+
+async def get_media_user(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    token: Optional[str] = Query(None, description="Media token of a signed media URL"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Dependency authorizing a media request by bearer header or signed URL.
+
+    Media elements (<video>, <img>) cannot set an Authorization header, so
+    they use URLs signed with a media token (see create_media_token()).
+    Session tokens are not accepted in the query string.
+
+    Returns:
+        The current user for bearer requests, or None when a media token
+        scoped to the requested resource authorized the request
+    """
+    if credentials is not None:
+        return await _user_for_token(credentials.credentials, db)
+
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    try:
+        payload = decode_access_token(token)
+    except AuthenticationError:
+        payload = {}
+
+    scope = media_scope(request.url.path)
+    if payload.get("typ") != MEDIA_TOKEN_TYPE or scope is None or payload.get("scope") != scope:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired media token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return None
+
+
 async def get_current_active_user(
     current_user = Depends(get_current_user)
 ):
@@ -0,0 +1,11 @@
+"""
+Database models for ClipSmart.
+"""
+
+from app.models.user import User
+from app.models.video import Video
+from app.models.clip import Clip
+from app.models.splice import Splice
+from app.models.export import Export
+
+__all__ = ["User", "Video", "Clip", "Splice", "Export"]
@@ -28,8 +28,10 @@ from app.schemas.splice import (
 )
 from app.schemas.export import (
     ExportCreate,
+    ExportBatchCreate,
     ExportResponse,
 )
+from app.schemas.progress import JobProgressResponse
 
 __all__ = [
     "UserCreate",
@@ -49,5 +51,7 @@ __all__ = [
     "SpliceResponse",
     "SpliceUpdate",
     "ExportCreate",
+    "ExportBatchCreate",
     "ExportResponse",
+    "JobProgressResponse",
 ]
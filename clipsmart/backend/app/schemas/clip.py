@@ -4,7 +4,9 @@ Clip schemas for API validation.
 
 from datetime import datetime
 from typing import Optional, Dict, Any, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_serializer
+
+from app.core.security import sign_media_url
 
 
 class ClipBase(BaseModel):
@@ -36,12 +38,21 @@ class ClipResponse(ClipBase):
     attention_score: Optional[float] = None
     engagement_score: Optional[float] = None
     virality_score: Optional[float] = None
+    audio_energy_score: Optional[float] = None
+    visual_score: Optional[float] = None
+    visual_features: Optional[Dict[str, float]] = None
     keywords: Optional[List[str]] = None
     entities: Optional[Dict[str, Any]] = None
     sentiment: Optional[str] = None
     caption: Optional[str] = None
     thumbnail_url: Optional[str] = None
+    preview_url: Optional[str] = None
     created_at: datetime
 
+    @field_serializer("thumbnail_url", "preview_url")
+    def sign_url(self, url: Optional[str]) -> Optional[str]:
+        """Media URLs carry a token so <img> and players can load them."""
+        return sign_media_url(url)
+
     class Config:
         from_attributes = True
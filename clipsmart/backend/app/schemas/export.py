@@ -3,8 +3,10 @@ Export schemas for API validation.
 """
 
 from datetime import datetime
-from typing import Optional, Dict, Any
-from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List
+from pydantic import BaseModel, Field, field_serializer
+
+from app.core.security import sign_media_url
 
 
 class ExportBase(BaseModel):
@@ -21,6 +23,14 @@ class ExportCreate(ExportBase):
     settings: Optional[Dict[str, Any]] = None
 
 
+class ExportBatchCreate(BaseModel):
+    """Schema for exporting one splice to several platforms in one pass."""
+    splice_id: str
+    targets: List[ExportBase] = Field(..., min_items=1, max_items=8)
+    watermark: Optional[str] = None
+    settings: Optional[Dict[str, Any]] = None
+
+
 class ExportUpdate(BaseModel):
     """Schema for export update."""
     watermark: Optional[str] = None
@@ -37,10 +47,18 @@ class ExportResponse(ExportBase):
     file_url: Optional[str] = None
     file_size: Optional[int] = None
     duration: Optional[int] = None
+    progress: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    encode_speed: Optional[float] = None
     created_at: datetime
     updated_at: datetime
     completed_at: Optional[datetime] = None
     expires_at: Optional[datetime] = None
 
+    @field_serializer("file_url")
+    def sign_url(self, url: Optional[str]) -> Optional[str]:
+        """Media URLs carry a token so <video> and downloads can load them."""
+        return sign_media_url(url)
+
     class Config:
         from_attributes = True
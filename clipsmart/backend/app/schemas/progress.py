@@ -0,0 +1,18 @@
+"""
+Job progress schemas for API validation.
+"""
+
+from typing import Optional
+from pydantic import BaseModel
+
+
+class JobProgressResponse(BaseModel):
+    """Schema for live encode progress of a splice or export."""
+    id: str
+    status: str
+    percent: Optional[float] = None
+    eta: Optional[float] = None
+    fps: Optional[float] = None
+    speed: Optional[float] = None
+    out_time: Optional[float] = None
+    updated_at: Optional[str] = None
@@ -4,7 +4,9 @@ Splice schemas for API validation.
 
 from datetime import datetime
 from typing import Optional, Dict, Any, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_serializer
+
+from app.core.security import sign_media_url
 
 
 class SpliceBase(BaseModel):
@@ -36,15 +38,25 @@ class SpliceResponse(SpliceBase):
     layout: str
     status: str
     file_path: Optional[str] = None
+    hls_url: Optional[str] = None
+    dash_url: Optional[str] = None
     file_size: Optional[int] = None
     duration: Optional[int] = None
     hashtags: Optional[List[str]] = None
     caption: Optional[str] = None
     ai_rationale: Optional[str] = None
+    progress: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    encode_speed: Optional[float] = None
     created_at: datetime
     updated_at: datetime
     completed_at: Optional[datetime] = None
 
+    @field_serializer("hls_url", "dash_url")
+    def sign_url(self, url: Optional[str]) -> Optional[str]:
+        """Media URLs carry a token so <video> can load them."""
+        return sign_media_url(url)
+
     class Config:
         from_attributes = True
 
@@ -4,7 +4,9 @@ Video schemas for API validation.
 
 from datetime import datetime
 from typing import Optional, Dict, Any, List
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl, field_serializer
+
+from app.core.security import sign_media_url, sign_media_urls
 
 
 class VideoBase(BaseModel):
@@ -39,10 +41,23 @@ class VideoResponse(VideoBase):
     fps: Optional[float] = None
     status: str
     thumbnail_url: Optional[str] = None
+    thumbnails: Optional[Dict[str, Any]] = None
+    hls_url: Optional[str] = None
+    dash_url: Optional[str] = None
     created_at: datetime
     updated_at: datetime
     analyzed_at: Optional[datetime] = None
 
+    @field_serializer("thumbnail_url", "hls_url", "dash_url")
+    def sign_url(self, url: Optional[str]) -> Optional[str]:
+        """Media URLs carry a token so <img> and <video> can load them."""
+        return sign_media_url(url)
+
+    @field_serializer("thumbnails")
+    def sign_thumbnails(self, thumbnails: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Sign every URL of the thumbnails manifest."""
+        return sign_media_urls(thumbnails)
+
     class Config:
         from_attributes = True
 
@@ -53,6 +68,7 @@ class VideoAnalysisResponse(BaseModel):
     analysis_result: Optional[Dict[str, Any]] = None
     transcript: Optional[str] = None
     audio_analysis: Optional[Dict[str, Any]] = None
+    visual_features: Optional[Dict[str, Any]] = None
     clips_extracted: int
     status: str
 
@@ -0,0 +1,169 @@
+"""
+Persisted decoded audio: mono float32 PCM as a memory-mapped .npy sidecar.
+"""
+
+import os
+import uuid
+import logging
+from typing import Optional, Tuple
+
+import ffmpeg
+import numpy as np
+from cachetools import LRUCache
+
+from app.core.config import get_settings
+from app.core.exceptions import ProcessingError
+from app.services.ffmpeg_runner import FFmpegRunner
+
+settings = get_settings()
+logger = logging.getLogger("clipsmart.audio_cache")
+
+AUDIO_SUFFIX = ".pcm.npy"
+
+# Fixed .npy header size: the sample count is only known after decoding, so
+# PCM is streamed in behind a placeholder that is rewritten in place
+NPY_HEADER_BYTES = 128
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+
+# Opened maps keyed by sidecar path, reused while the sidecar is unchanged
+_opened: "LRUCache[str, Tuple[int, np.memmap]]" = LRUCache(maxsize=64)
+
+
+def _npy_header(samples: int) -> bytes:
+    """A version 1.0 .npy header for a 1-D little-endian float32 array, padded to NPY_HEADER_BYTES."""
+    body = f"{{'descr': '<f4', 'fortran_order': False, 'shape': ({samples},), }}"
+    pad = NPY_HEADER_BYTES - len(NPY_MAGIC) - 2 - len(body) - 1
+    body = (body + " " * pad + "\n").encode("latin1")
+    return NPY_MAGIC + len(body).to_bytes(2, "little") + body
+
+
+class AudioCache:
+    """Decodes a video's audio once and serves it as a read-only memory map."""
+
+    def __init__(self, runner: Optional[FFmpegRunner] = None, sample_rate: Optional[int] = None):
+        self.runner = runner or FFmpegRunner(ffmpeg_path=settings.FFMPPEG_PATH)
+        self.sample_rate = sample_rate or settings.AUDIO_ANALYSIS_SAMPLE_RATE
+
+    @staticmethod
+    def path_for(video_path: str) -> str:
+        """Get the sidecar PCM path for a video file."""
+        return f"{video_path}{AUDIO_SUFFIX}"
+
+    async def build(self, video_path: str) -> str:
+        """
+        Decode a video's audio to mono float32 PCM at the analysis rate.
+
+        FFmpeg writes raw samples straight into the sidecar behind a
+        placeholder header, so the PCM never passes through Python; the
+        sidecar is published atomically once complete.
+
+        Args:
+            video_path: Path to video file
+
+        Returns:
+            Path to the sidecar
+        """
+        audio_path = self.path_for(video_path)
+        temp_path = f"{audio_path}.{uuid.uuid4().hex}.tmp"
+
+        logger.info(f"Decoding audio from: {video_path}")
+
+        output = ffmpeg.output(
+            ffmpeg.input(video_path).audio,
+            'pipe:1',
+            format='f32le',
+            acodec='pcm_f32le',
+            ac=1,
+            ar=self.sample_rate
+        )
+
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(_npy_header(0))
+                f.flush()
+                await self.runner.run(output, stdout=f)
+
+                data_bytes = os.fstat(f.fileno()).st_size - NPY_HEADER_BYTES
+                f.seek(0)
+                f.write(_npy_header(data_bytes // 4))
+
+            os.replace(temp_path, audio_path)
+
+        except ProcessingError as e:
+            logger.error(f"FFmpeg error: {e.detail}")
+            raise ProcessingError(f"Failed to decode audio: {e.detail}")
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        logger.info(f"Decoded {data_bytes // 4 / self.sample_rate:.1f}s of audio to {audio_path}")
+        return audio_path
+
+    def open(self, video_path: str) -> Optional[np.memmap]:
+        """
+        Map a video's decoded audio, if present and current.
+
+        Args:
+            video_path: Path to video file
+
+        Returns:
+            Read-only float32 samples, or None if not decoded yet
+        """
+        audio_path = self.path_for(video_path)
+
+        try:
+            source_mtime = os.stat(video_path).st_mtime_ns
+            audio_mtime = os.stat(audio_path).st_mtime_ns
+        except OSError:
+            return None
+
+        # Stale if the source changed after decoding
+        if audio_mtime < source_mtime:
+            return None
+
+        cached = _opened.get(audio_path)
+        if cached and cached[0] == audio_mtime:
+            return cached[1]
+
+        try:
+            samples = np.load(audio_path, mmap_mode="r")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable audio cache {audio_path}: {str(e)}")
+            return None
+
+        _opened[audio_path] = (audio_mtime, samples)
+        return samples
+
+    async def get(self, video_path: str) -> np.memmap:
+        """
+        Map a video's decoded audio, decoding it first if needed.
+
+        Args:
+            video_path: Path to video file
+
+        Returns:
+            Read-only float32 samples at sample_rate
+        """
+        samples = self.open(video_path)
+        if samples is None:
+            await self.build(video_path)
+            samples = self.open(video_path)
+            if samples is None:
+                raise ProcessingError(f"Decoded audio unavailable for {video_path}")
+        return samples
+
+    def window(self, samples: np.ndarray, start_time: float, end_time: Optional[float] = None) -> np.ndarray:
+        """
+        Slice [start_time, end_time] out of decoded samples without copying.
+
+        Args:
+            samples: Samples from get() or open()
+            start_time: Window start in seconds
+            end_time: Window end in seconds (default: end of audio)
+
+        Returns:
+            View of the samples in the window
+        """
+        start = max(0, int(round(start_time * self.sample_rate)))
+        end = len(samples) if end_time is None else int(round(end_time * self.sample_rate))
+        return samples[start:max(start, end)]
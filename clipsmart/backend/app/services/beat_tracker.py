@@ -0,0 +1,304 @@
+"""
+Local beat tracking over decoded PCM: onset strength, tempo estimation and
+a beat grid, plus beat snapping for splice timelines.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import fft
+from scipy.ndimage import gaussian_filter1d, uniform_filter1d
+
+from app.core.config import get_settings
+from app.core.exceptions import ProcessingError
+
+settings = get_settings()
+logger = logging.getLogger("clipsmart.beat_tracker")
+
+# Onset envelope: 20 ms hop, ~46 ms window at the 22.05 kHz analysis rate
+ONSET_FPS = 50
+FFT_SIZE = 1024
+
+# Log-spaced bands the spectral flux is summed over
+BAND_COUNT = 48
+BAND_MIN_HZ = 30.0
+BAND_MAX_HZ = 8000.0
+LOG_COMPRESSION = 100.0
+
+# Frames transformed per step, bounding memory for long videos
+CHUNK_SECONDS = 30
+
+# Tempo search range and prior (log-normal around a typical pop tempo)
+MIN_BPM = 60.0
+MAX_BPM = 200.0
+TEMPO_PRIOR_BPM = 120.0
+TEMPO_PRIOR_OCTAVES = 1.0
+
+# Envelope smoothing before autocorrelation, in frames; spreads each onset
+# over neighbouring lags so periods between two whole frames are not missed
+TEMPO_SMOOTHING_FRAMES = 2.0
+
+# How strongly beat spacing is held to the estimated period (Ellis 2007)
+TIGHTNESS = 100.0
+
+# Leading/trailing beats weaker than this share of the beats' RMS onset are dropped
+TRIM_RATIO = 0.5
+
+
+def _band_matrix(sample_rate: int) -> np.ndarray:
+    """(bins, bands) averaging matrix from FFT bins to log-spaced bands."""
+    frequencies = np.fft.rfftfreq(FFT_SIZE, 1 / sample_rate)
+    edges = np.geomspace(BAND_MIN_HZ, min(BAND_MAX_HZ, sample_rate / 2), BAND_COUNT + 1)
+    band = np.searchsorted(edges, frequencies, side="right") - 1
+
+    matrix = np.zeros((len(frequencies), BAND_COUNT), dtype=np.float32)
+    inside = (band >= 0) & (band < BAND_COUNT)
+    matrix[np.flatnonzero(inside), band[inside]] = 1.0
+
+    # Average within each band; bands narrower than a bin stay empty
+    counts = matrix.sum(axis=0)
+    return matrix[:, counts > 0] / counts[counts > 0]
+
+
+class BeatTracker:
+    """
+    Estimates tempo and beat positions of a mono PCM track.
+
+    The onset envelope is log-band spectral flux computed chunk by chunk,
+    so memory stays bounded however long the video is. Tempo comes from the
+    envelope's autocorrelation weighted by a tempo prior; beats are then
+    placed by dynamic programming, processed a block of frames at a time.
+    """
+
+    def __init__(self, sample_rate: Optional[int] = None):
+        """
+        Args:
+            sample_rate: Sample rate of the PCM (default: AUDIO_ANALYSIS_SAMPLE_RATE)
+        """
+        self.sample_rate = sample_rate or settings.AUDIO_ANALYSIS_SAMPLE_RATE
+        if self.sample_rate % ONSET_FPS:
+            raise ProcessingError(f"Sample rate must be a multiple of {ONSET_FPS} Hz: {self.sample_rate}")
+
+        self.hop = self.sample_rate // ONSET_FPS
+        self.window = np.hanning(FFT_SIZE).astype(np.float32)
+        self.bands = _band_matrix(self.sample_rate)
+
+    def _frames(self, samples: np.ndarray, first: int, count: int) -> np.ndarray:
+        """Windowed frames centred on hops first..first+count, zero-padded at the ends."""
+        start = first * self.hop - FFT_SIZE // 2
+        stop = (first + count - 1) * self.hop - FFT_SIZE // 2 + FFT_SIZE
+
+        buffer = np.zeros(stop - start, dtype=np.float32)
+        lo, hi = max(start, 0), min(stop, len(samples))
+        if hi > lo:
+            buffer[lo - start:hi - start] = samples[lo:hi]
+
+        return sliding_window_view(buffer, FFT_SIZE)[::self.hop] * self.window
+
+    def onset_strength(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Onset envelope at ONSET_FPS.
+
+        Args:
+            samples: Mono float32 samples (e.g. from AudioCache)
+
+        Returns:
+            Non-negative envelope, one value per hop, normalized to unit RMS
+        """
+        total = len(samples) // self.hop + 1
+        chunk = CHUNK_SECONDS * ONSET_FPS
+        flux = np.empty(total, dtype=np.float32)
+        previous = None
+
+        for first in range(0, total, chunk):
+            count = min(chunk, total - first)
+            spectrum = np.abs(fft.rfft(self._frames(samples, first, count), axis=1)) / FFT_SIZE
+            bands = np.log1p(LOG_COMPRESSION * (spectrum @ self.bands))
+
+            before = np.concatenate((bands[:1] if previous is None else previous[None], bands[:-1]))
+            flux[first:first + count] = np.maximum(bands - before, 0).mean(axis=1)
+            previous = bands[-1]
+
+        # Remove the slow trend so loud passages do not dominate
+        envelope = np.maximum(flux - uniform_filter1d(flux, ONSET_FPS, mode="nearest"), 0)
+        rms = float(np.sqrt(np.mean(envelope ** 2))) if len(envelope) else 0.0
+        return envelope / rms if rms > 0 else envelope
+
+    def tempo(self, envelope: np.ndarray) -> Optional[Tuple[float, float]]:
+        """
+        Estimate the beat period from the onset envelope.
+
+        Args:
+            envelope: onset_strength() output
+
+        Returns:
+            Tuple of (period in frames, 0-1 periodicity confidence), or None
+            when the envelope is too short or flat
+        """
+        min_lag = int(ONSET_FPS * 60 / MAX_BPM)
+        max_lag = int(np.ceil(ONSET_FPS * 60 / MIN_BPM))
+        if len(envelope) < 2 * max_lag:
+            return None
+
+        smoothed = gaussian_filter1d(envelope, TEMPO_SMOOTHING_FRAMES)
+        centred = smoothed - smoothed.mean()
+        spectrum = fft.rfft(centred, 2 * len(centred))
+        autocorrelation = fft.irfft(np.abs(spectrum) ** 2)[:max_lag + 2]
+        if autocorrelation[0] <= 0:
+            return None
+        autocorrelation /= autocorrelation[0]
+
+        lags = np.arange(min_lag, max_lag + 1)
+        bpm = 60 * ONSET_FPS / lags
+        prior = np.exp(-0.5 * (np.log2(bpm / TEMPO_PRIOR_BPM) / TEMPO_PRIOR_OCTAVES) ** 2)
+        best = int(lags[np.argmax(autocorrelation[lags] * prior)])
+
+        # Parabolic interpolation between neighbouring lags
+        left, centre, right = autocorrelation[best - 1:best + 2]
+        curvature = left - 2 * centre + right
+        shift = 0.5 * (left - right) / curvature if curvature < 0 else 0.0
+
+        return best + float(np.clip(shift, -0.5, 0.5)), float(max(centre, 0.0))
+
+    def _beat_frames(self, envelope: np.ndarray, period: float) -> np.ndarray:
+        """Dynamic-programming beat placement for a fixed period."""
+        shortest = max(1, int(round(period / 2)))
+        longest = int(round(2 * period))
+        offsets = np.arange(shortest, longest + 1)
+        penalty = -TIGHTNESS * np.log(offsets / period) ** 2
+
+        total = len(envelope)
+        score = envelope.astype(np.float64)
+        backlink = np.full(total, -1, dtype=np.int64)
+
+        # Every frame in a block only looks back past the block's start, so
+        # a whole block can be scored at once
+        for first in range(shortest, total, shortest):
+            frames = np.arange(first, min(first + shortest, total))
+            previous = frames[:, None] - offsets[None, :]
+            candidates = np.where(previous >= 0, score[np.maximum(previous, 0)] + penalty, -np.inf)
+            best = np.argmax(candidates, axis=1)
+            best_score = candidates[np.arange(len(frames)), best]
+
+            linked = best_score > 0
+            score[frames[linked]] += best_score[linked]
+            backlink[frames[linked]] = previous[linked, best[linked]]
+
+        # Backtrack from the best-scoring frame in the final period
+        tail = max(0, total - longest)
+        beat = tail + int(np.argmax(score[tail:]))
+        beats = []
+        while beat >= 0:
+            beats.append(beat)
+            beat = backlink[beat]
+        beats = np.array(beats[::-1])
+
+        # Drop weak beats over leading/trailing silence or noise
+        strength = uniform_filter1d(envelope, 3)[beats]
+        strong = np.flatnonzero(strength >= TRIM_RATIO * np.sqrt(np.mean(strength ** 2)))
+        if not len(strong):
+            return beats[:0]
+        return beats[strong[0]:strong[-1] + 1]
+
+    def track(self, samples: np.ndarray) -> Optional[Dict[str, Any]]:
+        """
+        Build the beat grid of a track.
+
+        Args:
+            samples: Mono float32 samples (e.g. from AudioCache)
+
+        Returns:
+            Dict with tempo (BPM), confidence, duration and beat times in
+            seconds, or None for tracks too short or flat to have a pulse
+        """
+        envelope = self.onset_strength(samples)
+        estimate = self.tempo(envelope)
+        if estimate is None:
+            return None
+
+        period, confidence = estimate
+        beats = self._beat_frames(envelope, period)
+
+        return {
+            "tempo": round(60 * ONSET_FPS / period, 1),
+            "confidence": round(confidence, 3),
+            "duration": round(len(samples) / self.sample_rate, 3),
+            "beats": np.round(beats / ONSET_FPS, 3).tolist(),
+        }
+
+
+def usable_beats(beat_grid: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+    """Beat times of a grid confident enough to cut on, else None."""
+    if not beat_grid or beat_grid.get("confidence", 0) < settings.BEAT_MIN_CONFIDENCE:
+        return None
+    beats = np.asarray(beat_grid.get("beats") or [])
+    return beats if len(beats) else None
+
+
+def _nearest(time: float, beats: Optional[np.ndarray], tolerance: float, limit: Optional[float] = None) -> Optional[float]:
+    """Nearest beat to time within tolerance (and at or before limit), if any."""
+    if beats is None:
+        return None
+    if limit is not None:
+        beats = beats[beats <= limit]
+        if not len(beats):
+            return None
+    i = int(np.argmin(np.abs(beats - time)))
+    return float(beats[i]) if abs(beats[i] - time) <= tolerance else None
+
+
+def plan_beat_timeline(
+    ranges: Sequence[Tuple[float, float]],
+    beat_grids: Sequence[Optional[Dict[str, Any]]],
+    tolerance: Optional[float] = None,
+    min_duration: Optional[float] = None
+) -> List[Dict[str, float]]:
+    """
+    Snap the clips of a splice onto beats.
+
+    Clips play side by side from t=0, so each in point is snapped to a beat
+    of its own source. The first clip leads the mix: its out point lands on
+    its own beat, and every other clip's out point is moved so the moment it
+    drops out of the layout falls on one of the lead's beats. Edges with no
+    beat within tolerance, or whose snap would leave a clip shorter than
+    min_duration, stay where they were.
+
+    Args:
+        ranges: (start_time, end_time) of each clip in splice order
+        beat_grids: Beat grid of each clip's source video (None when unknown)
+        tolerance: Maximum distance an edge may move (default: BEAT_SNAP_TOLERANCE)
+        min_duration: Minimum clip duration after snapping
+
+    Returns:
+        One dict with start_time and end_time per clip
+    """
+    tolerance = tolerance if tolerance is not None else settings.BEAT_SNAP_TOLERANCE
+    min_duration = min_duration if min_duration is not None else settings.MIN_CLIP_DURATION
+
+    timeline = []
+    lead_beats = None
+    for position, ((start_time, end_time), grid) in enumerate(zip(ranges, beat_grids)):
+        beats = usable_beats(grid)
+        source_end = (grid or {}).get("duration")
+
+        start = _nearest(start_time, beats, tolerance)
+        start = start if start is not None and end_time - start >= min_duration else start_time
+
+        if position == 0:
+            end = _nearest(end_time, beats, tolerance, source_end)
+            if beats is not None:
+                # The lead's beats on the output timeline
+                lead_beats = beats - start
+        else:
+            # Cut on the lead's pulse, falling back to the clip's own beats
+            offset = _nearest(end_time - start, lead_beats, tolerance)
+            end = start + offset if offset is not None else _nearest(end_time, beats, tolerance)
+            if end is not None and source_end is not None and end > source_end:
+                end = None
+
+        end = end if end is not None and end - start >= min_duration else end_time
+        timeline.append({"start_time": round(start, 3), "end_time": round(end, 3)})
+
+    return timeline
@@ -0,0 +1,174 @@
+"""
+Clip boundary refinement: trims dead stretches (silence over black or frozen
+frames) off clip edges and drops clips that are mostly dead.
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.services.frame_sampler import FrameBatch
+
+settings = get_settings()
+logger = logging.getLogger("clipsmart.boundary_refiner")
+
+# Share of pixels that must be dark for a frame to count as black
+BLACK_PIXEL_RATIO = 0.98
+
+# Mean absolute luma change (0-255) below which a frame counts as frozen
+FREEZE_MAX_DIFF = 0.5
+
+# Dead runs shorter than this are left in place
+MIN_TRIM_SECONDS = 0.2
+
+
+class DeadFrameDetector:
+    """
+    Flags black and frozen frames in grayscale FrameBatches.
+
+    Keeps two booleans and a timestamp per sampled frame.
+    """
+
+    def __init__(self, black_threshold: Optional[float] = None):
+        """
+        Args:
+            black_threshold: Luma level (0-1) below which a pixel is dark
+        """
+        threshold = black_threshold if black_threshold is not None else settings.BLACK_LUMA_THRESHOLD
+        self.black_level = int(round(threshold * 255))
+
+        self._previous: Optional[np.ndarray] = None
+        self._black: List[np.ndarray] = []
+        self._frozen: List[np.ndarray] = []
+        self._timestamps: List[np.ndarray] = []
+
+    def update(self, batch: FrameBatch) -> None:
+        """
+        Flag the frames of a batch.
+
+        Args:
+            batch: Grayscale frames from FrameSampler
+        """
+        pixels = batch.frames.reshape(len(batch), -1)
+
+        self._black.append((pixels <= self.black_level).mean(axis=1) >= BLACK_PIXEL_RATIO)
+
+        previous = pixels[:1] if self._previous is None else self._previous[None]
+        previous = np.concatenate((previous, pixels[:-1]))
+        diff = np.abs(pixels.astype(np.int16) - previous).mean(axis=1)
+        frozen = diff < FREEZE_MAX_DIFF
+        if self._previous is None:
+            # The first frame has nothing to be frozen against
+            frozen[0] = False
+        self._frozen.append(frozen)
+
+        self._timestamps.append(batch.timestamps.copy())
+        self._previous = pixels[-1].copy()
+
+    def finish(self) -> Dict[str, np.ndarray]:
+        """
+        Returns:
+            Dict of per-frame timestamps, black and frozen arrays
+        """
+        if not self._timestamps:
+            return {"timestamps": np.empty(0), "black": np.empty(0, bool), "frozen": np.empty(0, bool)}
+        return {
+            "timestamps": np.concatenate(self._timestamps),
+            "black": np.concatenate(self._black),
+            "frozen": np.concatenate(self._frozen),
+        }
+
+
+class BoundaryRefiner:
+    """Tightens clip edges using frame flags and decoded audio."""
+
+    def __init__(
+        self,
+        frame_stats: Optional[Dict[str, np.ndarray]] = None,
+        samples: Optional[np.ndarray] = None,
+        sample_rate: Optional[int] = None,
+        step: Optional[float] = None
+    ):
+        """
+        Args:
+            frame_stats: DeadFrameDetector.finish() output
+            samples: Decoded mono audio (e.g. from AudioCache)
+            sample_rate: Sample rate of samples
+            step: Analysis step in seconds (default: the scene sampling interval)
+        """
+        self.frame_stats = frame_stats if frame_stats is not None and len(frame_stats["timestamps"]) else None
+        self.samples = samples
+        self.sample_rate = sample_rate or settings.AUDIO_ANALYSIS_SAMPLE_RATE
+        self.step = step or 1.0 / settings.SCENE_SAMPLE_FPS
+        self.silence_power = 10 ** (settings.SILENCE_THRESHOLD_DB / 10)
+
+    def _dead(self, start_time: float, end_time: float) -> np.ndarray:
+        """
+        Per-step dead flags over [start_time, end_time).
+
+        A step is dead only when silent audio coincides with a black or
+        frozen frame, so narrated stills and silent footage with motion are
+        kept. Without both signals nothing counts as dead.
+        """
+        steps = max(1, int(round((end_time - start_time) / self.step)))
+        dead = np.zeros(steps, dtype=bool)
+        if self.frame_stats is None or self.samples is None:
+            return dead
+
+        hop = int(round(self.step * self.sample_rate))
+        first = int(round(start_time * self.sample_rate))
+        window = np.asarray(self.samples[first:first + steps * hop], dtype=np.float32)
+        usable = len(window) // hop
+        if not usable:
+            return dead
+
+        frames = window[:usable * hop].reshape(usable, hop)
+        power = np.einsum("ij,ij->i", frames, frames) / hop
+        silent = power < self.silence_power
+
+        # Latest sampled frame at or before each step
+        times = start_time + np.arange(usable) * self.step
+        index = np.searchsorted(self.frame_stats["timestamps"], times, side="right") - 1
+        index = np.clip(index, 0, len(self.frame_stats["timestamps"]) - 1)
+        still = self.frame_stats["black"][index] | self.frame_stats["frozen"][index]
+
+        dead[:usable] = silent & still
+        return dead
+
+    def refine(self, start_time: float, end_time: float) -> Optional[Dict[str, float]]:
+        """
+        Trim dead leading and trailing runs off a clip.
+
+        Clips are returned unchanged when either the frame flags or the
+        decoded audio are missing.
+
+        Args:
+            start_time: Clip start in seconds
+            end_time: Clip end in seconds
+
+        Returns:
+            Dict with refined start_time and end_time, or None when the clip
+            is mostly dead and should be dropped
+        """
+        if self.frame_stats is None or self.samples is None:
+            return {"start_time": start_time, "end_time": end_time}
+
+        dead = self._dead(start_time, end_time)
+        if dead.all() or dead.mean() > settings.DEAD_CLIP_MAX_RATIO:
+            logger.info(f"Dropping mostly dead clip {start_time:.2f}-{end_time:.2f}")
+            return None
+
+        live = np.flatnonzero(~dead)
+        lead = float(live[0] * self.step)
+        trail = float((len(dead) - 1 - live[-1]) * self.step)
+
+        new_start = start_time + lead if lead >= MIN_TRIM_SECONDS else start_time
+        new_end = end_time - trail if trail >= MIN_TRIM_SECONDS else end_time
+
+        # Trimming must not push a clip under the minimum length
+        if new_end - new_start < settings.MIN_CLIP_DURATION:
+            return {"start_time": start_time, "end_time": end_time}
+
+        return {"start_time": round(new_start, 3), "end_time": round(new_end, 3)}
@@ -0,0 +1,221 @@
+"""
+On-disk cache of extracted clip renditions, keyed by a content hash of the
+source and the clip parameters.
+"""
+
+import os
+import json
+import uuid
+import fcntl
+import shutil
+import hashlib
+import logging
+from typing import Any, Dict, Optional
+
+from cachetools import LRUCache
+
+from app.core.config import get_settings
+from app.services.probe_cache import file_signature
+
+settings = get_settings()
+logger = logging.getLogger("clipsmart.clip_cache")
+
+# Bump when extract_clip's encode settings change so stale renditions miss
+CLIP_ENCODE_VERSION = 4
+
+# Content hashes keyed by file signature, so each version of a file is read once
+_fingerprints: "LRUCache[str, str]" = LRUCache(maxsize=4096)
+
+# Read size while hashing a source
+_HASH_CHUNK = 1024 * 1024
+
+# Linux ioctl that shares a file's extents copy-on-write (btrfs, XFS, ...)
+FICLONE = 0x40049409
+
+
+def content_fingerprint(path: str) -> str:
+    """
+    Hash a file's full contents.
+
+    The whole file is read once per file signature (path, size, mtime);
+    later calls for the same version of the file are served from memory.
+
+    Args:
+        path: Path to file
+
+    Returns:
+        Hex SHA-256 digest of the contents
+    """
+    signature = file_signature(path)
+    fingerprint = _fingerprints.get(signature)
+    if fingerprint is not None:
+        return fingerprint
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+
+    fingerprint = digest.hexdigest()
+    _fingerprints[signature] = fingerprint
+    return fingerprint
+
+
+class ClipCache:
+    """Size-bounded LRU store of rendered clips, addressed by what produced them."""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.cache_dir = cache_dir or settings.CLIP_CACHE_DIR
+        self.max_bytes = max_bytes or settings.CLIP_CACHE_MAX_BYTES
+        self.enabled = settings.CLIP_CACHE_ENABLED
+
+        if self.enabled:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key_for(
+        self,
+        source_path: str,
+        start_time: float,
+        end_time: float,
+        params: Dict[str, Any]
+    ) -> str:
+        """
+        Cache key for a rendition of [start_time, end_time] of a source.
+
+        The source is identified by its content hash only, so renames,
+        copies and touches still hit and any change to its bytes misses.
+        The first key for a source reads the whole file; call it off the
+        event loop.
+
+        Args:
+            source_path: Source video
+            start_time: Clip start in seconds
+            end_time: Clip end in seconds
+            params: Encode parameters that affect the output
+
+        Returns:
+            Hex digest identifying the rendition
+        """
+        raw = json.dumps(
+            {
+                "source": content_fingerprint(source_path),
+                "start": round(start_time, 3),
+                "end": round(end_time, 3),
+                "params": params,
+                "version": CLIP_ENCODE_VERSION,
+            },
+            sort_keys=True
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.mp4")
+
+    def fetch(self, key: str, output_path: str) -> bool:
+        """
+        Materialize a cached rendition at output_path.
+
+        Args:
+            key: Cache key from key_for()
+            output_path: Where the caller expects the clip
+
+        Returns:
+            True on a hit
+        """
+        if not self.enabled:
+            return False
+
+        entry_path = self._entry_path(key)
+        try:
+            # Touch for LRU ordering
+            os.utime(entry_path)
+            self._clone(entry_path, output_path)
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            logger.warning(f"Clip cache read failed for {key}: {str(e)}")
+            return False
+
+        logger.info(f"Clip cache hit: {key}")
+        return True
+
+    def store(self, key: str, rendered_path: str) -> None:
+        """
+        Publish a freshly rendered clip under key.
+
+        The entry appears atomically, so concurrent readers never see a
+        partial file; the caller keeps its own copy at rendered_path.
+
+        Args:
+            key: Cache key from key_for()
+            rendered_path: Rendered clip to publish
+        """
+        if not self.enabled:
+            return
+
+        entry_path = self._entry_path(key)
+        temp_path = os.path.join(self.cache_dir, f".{uuid.uuid4().hex}.tmp")
+
+        try:
+            os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+            self._clone(rendered_path, temp_path)
+            os.replace(temp_path, entry_path)
+        except OSError as e:
+            logger.warning(f"Clip cache write failed for {key}: {str(e)}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+
+        self.evict()
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache fits its budget."""
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".mp4"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                continue
+
+        logger.info(f"Clip cache evicted down to {total} bytes")
+
+    @staticmethod
+    def _clone(src: str, dst: str) -> None:
+        """
+        Copy src to dst as an independent file, reflinking where supported.
+
+        Never hard-links: an in-place rewrite of a published clip would
+        otherwise change the cache entry too.
+        """
+        if os.path.exists(dst):
+            os.remove(dst)
+        with open(src, "rb") as source, open(dst, "wb") as target:
+            try:
+                fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+                return
+            except OSError:
+                pass
+        # No reflink support on this filesystem
+        shutil.copyfile(src, dst)
@@ -5,13 +5,17 @@ Export service for platform-optimized videos.
 import os
 import logging
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.models.export import Export, ExportStatus, ExportPlatform
 from app.models.splice import Splice
 from app.services.video_processor import VideoProcessorService
+from app.services.loudness import normalization_gain
+from app.services.media_streaming import media_url
+from app.services.progress import JobProgressReporter, row_persister
+from app.services.segmented_encode import SegmentedEncodeService
 from app.core.exceptions import ProcessingError, ValidationError
 from app.core.config import get_settings
 
@@ -24,6 +28,7 @@ class ExportService:
 
     def __init__(self):
         self.video_processor = VideoProcessorService()
+        self.segmented = SegmentedEncodeService()
 
     async def create_export(
         self,
@@ -52,7 +57,43 @@ class ExportService:
         Returns:
             Created Export object
         """
-        logger.info(f"Creating {platform} export for splice {splice_id}")
+        exports = await self.create_exports(
+            db=db,
+            user_id=user_id,
+            splice_id=splice_id,
+            targets=[{"platform": platform, "resolution": resolution, "fps": fps}],
+            watermark=watermark,
+            settings_dict=settings_dict
+        )
+        return exports[0]
+
+    async def create_exports(
+        self,
+        db: AsyncSession,
+        user_id: str,
+        splice_id: str,
+        targets: List[Dict[str, Any]],
+        watermark: Optional[str] = None,
+        settings_dict: Optional[Dict[str, Any]] = None
+    ) -> List[Export]:
+        """
+        Create and process exports for several platforms in one encode pass.
+
+        The splice is decoded once and every rendition is written by the same
+        FFmpeg process.
+
+        Args:
+            db: Database session
+            user_id: User ID
+            splice_id: Splice ID to export
+            targets: List of dicts with platform, resolution and fps
+            watermark: Optional watermark text
+            settings_dict: Platform-specific settings
+
+        Returns:
+            Created Export objects, in target order
+        """
+        logger.info(f"Creating {len(targets)} export(s) for splice {splice_id}")
 
         # Get splice
         result = await db.execute(
@@ -69,41 +110,153 @@ class ExportService:
         if not splice.file_path or not os.path.exists(splice.file_path):
             raise ValidationError("Splice has not been rendered yet")
 
-        # Create export record
-        export = Export(
-            user_id=user_id,
-            splice_id=splice_id,
-            platform=platform,
-            resolution=resolution,
-            fps=fps,
-            watermark=watermark,
-            settings=settings_dict or {},
-            status=ExportStatus.PENDING,
-        )
+        # Create export records
+        exports = [
+            Export(
+                user_id=user_id,
+                splice_id=splice_id,
+                platform=ExportPlatform(target["platform"]),
+                resolution=target.get("resolution", "1080x1920"),
+                fps=target.get("fps", 30),
+                watermark=watermark,
+                settings=settings_dict or {},
+                status=ExportStatus.PENDING,
+            )
+            for target in targets
+        ]
 
-        db.add(export)
+        db.add_all(exports)
         await db.commit()
-        await db.refresh(export)
+        for export in exports:
+            await db.refresh(export)
 
         try:
             # Update status
-            export.status = ExportStatus.PROCESSING
+            for export in exports:
+                export.status = ExportStatus.PROCESSING
             await db.commit()
 
-            # Generate output path
-            output_filename = f"export_{export.id}_{platform.value}.mp4"
-            output_path = os.path.join(settings.EXPORT_DIR, output_filename)
+            # Generate output paths
+            renditions = [
+                {
+                    "output_path": os.path.join(
+                        settings.EXPORT_DIR,
+                        f"export_{export.id}_{export.platform.value}.mp4"
+                    ),
+                    "platform": export.platform.value,
+                    "resolution": export.resolution,
+                    "fps": export.fps,
+                    # Single-pass linear gain from the splice's cached measurement
+                    "gain_db": normalization_gain(splice.loudness_lufs, splice.true_peak_db),
+                }
+                for export in exports
+            ]
+
+            duration = (await self.video_processor.get_video_metadata(splice.file_path))['duration']
+            if self.segmented.should_distribute(duration):
+                from app.tasks.segment_tasks import dispatch_export_segments
+
+                export_ids = [export.id for export in exports]
+                windows = await self.segmented.plan_windows(splice.file_path, 0.0, duration)
+                dispatch_export_segments(
+                    export_ids=export_ids,
+                    input_path=splice.file_path,
+                    renditions=renditions,
+                    watermark=watermark,
+                    windows=[list(window) for window in windows],
+                    work_dir=self.segmented.work_dir("export", export_ids[0])
+                )
+                # Finished by the join task once every segment is encoded
+                return exports
 
-            # Optimize for platform
-            await self.video_processor.optimize_for_platform(
+            # Optimize for all platforms from a single decode
+            await self.video_processor.optimize_for_platforms(
                 input_path=splice.file_path,
-                output_path=output_path,
-                platform=platform.value,
-                resolution=resolution,
-                fps=fps,
-                watermark=watermark
+                renditions=renditions,
+                watermark=watermark,
+                progress=JobProgressReporter(
+                    "export",
+                    [export.id for export in exports],
+                    persist=row_persister(db, *exports)
+                )
+            )
+
+            return await self._finish_exports(
+                db,
+                exports,
+                [rendition["output_path"] for rendition in renditions]
             )
 
+        except Exception as e:
+            logger.error(f"Failed to create export: {str(e)}")
+            for export in exports:
+                export.status = ExportStatus.FAILED
+                export.processing_error = str(e)
+            await db.commit()
+            raise ProcessingError(f"Failed to create export: {str(e)}")
+
+    async def complete_segmented_exports(
+        self,
+        db: AsyncSession,
+        export_ids: List[str],
+        segment_paths: List[List[str]],
+        audio_paths: List[str]
+    ) -> List[Export]:
+        """
+        Join each rendition's segments from a distributed export and finish the exports.
+
+        Args:
+            db: Database session
+            export_ids: Export IDs, in rendition order
+            segment_paths: Per export, its encoded video segments in timeline order
+            audio_paths: Per export, its audio track of the whole timeline
+
+        Returns:
+            Updated Export objects
+        """
+        result = await db.execute(
+            select(Export).where(Export.id.in_(export_ids))
+        )
+        by_id = {export.id: export for export in result.scalars().all()}
+        exports = [by_id[export_id] for export_id in export_ids if export_id in by_id]
+
+        try:
+            output_paths = []
+            for export, paths, audio_path in zip(exports, segment_paths, audio_paths):
+                output_path = os.path.join(
+                    settings.EXPORT_DIR,
+                    f"export_{export.id}_{export.platform.value}.mp4"
+                )
+                output_paths.append(await self.segmented.join(paths, audio_path, output_path))
+
+            return await self._finish_exports(db, exports, output_paths)
+
+        except Exception as e:
+            logger.error(f"Failed to create export: {str(e)}")
+            for export in exports:
+                export.status = ExportStatus.FAILED
+                export.processing_error = str(e)
+            await db.commit()
+            raise ProcessingError(f"Failed to create export: {str(e)}")
+
+    async def _finish_exports(
+        self,
+        db: AsyncSession,
+        exports: List[Export],
+        output_paths: List[str]
+    ) -> List[Export]:
+        """
+        Record encoded outputs on their export rows.
+
+        Args:
+            db: Database session
+            exports: Exports being processed
+            output_paths: Encoded file per export
+
+        Returns:
+            Updated Export objects
+        """
+        for export, output_path in zip(exports, output_paths):
             # Get file info
             file_size = os.path.getsize(output_path)
             metadata = await self.video_processor.get_video_metadata(output_path)
@@ -119,22 +272,15 @@ class ExportService:
             # Set expiration (7 days from now)
             export.expires_at = datetime.utcnow() + timedelta(days=7)
 
-            # In production, upload to S3/CDN and set file_url
-            # For now, use local path
-            export.file_url = f"/static/exports/{output_filename}"
+            # Served by the media endpoint (ranges, conditional GETs, proxy offload)
+            export.file_url = media_url("exports", export.id)
 
-            await db.commit()
+        await db.commit()
+        for export in exports:
             await db.refresh(export)
 
-            logger.info(f"Export completed: {export.id}")
-            return export
-
-        except Exception as e:
-            logger.error(f"Failed to create export: {str(e)}")
-            export.status = ExportStatus.FAILED
-            export.processing_error = str(e)
-            await db.commit()
-            raise ProcessingError(f"Failed to create export: {str(e)}")
+        logger.info(f"Exports completed: {', '.join(export.id for export in exports)}")
+        return exports
 
     async def get_download_url(
         self,
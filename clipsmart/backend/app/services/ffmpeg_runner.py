@@ -0,0 +1,350 @@
+"""
+Asynchronous FFmpeg/FFprobe process runner.
+"""
+
+import asyncio
+import json
+import logging
+import weakref
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, BinaryIO, Callable, Deque, Dict, List, Optional, Sequence, Tuple, Union
+
+import ffmpeg
+
+from app.core.config import get_settings
+from app.core.exceptions import ProcessingError
+
+settings = get_settings()
+logger = logging.getLogger("clipsmart.ffmpeg_runner")
+
+# Number of stderr lines kept for error reporting
+STDERR_TAIL_LINES = 50
+
+# asyncio primitives bind to the loop they are first used on, and Celery tasks
+# create a fresh loop per task with asyncio.run(), so keep one semaphore per loop.
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+@dataclass
+class FFmpegProgress:
+    """A progress snapshot parsed from FFmpeg's -progress output."""
+    out_time: float  # seconds of output written
+    fps: float
+    speed: float  # multiple of real time
+    percent: Optional[float] = None
+    eta: Optional[float] = None  # seconds remaining
+    done: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "out_time": round(self.out_time, 2),
+            "fps": round(self.fps, 2),
+            "speed": round(self.speed, 3),
+            "percent": round(self.percent, 1) if self.percent is not None else None,
+            "eta": round(self.eta, 1) if self.eta is not None else None,
+            "done": self.done,
+        }
+
+
+ProgressCallback = Callable[[FFmpegProgress], Awaitable[None]]
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    """Get the process-wide FFmpeg concurrency semaphore for the running loop."""
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max(1, settings.FFMPEG_MAX_CONCURRENCY))
+        _semaphores[loop] = semaphore
+    return semaphore
+
+
+def concurrency_slot() -> asyncio.Semaphore:
+    """
+    The FFmpeg concurrency semaphore, for callers that manage their own process
+    (e.g. streaming decoders) but must still respect FFMPEG_MAX_CONCURRENCY.
+    """
+    return _get_semaphore()
+
+
+class FFmpegRunner:
+    """Runs FFmpeg and FFprobe as asyncio subprocesses."""
+
+    def __init__(
+        self,
+        ffmpeg_path: Optional[str] = None,
+        ffprobe_path: Optional[str] = None,
+        timeout: Optional[float] = None
+    ):
+        self.ffmpeg_path = ffmpeg_path or settings.FFMPPEG_PATH
+        self.ffprobe_path = ffprobe_path or settings.FFPROBE_PATH
+        self.timeout = timeout or settings.FFMPEG_TIMEOUT
+
+    def compile(self, stream: Any, overwrite_output: bool = True) -> List[str]:
+        """
+        Compile an ffmpeg-python stream graph into an argument list.
+
+        Args:
+            stream: ffmpeg-python output node
+            overwrite_output: Whether to pass -y
+
+        Returns:
+            Full FFmpeg command line as a list
+        """
+        args = ffmpeg.compile(stream, cmd=self.ffmpeg_path, overwrite_output=overwrite_output)
+        # Keep stderr small and never let ffmpeg wait on stdin
+        return [args[0], "-hide_banner", "-nostdin", "-loglevel", "error"] + args[1:]
+
+    async def run(
+        self,
+        stream_or_args: Union[Any, Sequence[str]],
+        timeout: Optional[float] = None,
+        progress: Optional[ProgressCallback] = None,
+        duration: Optional[float] = None,
+        stdout: Optional[BinaryIO] = None
+    ) -> bytes:
+        """
+        Run FFmpeg without blocking the event loop.
+
+        Args:
+            stream_or_args: ffmpeg-python output node or a full argument list
+            timeout: Timeout in seconds (default: FFMPEG_TIMEOUT)
+            progress: Async callback receiving FFmpegProgress snapshots;
+                stdout is then used for -progress output
+            duration: Expected output duration in seconds, for percent/ETA
+            stdout: File to receive the process's stdout directly (e.g. for
+                pipe:1 outputs), written from its current position
+
+        Returns:
+            Process stdout (empty when progress is reported or redirected)
+        """
+        if isinstance(stream_or_args, (list, tuple)):
+            args = list(stream_or_args)
+        else:
+            args = self.compile(stream_or_args)
+
+        line_handler = None
+        if progress is not None:
+            args = [args[0], "-progress", "pipe:1", "-nostats"] + args[1:]
+            line_handler = _ProgressParser(progress, duration).feed
+
+        output, _ = await self._execute(args, timeout or self.timeout, line_handler, stdout)
+        return output
+
+    async def run_report(self, stream: Any, timeout: Optional[float] = None) -> List[str]:
+        """
+        Run FFmpeg for a filter that reports its result in the log (e.g. the
+        ebur128 summary or trace_headers), logging at info level instead of
+        errors only.
+
+        Args:
+            stream: ffmpeg-python output node
+            timeout: Timeout in seconds (default: FFMPEG_TIMEOUT)
+
+        Returns:
+            The whole log, line by line
+        """
+        args = ffmpeg.compile(stream, cmd=self.ffmpeg_path, overwrite_output=True)
+        args = [args[0], "-hide_banner", "-nostdin", "-nostats", "-loglevel", "info"] + args[1:]
+
+        _, stderr = await self._execute(args, timeout or self.timeout, stderr_lines=None)
+        return stderr.splitlines()
+
+    async def probe(
+        self,
+        path: str,
+        args: Optional[Sequence[str]] = None,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Run FFprobe and parse its JSON output.
+
+        Args:
+            path: Path to media file
+            args: FFprobe arguments (default: -show_format -show_streams)
+            timeout: Timeout in seconds (default: FFPROBE_TIMEOUT)
+
+        Returns:
+            Parsed FFprobe output
+        """
+        probe_args = list(args) if args is not None else ["-show_format", "-show_streams"]
+        command = [
+            self.ffprobe_path, "-v", "error", *probe_args, "-of", "json", path
+        ]
+
+        stdout, _ = await self._execute(command, timeout or settings.FFPROBE_TIMEOUT)
+
+        try:
+            return json.loads(stdout.decode("utf-8") or "{}")
+        except ValueError as e:
+            raise ProcessingError(f"Invalid FFprobe output for {path}: {str(e)}")
+
+    async def probe_entries(
+        self,
+        path: str,
+        args: Sequence[str],
+        timeout: Optional[float] = None
+    ) -> List[List[str]]:
+        """
+        Run FFprobe with compact CSV output, for large per-packet listings.
+
+        Args:
+            path: Path to media file
+            args: FFprobe arguments selecting the entries to show
+            timeout: Timeout in seconds (default: FFMPEG_TIMEOUT)
+
+        Returns:
+            One list of field values per output row
+        """
+        command = [self.ffprobe_path, "-v", "error", *args, "-of", "csv=p=0", path]
+
+        stdout, _ = await self._execute(command, timeout or self.timeout)
+
+        return [
+            line.split(",")
+            for line in stdout.decode("utf-8", errors="replace").splitlines()
+            if line
+        ]
+
+    async def _execute(
+        self,
+        args: List[str],
+        timeout: float,
+        line_handler: Optional[Callable[[str], Awaitable[None]]] = None,
+        stdout: Optional[BinaryIO] = None,
+        stderr_lines: Optional[int] = STDERR_TAIL_LINES
+    ) -> Tuple[bytes, str]:
+        """
+        Execute a command under the global concurrency limit.
+
+        Args:
+            args: Command line
+            timeout: Timeout in seconds
+            line_handler: Consume stdout line by line instead of buffering it
+            stdout: File to hand the process as its stdout instead of a pipe
+            stderr_lines: Number of stderr lines kept (None keeps all)
+
+        Returns:
+            Tuple of (stdout, stderr tail)
+        """
+        async with _get_semaphore():
+            logger.debug(f"Running: {' '.join(args)}")
+
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *args,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=stdout if stdout is not None else asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+            except OSError as e:
+                raise ProcessingError(f"Failed to start {args[0]}: {str(e)}")
+
+            async def communicate() -> bytes:
+                if process.stdout is None:
+                    output = b""
+                elif line_handler is None:
+                    output = await process.stdout.read()
+                else:
+                    output = b""
+                    while True:
+                        line = await process.stdout.readline()
+                        if not line:
+                            break
+                        await line_handler(line.decode("utf-8", errors="replace").strip())
+                await process.wait()
+                return output
+
+            stderr_tail: Deque[str] = deque(maxlen=stderr_lines)
+            stderr_task = asyncio.ensure_future(_drain_lines(process.stderr, stderr_tail))
+
+            try:
+                stdout = await asyncio.wait_for(communicate(), timeout=timeout)
+                await stderr_task
+            except asyncio.TimeoutError:
+                raise ProcessingError(
+                    f"{args[0]} timed out after {timeout}s",
+                    errors={"stderr": "\n".join(stderr_tail)}
+                )
+            finally:
+                # Covers timeouts, callback errors and task cancellation alike
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+                if not stderr_task.done():
+                    stderr_task.cancel()
+
+            stderr = "\n".join(stderr_tail)
+
+            if process.returncode != 0:
+                logger.error(f"{args[0]} exited with {process.returncode}: {stderr}")
+                raise ProcessingError(
+                    f"{args[0]} exited with code {process.returncode}: {stderr[-500:]}",
+                    errors={"returncode": process.returncode, "stderr": stderr}
+                )
+
+            return stdout, stderr
+
+
+class _ProgressParser:
+    """Turns FFmpeg -progress key=value blocks into FFmpegProgress callbacks."""
+
+    def __init__(self, callback: ProgressCallback, duration: Optional[float]):
+        self.callback = callback
+        self.duration = duration if duration and duration > 0 else None
+        self.fields: Dict[str, str] = {}
+        self.last_out_time = 0.0
+
+    async def feed(self, line: str) -> None:
+        key, sep, value = line.partition("=")
+        if not sep:
+            return
+        if key != "progress":
+            self.fields[key.strip()] = value.strip()
+            return
+
+        fields, self.fields = self.fields, {}
+
+        # out_time_ms is actually in microseconds, same as out_time_us
+        out_time = _to_float(fields.get("out_time_us", fields.get("out_time_ms"))) / 1_000_000
+        # Reported as N/A while the muxer is flushing; keep the last known position
+        out_time = self.last_out_time = max(out_time, self.last_out_time)
+        speed = _to_float(fields.get("speed", "").rstrip("x"))
+        done = value.strip() == "end"
+
+        percent = None
+        eta = None
+        if self.duration:
+            percent = 100.0 if done else min(max(out_time / self.duration * 100.0, 0.0), 99.9)
+            if done:
+                eta = 0.0
+            elif speed > 0:
+                eta = max(self.duration - out_time, 0.0) / speed
+
+        await self.callback(FFmpegProgress(
+            out_time=out_time,
+            fps=_to_float(fields.get("fps")),
+            speed=speed,
+            percent=percent,
+            eta=eta,
+            done=done,
+        ))
+
+
+def _to_float(value: Optional[str]) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+async def _drain_lines(stream: asyncio.StreamReader, sink: Deque[str]) -> None:
+    """Read a stream line by line, keeping only the tail in sink."""
+    while True:
+        line = await stream.readline()
+        if not line:
+            break
+        sink.append(line.decode("utf-8", errors="replace").rstrip())
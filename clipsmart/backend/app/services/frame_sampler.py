@@ -0,0 +1,223 @@
+"""
+Streams downscaled decoded frames from FFmpeg into reusable NumPy buffers.
+"""
+
+import asyncio
+import logging
+import subprocess
+import tempfile
+from dataclasses import dataclass
+from typing import AsyncIterator, BinaryIO, Optional, Tuple
+
+import ffmpeg
+import numpy as np
+
+from app.core.config import get_settings
+from app.core.exceptions import ProcessingError
+from app.services.ffmpeg_runner import concurrency_slot
+
+settings = get_settings()
+logger = logging.getLogger("clipsmart.frame_sampler")
+
+
+@dataclass
+class FrameBatch:
+    """
+    A batch of decoded frames.
+
+    frames and timestamps are views into the sampler's buffers. Requesting
+    the next batch starts reading ahead into this batch's buffer, so they are
+    only valid until then; copy anything kept longer.
+    """
+    frames: np.ndarray  # (n, height, width) gray or (n, height, width, 3) RGB, uint8
+    timestamps: np.ndarray  # (n,) seconds on the source timeline
+    start_index: int  # index of the first frame within the sampled sequence
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+
+def fit_size(width: int, height: int, max_side: int) -> Tuple[int, int]:
+    """Scale (width, height) down so the long side is at most max_side, keeping sizes even."""
+    scale = min(1.0, max_side / max(width, height))
+    return max(2, int(width * scale) // 2 * 2), max(2, int(height * scale) // 2 * 2)
+
+
+class FrameSampler:
+    """
+    Decodes a video once into fixed-size uint8 frame batches.
+
+    Two preallocated batch buffers are filled alternately straight from the
+    FFmpeg pipe with readinto(), so no per-frame objects are allocated and
+    the next batch is read while the caller processes the current one.
+
+    Timestamps are derived from the sampling rate, which assumes a constant
+    frame rate source (true of ingest mezzanines and proxies).
+    """
+
+    def __init__(
+        self,
+        video_path: str,
+        size: Tuple[int, int],
+        source_fps: float,
+        fps: Optional[float] = None,
+        stride: int = 1,
+        gray: bool = False,
+        batch_size: Optional[int] = None,
+        start_time: float = 0.0,
+        end_time: Optional[float] = None
+    ):
+        """
+        Args:
+            video_path: Video to decode
+            size: Output (width, height); see fit_size()
+            source_fps: Frame rate of the source
+            fps: Resample to this rate before striding (default: source rate)
+            stride: Keep every Nth frame after resampling
+            gray: Yield single-channel luma instead of RGB
+            batch_size: Frames per batch (default: FRAME_SAMPLER_BATCH_SIZE)
+            start_time: Start of the range to decode in seconds
+            end_time: End of the range to decode in seconds
+        """
+        self.video_path = video_path
+        self.width, self.height = size
+        self.fps = fps
+        self.stride = max(1, int(stride))
+        self.gray = gray
+        self.batch_size = batch_size or settings.FRAME_SAMPLER_BATCH_SIZE
+        self.start_time = start_time
+        self.end_time = end_time
+
+        # Seconds between consecutive sampled frames
+        self.interval = self.stride / (fps or source_fps)
+
+        self.frame_shape = (self.height, self.width) if gray else (self.height, self.width, 3)
+        self.frame_bytes = int(np.prod(self.frame_shape))
+
+    @classmethod
+    async def for_video(cls, video_path: str, max_side: Optional[int] = None, **kwargs) -> "FrameSampler":
+        """
+        Create a sampler sized from the video's own dimensions.
+
+        Args:
+            video_path: Video to decode
+            max_side: Long-side size of sampled frames (default: FRAME_SAMPLER_MAX_SIDE)
+            **kwargs: Further FrameSampler arguments
+
+        Returns:
+            Configured FrameSampler
+        """
+        from app.services.video_processor import VideoProcessorService
+
+        metadata = await VideoProcessorService().get_video_metadata(video_path)
+        size = fit_size(metadata['width'], metadata['height'], max_side or settings.FRAME_SAMPLER_MAX_SIDE)
+        return cls(video_path, size, source_fps=metadata['fps'], **kwargs)
+
+    def _command(self) -> list:
+        input_kwargs = {}
+        if self.start_time:
+            input_kwargs['ss'] = self.start_time
+        if self.end_time is not None:
+            input_kwargs['t'] = self.end_time - self.start_time
+
+        video = ffmpeg.input(self.video_path, **input_kwargs).video
+        if self.fps:
+            video = video.filter('fps', fps=self.fps)
+        if self.stride > 1:
+            video = video.filter('select', f"not(mod(n,{self.stride}))")
+        video = video.filter('scale', self.width, self.height)
+
+        args = ffmpeg.output(
+            video,
+            'pipe:1',
+            format='rawvideo',
+            pix_fmt='gray' if self.gray else 'rgb24',
+            fps_mode='passthrough'
+        ).compile(cmd=settings.FFMPPEG_PATH)
+        return [args[0], "-hide_banner", "-nostdin", "-loglevel", "error"] + args[1:]
+
+    def _fill(self, pipe: BinaryIO, buffer: np.ndarray) -> int:
+        """Read whole frames into buffer; returns the number of frames read."""
+        view = memoryview(buffer).cast("B")
+        total = 0
+        while total < len(view):
+            read = pipe.readinto(view[total:])
+            if not read:
+                break
+            total += read
+        return total // self.frame_bytes
+
+    async def batches(self) -> AsyncIterator[FrameBatch]:
+        """
+        Decode the video and yield frame batches.
+
+        Yields:
+            FrameBatch views into the sampler's buffers
+        """
+        loop = asyncio.get_running_loop()
+        buffers = [np.empty((self.batch_size, *self.frame_shape), dtype=np.uint8) for _ in range(2)]
+        timestamps = [np.empty(self.batch_size, dtype=np.float64) for _ in range(2)]
+        command = self._command()
+
+        async with concurrency_slot():
+            logger.debug(f"Sampling frames: {' '.join(command)}")
+
+            with tempfile.TemporaryFile() as stderr:
+                try:
+                    process = subprocess.Popen(
+                        command,
+                        stdin=subprocess.DEVNULL,
+                        stdout=subprocess.PIPE,
+                        stderr=stderr,
+                        bufsize=0
+                    )
+                except OSError as e:
+                    raise ProcessingError(f"Failed to start {command[0]}: {str(e)}")
+
+                index = 0
+                pending = None
+                try:
+                    current = 0
+                    pending = loop.run_in_executor(None, self._fill, process.stdout, buffers[current])
+                    while True:
+                        count = await pending
+                        if not count:
+                            break
+
+                        # Read ahead into the other buffer while the caller works
+                        pending = loop.run_in_executor(None, self._fill, process.stdout, buffers[1 - current])
+
+                        batch_timestamps = timestamps[current][:count]
+                        np.multiply(np.arange(index, index + count), self.interval, out=batch_timestamps)
+                        batch_timestamps += self.start_time
+
+                        yield FrameBatch(
+                            frames=buffers[current][:count],
+                            timestamps=batch_timestamps,
+                            start_index=index
+                        )
+
+                        index += count
+                        current = 1 - current
+
+                    returncode = await loop.run_in_executor(None, process.wait)
+
+                finally:
+                    # Caller stopped early or failed: don't leave ffmpeg blocked on the pipe
+                    if process.poll() is None:
+                        process.kill()
+                        await loop.run_in_executor(None, process.wait)
+                    if pending is not None and not pending.done():
+                        # The pipe is at EOF once ffmpeg is gone, so this returns promptly
+                        await asyncio.wait([pending])
+                    process.stdout.close()
+
+                if returncode != 0:
+                    stderr.seek(0)
+                    detail = stderr.read().decode("utf-8", errors="replace")[-500:]
+                    raise ProcessingError(
+                        f"{command[0]} exited with code {returncode}: {detail}",
+                        errors={"returncode": returncode, "stderr": detail}
+                    )
+
+        logger.info(f"Sampled {index} frames from {self.video_path}")
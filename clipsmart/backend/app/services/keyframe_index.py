@@ -0,0 +1,457 @@
+"""
+Persisted per-video keyframe (GOP) index.
+"""
+
+import os
+import sys
+import struct
+import logging
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Tuple
+
+from cachetools import LRUCache
+
+from app.core.exceptions import ProcessingError
+from app.services.ffmpeg_runner import FFmpegRunner
+
+logger = logging.getLogger("clipsmart.keyframe_index")
+
+INDEX_SUFFIX = ".kfidx"
+INDEX_MAGIC = b"CSKF"
+INDEX_VERSION = 3
+
+# magic, version, keyframe count, source size, source mtime (ns), duration
+_HEADER = struct.Struct("<4sHIqqd")
+
+# Trailer: init section size, end of the last fragment, fragment count
+_FRAGMENTS = struct.Struct("<qqI")
+
+# MP4 box header: 32-bit size and type; size 1 means a 64-bit size follows
+_BOX = struct.Struct(">I4s")
+_LARGE_SIZE = struct.Struct(">Q")
+
+# Loaded indexes keyed by index path, validated against the source file on load
+_loaded: "LRUCache[str, Tuple[int, KeyframeIndex]]" = LRUCache(maxsize=256)
+
+
+def scan_fragments(video_path: str) -> Tuple[int, int, List[int]]:
+    """
+    Walk the top-level boxes of a fragmented MP4, reading only box headers.
+
+    Args:
+        video_path: Path to video file
+
+    Returns:
+        (init section size, end offset of the last fragment, moof offsets);
+        no moof offsets for files that are not fragmented MP4. The init
+        section ends with the moov box, leaving out any sidx before the
+        first fragment.
+    """
+    init_size = 0
+    fragments_end = 0
+    moofs: List[int] = []
+
+    size = os.path.getsize(video_path)
+    with open(video_path, "rb") as f:
+        position = 0
+        while position + _BOX.size <= size:
+            f.seek(position)
+            box_size, box_type = _BOX.unpack(f.read(_BOX.size))
+            if box_size == 1:
+                box_size = _LARGE_SIZE.unpack(f.read(_LARGE_SIZE.size))[0]
+            elif box_size == 0:
+                box_size = size - position
+            if box_size < _BOX.size:
+                # Corrupt or non-MP4 data; whatever was found so far is unusable
+                return 0, 0, []
+
+            if box_type == b"moov" and not moofs:
+                init_size = position + box_size
+            if box_type == b"moof":
+                moofs.append(position)
+            if moofs and box_type in (b"moof", b"mdat"):
+                fragments_end = position + box_size
+
+            position += box_size
+
+    return init_size, fragments_end, moofs
+
+
+class KeyframeIndex:
+    """
+    Sorted keyframe timestamps and byte offsets for a video's first video stream.
+
+    For fragmented MP4s it also holds the moof offset and start time of
+    every fragment, so whole fragments can be addressed by byte range;
+    both are empty for files that are not fragmented.
+    """
+
+    def __init__(
+        self,
+        timestamps: array,
+        offsets: array,
+        duration: float = 0.0,
+        source_size: int = 0,
+        source_mtime_ns: int = 0,
+        fragment_times: Optional[array] = None,
+        fragment_offsets: Optional[array] = None,
+        init_size: int = 0,
+        fragments_end: int = 0
+    ):
+        self.timestamps = timestamps
+        self.offsets = offsets
+        self.duration = duration
+        self.source_size = source_size
+        self.source_mtime_ns = source_mtime_ns
+        self.fragment_times = fragment_times if fragment_times is not None else array("d")
+        self.fragment_offsets = fragment_offsets if fragment_offsets is not None else array("q")
+        self.init_size = init_size
+        self.fragments_end = fragments_end
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @staticmethod
+    def path_for(video_path: str) -> str:
+        """Get the sidecar index path for a video file."""
+        return f"{video_path}{INDEX_SUFFIX}"
+
+    @classmethod
+    async def build(cls, video_path: str, runner: Optional[FFmpegRunner] = None) -> "KeyframeIndex":
+        """
+        Build an index from FFprobe packet data (no decoding).
+
+        Args:
+            video_path: Path to video file
+            runner: FFmpeg runner to use
+
+        Returns:
+            KeyframeIndex for the file
+        """
+        runner = runner or FFmpegRunner()
+        stat = os.stat(video_path)
+
+        rows = await runner.probe_entries(video_path, [
+            "-select_streams", "v:0",
+            "-show_entries", "packet=pts_time,pos,flags",
+        ])
+
+        timestamps = array("d")
+        offsets = array("q")
+        duration = 0.0
+
+        for row in rows:
+            if len(row) < 3:
+                continue
+            try:
+                pts = float(row[0])
+            except ValueError:
+                continue
+            duration = max(duration, pts)
+            if "K" not in row[2]:
+                continue
+            try:
+                offset = int(row[1])
+            except ValueError:
+                offset = -1
+            timestamps.append(pts)
+            offsets.append(offset)
+
+        if not timestamps:
+            raise ProcessingError(f"No keyframes found in {video_path}")
+
+        # Packets arrive in decode order; keyframes are monotonic in practice
+        # but sort defensively to keep bisect lookups valid.
+        if any(timestamps[i] > timestamps[i + 1] for i in range(len(timestamps) - 1)):
+            pairs = sorted(zip(timestamps, offsets))
+            timestamps = array("d", (t for t, _ in pairs))
+            offsets = array("q", (o for _, o in pairs))
+
+        index = cls(timestamps, offsets, duration, stat.st_size, stat.st_mtime_ns)
+        index._map_fragments(*scan_fragments(video_path))
+
+        logger.info(
+            f"Indexed {len(timestamps)} keyframes and {len(index.fragment_times)} fragments in {video_path}"
+        )
+        return index
+
+    def _map_fragments(self, init_size: int, fragments_end: int, moofs: List[int]) -> None:
+        """
+        Time each fragment by the keyframe whose packet lies inside it.
+
+        Keyframe packet positions come from FFprobe, so fragment times are
+        presentation times regardless of edit lists or B-frame delay.
+        Fragments holding no keyframe are folded into the previous one.
+        """
+        self.fragment_times = array("d")
+        self.fragment_offsets = array("q")
+        self.init_size = init_size
+        self.fragments_end = fragments_end
+        if not moofs:
+            return
+
+        starts: List[Optional[float]] = [None] * len(moofs)
+        for pts, offset in zip(self.timestamps, self.offsets):
+            i = bisect_right(moofs, offset) - 1
+            if offset < 0 or i < 0 or offset >= fragments_end:
+                continue
+            if starts[i] is None or pts < starts[i]:
+                starts[i] = pts
+
+        for moof, start in zip(moofs, starts):
+            if start is None:
+                continue
+            if self.fragment_times and start <= self.fragment_times[-1]:
+                logger.warning("Fragments out of presentation order; not indexing them")
+                self.fragment_times = array("d")
+                self.fragment_offsets = array("q")
+                return
+            self.fragment_times.append(start)
+            self.fragment_offsets.append(moof)
+
+    def save(self, index_path: str) -> str:
+        """
+        Write the index atomically in its compact binary form.
+
+        Args:
+            index_path: Destination path
+
+        Returns:
+            Path to written index
+        """
+        timestamps, offsets = self.timestamps, self.offsets
+        fragment_times, fragment_offsets = self.fragment_times, self.fragment_offsets
+        if sys.byteorder != "little":
+            timestamps, offsets = array("d", timestamps), array("q", offsets)
+            fragment_times, fragment_offsets = array("d", fragment_times), array("q", fragment_offsets)
+            for values in (timestamps, offsets, fragment_times, fragment_offsets):
+                values.byteswap()
+
+        temp_path = f"{index_path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(_HEADER.pack(
+                INDEX_MAGIC,
+                INDEX_VERSION,
+                len(self.timestamps),
+                self.source_size,
+                self.source_mtime_ns,
+                self.duration,
+            ))
+            timestamps.tofile(f)
+            offsets.tofile(f)
+            f.write(_FRAGMENTS.pack(self.init_size, self.fragments_end, len(fragment_times)))
+            fragment_times.tofile(f)
+            fragment_offsets.tofile(f)
+        os.replace(temp_path, index_path)
+
+        return index_path
+
+    @classmethod
+    def load(cls, index_path: str) -> "KeyframeIndex":
+        """
+        Read an index written by save().
+
+        Indexes written by any other INDEX_VERSION are rejected as stale, so
+        for_video() ignores them and they are rebuilt.
+
+        Args:
+            index_path: Path to index file
+
+        Returns:
+            Loaded KeyframeIndex
+        """
+        with open(index_path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                raise ProcessingError(f"Truncated keyframe index: {index_path}")
+
+            magic, version, count, size, mtime_ns, duration = _HEADER.unpack(header)
+            if magic != INDEX_MAGIC:
+                raise ProcessingError(f"Unsupported keyframe index: {index_path}")
+            if version != INDEX_VERSION:
+                raise ProcessingError(f"Stale keyframe index (version {version}): {index_path}")
+
+            timestamps = array("d")
+            offsets = array("q")
+            fragment_times = array("d")
+            fragment_offsets = array("q")
+            try:
+                timestamps.fromfile(f, count)
+                offsets.fromfile(f, count)
+
+                trailer = f.read(_FRAGMENTS.size)
+                if len(trailer) != _FRAGMENTS.size:
+                    raise EOFError
+                init_size, fragments_end, fragment_count = _FRAGMENTS.unpack(trailer)
+                fragment_times.fromfile(f, fragment_count)
+                fragment_offsets.fromfile(f, fragment_count)
+            except EOFError:
+                raise ProcessingError(f"Truncated keyframe index: {index_path}")
+
+        if sys.byteorder != "little":
+            for values in (timestamps, offsets, fragment_times, fragment_offsets):
+                values.byteswap()
+
+        return cls(
+            timestamps, offsets, duration, size, mtime_ns,
+            fragment_times, fragment_offsets, init_size, fragments_end
+        )
+
+    @classmethod
+    def for_video(cls, video_path: str) -> Optional["KeyframeIndex"]:
+        """
+        Get the persisted index for a video, if present and current.
+
+        Args:
+            video_path: Path to video file
+
+        Returns:
+            KeyframeIndex, or None if the file has not been indexed
+        """
+        index_path = cls.path_for(video_path)
+
+        try:
+            stat = os.stat(video_path)
+            index_mtime = os.stat(index_path).st_mtime_ns
+        except OSError:
+            return None
+
+        cached = _loaded.get(index_path)
+        if cached and cached[0] == index_mtime:
+            index = cached[1]
+        else:
+            try:
+                index = cls.load(index_path)
+            except (OSError, ProcessingError) as e:
+                logger.warning(f"Ignoring unreadable keyframe index {index_path}: {str(e)}")
+                return None
+            _loaded[index_path] = (index_mtime, index)
+
+        # Stale if the source changed after indexing
+        if index.source_size != stat.st_size or index.source_mtime_ns != stat.st_mtime_ns:
+            return None
+
+        return index
+
+    def keyframe_before(self, t: float) -> Optional[float]:
+        """Latest keyframe at or before t."""
+        i = bisect_right(self.timestamps, t)
+        return self.timestamps[i - 1] if i else None
+
+    def keyframe_after(self, t: float) -> Optional[float]:
+        """Earliest keyframe at or after t."""
+        i = bisect_left(self.timestamps, t)
+        return self.timestamps[i] if i < len(self.timestamps) else None
+
+    def nearest_keyframe(self, t: float) -> Optional[float]:
+        """Keyframe closest to t."""
+        before = self.keyframe_before(t)
+        after = self.keyframe_after(t)
+        if before is None:
+            return after
+        if after is None:
+            return before
+        return before if t - before <= after - t else after
+
+    def keyframes_between(self, start: float, end: float) -> List[float]:
+        """Keyframes inside [start, end], i.e. the GOP boundaries within the range."""
+        return list(self.timestamps[bisect_left(self.timestamps, start):bisect_right(self.timestamps, end)])
+
+    def gops(self, start: float, end: float) -> List[Tuple[float, float]]:
+        """
+        GOP spans overlapping [start, end].
+
+        Args:
+            start: Range start in seconds
+            end: Range end in seconds
+
+        Returns:
+            List of (gop_start, gop_end) tuples; the last GOP ends at duration
+        """
+        first = max(bisect_right(self.timestamps, start) - 1, 0)
+        last = bisect_left(self.timestamps, end)
+
+        spans = []
+        for i in range(first, min(last, len(self.timestamps))):
+            gop_end = self.timestamps[i + 1] if i + 1 < len(self.timestamps) else self.duration
+            spans.append((self.timestamps[i], gop_end))
+        return spans
+
+    def split_points(self, start: float, end: float, segment_seconds: float) -> List[float]:
+        """
+        Keyframes cutting [start, end] into spans of at least segment_seconds.
+
+        Args:
+            start: Range start in seconds
+            end: Range end in seconds
+            segment_seconds: Target span length
+
+        Returns:
+            Ordered cut points strictly inside the range
+        """
+        points = []
+        target = start + segment_seconds
+        while target < end:
+            keyframe = self.keyframe_after(target)
+            # Fold a short remainder into the last span rather than cut a sliver
+            if keyframe is None or end - keyframe < segment_seconds / 2:
+                break
+            points.append(keyframe)
+            target = keyframe + segment_seconds
+        return points
+
+    def offset_of(self, t: float) -> Optional[int]:
+        """Byte offset of the latest keyframe at or before t, if known."""
+        i = bisect_right(self.timestamps, t)
+        if not i or self.offsets[i - 1] < 0:
+            return None
+        return self.offsets[i - 1]
+
+    @property
+    def fragmented(self) -> bool:
+        """Whether fragment byte ranges and the init section are known for the file."""
+        return bool(self.fragment_times) and self.init_size > 0
+
+    def fragment_ranges(self, start: float, end: float, segment_seconds: float) -> List[Tuple[float, float, int, int]]:
+        """
+        Byte ranges of the whole fragments covering [start, end].
+
+        Consecutive fragments are grouped into spans of at least
+        segment_seconds; their bytes are contiguous, so each group is one
+        range.
+
+        Args:
+            start: Range start in seconds
+            end: Range end in seconds
+            segment_seconds: Target span length
+
+        Returns:
+            List of (span_start, span_end, byte_offset, byte_length) tuples;
+            empty when the file is not fragmented
+        """
+        times = self.fragment_times
+        if not times:
+            return []
+
+        first = max(bisect_right(times, start) - 1, 0)
+        stop = max(bisect_left(times, end), first + 1)
+
+        cuts = [first]
+        for i in range(first + 1, stop):
+            if times[i] - times[cuts[-1]] >= segment_seconds:
+                cuts.append(i)
+
+        ranges = []
+        for i, j in zip(cuts, cuts[1:] + [stop]):
+            if j < len(times):
+                span_end = times[j]
+            elif self.duration > times[j - 1]:
+                span_end = self.duration
+            else:
+                # Duration unknown past the last fragment; assume it is as long as the one before
+                span_end = times[j - 1] + (times[j - 1] - times[j - 2] if j > 1 else segment_seconds)
+            byte_end = self.fragment_offsets[j] if j < len(times) else self.fragments_end
+            offset = self.fragment_offsets[i]
+            ranges.append((times[i], span_end, offset, byte_end - offset))
+        return ranges
@@ -0,0 +1,307 @@
+"""
+Layout engine for compositing several clips into one frame.
+
+Layouts are computed as cell rectangles. Cells that tile the frame are
+rendered with a single xstack filter; cells drawn over an earlier one
+(picture-in-picture insets) are overlaid on the stacked frame afterwards.
+Clips with a crop track are cropped to their cell's aspect ratio first
+instead of being letterboxed.
+"""
+
+import math
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import ffmpeg
+
+from app.core.config import get_settings
+from app.core.exceptions import ProcessingError
+
+settings = get_settings()
+logger = logging.getLogger("clipsmart.layout_engine")
+
+# Picture-in-picture inset size and margin, as fractions of the output frame
+PIP_INSET_SCALE = 0.3
+PIP_MARGIN = 0.03
+
+# Share of the long axis given to the featured clip in spotlight layouts
+SPOTLIGHT_SHARE = 2 / 3
+
+
+@dataclass
+class Cell:
+    """A clip's rectangle on the output canvas, in pixels."""
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+def _even(value: float) -> int:
+    """Round down to an even pixel count (4:2:0 chroma needs even sizes)."""
+    return int(value) // 2 * 2
+
+
+def _splits(total: int, parts: int) -> List[int]:
+    """Even-aligned boundaries dividing total into parts roughly equal spans."""
+    return [_even(total * i / parts) for i in range(parts)] + [total]
+
+
+def _stack(count: int, width: int, height: int) -> List[Cell]:
+    """One row per clip on portrait canvases, one column per clip otherwise."""
+    if height >= width:
+        ys = _splits(height, count)
+        return [Cell(0, ys[i], width, ys[i + 1] - ys[i]) for i in range(count)]
+
+    xs = _splits(width, count)
+    return [Cell(xs[i], 0, xs[i + 1] - xs[i], height) for i in range(count)]
+
+
+def _grid(count: int, width: int, height: int) -> List[Cell]:
+    """Near-square grid; a short last row is centred."""
+    # Favour more rows on portrait canvases so cells stay close to square
+    if height >= width:
+        rows = math.ceil(math.sqrt(count))
+        cols = math.ceil(count / rows)
+    else:
+        cols = math.ceil(math.sqrt(count))
+        rows = math.ceil(count / cols)
+
+    xs = _splits(width, cols)
+    ys = _splits(height, rows)
+    cell_width = width // cols
+
+    cells = []
+    for i in range(count):
+        row, col = divmod(i, cols)
+        in_row = min(cols, count - row * cols)
+        offset = _even((cols - in_row) * cell_width / 2)
+        cells.append(Cell(xs[col] + offset, ys[row], xs[col + 1] - xs[col], ys[row + 1] - ys[row]))
+    return cells
+
+
+def _pip(count: int, width: int, height: int) -> List[Cell]:
+    """First clip fills the frame; the rest are insets along the bottom edge."""
+    cells = [Cell(0, 0, width, height)]
+    insets = count - 1
+    if not insets:
+        return cells
+
+    margin = _even(min(width, height) * PIP_MARGIN)
+    scale = min(PIP_INSET_SCALE, (1 - PIP_MARGIN * (insets + 1)) / insets)
+    inset_width = _even(width * scale)
+    inset_height = _even(height * scale)
+
+    # Fill from the bottom-right corner leftwards
+    for i in range(insets):
+        x = width - margin - (i + 1) * inset_width - i * margin
+        cells.append(Cell(max(0, x), height - margin - inset_height, inset_width, inset_height))
+    return cells
+
+
+def _spotlight(count: int, width: int, height: int) -> List[Cell]:
+    """First clip takes most of the long axis; the rest share the remainder."""
+    if count == 1:
+        return [Cell(0, 0, width, height)]
+
+    rest = count - 1
+    if height >= width:
+        split = _even(height * SPOTLIGHT_SHARE)
+        xs = _splits(width, rest)
+        return [Cell(0, 0, width, split)] + [
+            Cell(xs[i], split, xs[i + 1] - xs[i], height - split) for i in range(rest)
+        ]
+
+    split = _even(width * SPOTLIGHT_SHARE)
+    ys = _splits(height, rest)
+    return [Cell(0, 0, split, height)] + [
+        Cell(split, ys[i], width - split, ys[i + 1] - ys[i]) for i in range(rest)
+    ]
+
+
+LAYOUTS: Dict[str, Callable[[int, int, int], List[Cell]]] = {
+    "split_screen": _stack,
+    "grid": _grid,
+    "pip": _pip,
+    "spotlight": _spotlight,
+}
+
+
+def compute_layout(layout: str, count: int, width: int, height: int) -> List[Cell]:
+    """
+    Compute cell geometry for a layout.
+
+    Args:
+        layout: Layout type (split_screen, grid, pip, spotlight)
+        count: Number of clips
+        width: Output width
+        height: Output height
+
+    Returns:
+        One cell per clip, in clip order (later cells draw on top)
+    """
+    if layout not in LAYOUTS:
+        raise ProcessingError(f"Unsupported layout: {layout}")
+    if count < 1:
+        raise ProcessingError("Layout needs at least one clip")
+
+    return LAYOUTS[layout](count, width, height)
+
+
+def _overlaps(a: Cell, b: Cell) -> bool:
+    """Whether two cells share any pixels."""
+    return (
+        a.x < b.x + b.width and b.x < a.x + a.width
+        and a.y < b.y + b.height and b.y < a.y + a.height
+    )
+
+
+def shift_track(track: Optional[Dict[str, List[float]]], offset: float) -> Optional[Dict[str, List[float]]]:
+    """
+    Move a track's time origin, e.g. to the start of a render window.
+
+    Args:
+        track: Crop track (see reframe.CropTracker)
+        offset: Clip time that becomes t=0
+
+    Returns:
+        Shifted track (None stays None)
+    """
+    if not track or not offset:
+        return track
+    return {**track, "times": [round(time - offset, 3) for time in track["times"]]}
+
+
+def track_expression(times: List[float], values: List[float]) -> str:
+    """
+    ffmpeg expression of t interpolating linearly through keypoints.
+
+    Written as a sum of clipped ramps, so it holds the first and last values
+    outside the track without nested conditionals.
+
+    Args:
+        times: Keypoint times in seconds
+        values: Keypoint values
+
+    Returns:
+        Expression string
+    """
+    terms = [f"{values[0]:.4f}"]
+    for t0, t1, v0, v1 in zip(times, times[1:], values, values[1:]):
+        if v1 == v0 or t1 <= t0:
+            continue
+        terms.append(f"{(v1 - v0) / (t1 - t0):+.5f}*clip(t{-t0:+.3f},0,{t1 - t0:.3f})")
+    return "".join(terms)
+
+
+def _reframe(video: Any, track: Optional[Dict[str, List[float]]], cell: Cell) -> Any:
+    """Crop a stream to its cell's aspect ratio, following a crop track."""
+    if not track:
+        return video
+
+    aspect = cell.width / cell.height
+    x = track_expression(track["times"], track["x"])
+    y = track_expression(track["times"], track["y"])
+    return video.filter(
+        'crop',
+        w=f"trunc(min(iw,ih*{aspect:.6f})/2)*2",
+        h=f"trunc(min(ih,iw/{aspect:.6f})/2)*2",
+        x=f"max(0,min(iw-ow,({x})*iw-ow/2))",
+        y=f"max(0,min(ih-oh,({y})*ih-oh/2))"
+    )
+
+
+def _fit(video: Any, cell: Cell, fill: str) -> Any:
+    """Scale a stream to fit its cell, preserving aspect ratio, and pad the rest."""
+    return (
+        video
+        .filter('scale', cell.width, cell.height, force_original_aspect_ratio='decrease')
+        .filter('pad', cell.width, cell.height, '(ow-iw)/2', '(oh-ih)/2', color=fill)
+        .filter('setsar', 1)
+        .filter('format', 'yuv420p')
+    )
+
+
+def fit_frame(
+    video: Any,
+    width: int,
+    height: int,
+    fill: Optional[str] = None,
+    crop_track: Optional[Dict[str, List[float]]] = None
+) -> Any:
+    """
+    Fit one stream to a full output frame without distorting it.
+
+    Args:
+        video: ffmpeg-python video stream
+        width: Output width
+        height: Output height
+        fill: Background colour for letterboxing
+        crop_track: Optional crop track to reframe along instead
+
+    Returns:
+        Fitted video stream
+    """
+    cell = Cell(0, 0, width, height)
+    return _fit(_reframe(video, crop_track, cell), cell, fill or settings.LAYOUT_FILL_COLOR)
+
+
+def compose(
+    videos: List[Any],
+    layout: str,
+    width: int,
+    height: int,
+    fill: Optional[str] = None,
+    crop_tracks: Optional[List[Optional[Dict[str, List[float]]]]] = None
+) -> Any:
+    """
+    Composite video streams into one frame.
+
+    Cells that do not overlap an earlier cell are laid out with one xstack
+    filter; the rest are overlaid on top of it in clip order, since xstack
+    does not define which input wins where cells overlap.
+
+    Args:
+        videos: ffmpeg-python video streams, one per clip
+        layout: Layout type (split_screen, grid, pip, spotlight)
+        width: Output width
+        height: Output height
+        fill: Background colour for uncovered pixels and letterboxing
+        crop_tracks: Optional crop track per clip (see reframe.CropTracker);
+            clips without one are letterboxed
+
+    Returns:
+        Composited video stream
+    """
+    fill = fill or settings.LAYOUT_FILL_COLOR
+    cells = compute_layout(layout, len(videos), width, height)
+    tracks = crop_tracks or [None] * len(videos)
+    fitted = [
+        _fit(_reframe(video, track, cell), cell, fill)
+        for video, track, cell in zip(videos, tracks, cells)
+    ]
+
+    tiled = []
+    insets = []
+    for i, cell in enumerate(cells):
+        if any(_overlaps(cell, earlier) for earlier in cells[:i]):
+            insets.append(i)
+        else:
+            tiled.append(i)
+
+    # xstack needs two or more inputs; a lone clip already fills the frame
+    if len(tiled) == 1:
+        joined = fitted[tiled[0]]
+    else:
+        joined = ffmpeg.filter(
+            [fitted[i] for i in tiled],
+            'xstack',
+            inputs=len(tiled),
+            layout='|'.join(f"{cells[i].x}_{cells[i].y}" for i in tiled),
+            fill=fill
+        )
+
+    for i in insets:
+        joined = ffmpeg.filter([joined, fitted[i]], 'overlay', x=cells[i].x, y=cells[i].y)
+    return joined
@@ -0,0 +1,196 @@
+"""
+On-box video analysis from a single decode of the analysis proxy and of the
+audio track.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import get_settings
+from app.core.exceptions import ProcessingError
+from app.models.video import Video
+from app.services.audio_analyzer import AudioAnalyzer
+from app.services.audio_cache import AudioCache
+from app.services.beat_tracker import BeatTracker
+from app.services.boundary_refiner import BoundaryRefiner, DeadFrameDetector
+from app.services.frame_sampler import FrameSampler, fit_size
+from app.services.scene_detector import SceneDetector
+from app.services.visual_features import VisualFeatureExtractor
+
+settings = get_settings()
+logger = logging.getLogger("clipsmart.local_analysis")
+
+
+class LocalAnalysisService:
+    """Runs the local frame and audio analyzers for a video."""
+
+    def __init__(self):
+        self.audio_cache = AudioCache()
+
+    async def _sampler(self, video: Video) -> FrameSampler:
+        """Grayscale sampler over the analysis proxy at the scene sampling rate."""
+        kwargs = {"fps": settings.SCENE_SAMPLE_FPS, "gray": True}
+        if video.width and video.height:
+            # The proxy keeps the source aspect ratio, so no probe is needed
+            size = fit_size(video.width, video.height, settings.FRAME_SAMPLER_MAX_SIDE)
+            return FrameSampler(
+                video.analysis_source_path,
+                size,
+                source_fps=video.fps or settings.SCENE_SAMPLE_FPS,
+                **kwargs
+            )
+        return await FrameSampler.for_video(video.analysis_source_path, **kwargs)
+
+    async def _analyze_frames(self, video: Video) -> Dict[str, Any]:
+        """Feed one FrameSampler pass to every enabled frame analyzer."""
+        loop = asyncio.get_running_loop()
+        sampler = await self._sampler(video)
+
+        analyzers = {}
+        if settings.SCENE_DETECTION_ENABLED:
+            analyzers["scene_cuts"] = SceneDetector()
+        if settings.BOUNDARY_REFINEMENT_ENABLED:
+            analyzers["frame_stats"] = DeadFrameDetector()
+        if settings.VISUAL_FEATURES_ENABLED:
+            analyzers["visual_features"] = VisualFeatureExtractor()
+
+        def update(batch):
+            for analyzer in analyzers.values():
+                analyzer.update(batch)
+
+        async for batch in sampler.batches():
+            # Scoring is NumPy-bound; keep it off the event loop
+            await loop.run_in_executor(None, update, batch)
+
+        return {name: analyzer.finish() for name, analyzer in analyzers.items()}
+
+    async def _analyze_audio(self, video: Video) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """Analyze the decoded audio track and its beats; (None, None) for silent videos."""
+        try:
+            samples = await self.audio_cache.get(video.edit_source_path)
+        except ProcessingError as e:
+            logger.warning(f"No audio to analyze for {video.id}: {e.detail}")
+            return None, None
+
+        loop = asyncio.get_running_loop()
+        sample_rate = self.audio_cache.sample_rate
+
+        audio_analysis = None
+        if settings.AUDIO_ANALYSIS_ENABLED:
+            audio_analysis = await loop.run_in_executor(None, AudioAnalyzer(sample_rate).analyze, samples)
+
+        beat_grid = None
+        if settings.BEAT_SYNC_ENABLED:
+            beat_grid = await loop.run_in_executor(None, BeatTracker(sample_rate).track, samples)
+
+        return audio_analysis, beat_grid
+
+    async def beat_grid(self, video: Video) -> Optional[Dict[str, Any]]:
+        """
+        A video's beat grid, tracked from the cached PCM if not stored yet.
+
+        Sets video.beat_grid; the caller commits.
+
+        Args:
+            video: Source video
+
+        Returns:
+            Beat grid, or None when disabled or the video has no audio
+        """
+        if video.beat_grid is not None or not settings.BEAT_SYNC_ENABLED:
+            return video.beat_grid
+
+        try:
+            samples = await self.audio_cache.get(video.edit_source_path)
+        except ProcessingError as e:
+            logger.warning(f"No audio to track beats for {video.id}: {e.detail}")
+            return None
+
+        tracker = BeatTracker(self.audio_cache.sample_rate)
+        video.beat_grid = await asyncio.get_running_loop().run_in_executor(None, tracker.track, samples)
+        return video.beat_grid
+
+    async def analyze(self, video: Video) -> Dict[str, Any]:
+        """
+        Run every enabled local analyzer.
+
+        Sets video.scene_cuts, video.audio_analysis, video.visual_features and
+        video.beat_grid; the caller commits.
+
+        Args:
+            video: Video to analyze
+
+        Returns:
+            Dict with scene_cuts, audio_analysis, visual_features, beat_grid
+            and the transient per-frame frame_stats used for boundary
+            refinement (None when disabled)
+        """
+        frames = None
+        if (
+            settings.SCENE_DETECTION_ENABLED
+            or settings.BOUNDARY_REFINEMENT_ENABLED
+            or settings.VISUAL_FEATURES_ENABLED
+        ):
+            frames = self._analyze_frames(video)
+        audio = None
+        if settings.AUDIO_ANALYSIS_ENABLED or settings.BEAT_SYNC_ENABLED:
+            audio = self._analyze_audio(video)
+
+        # Frame and audio decodes are independent; run them side by side
+        frame_results, (audio_analysis, beat_grid) = await asyncio.gather(
+            frames or asyncio.sleep(0, {}),
+            audio or asyncio.sleep(0, (None, None))
+        )
+        scene_cuts = frame_results.get("scene_cuts")
+        visual_features = frame_results.get("visual_features")
+
+        if scene_cuts is not None:
+            video.scene_cuts = scene_cuts
+        if audio_analysis is not None:
+            video.audio_analysis = audio_analysis
+        if visual_features is not None:
+            video.visual_features = visual_features
+        if beat_grid is not None:
+            video.beat_grid = beat_grid
+
+        logger.info(
+            f"Local analysis of {video.id}: "
+            f"{len(scene_cuts or [])} scene cuts, audio {'analyzed' if audio_analysis else 'skipped'}, "
+            f"visual features {'scored' if visual_features else 'skipped'}, "
+            f"tempo {beat_grid['tempo'] if beat_grid else 'n/a'}"
+        )
+        return {
+            "scene_cuts": scene_cuts,
+            "audio_analysis": audio_analysis,
+            "visual_features": visual_features,
+            "beat_grid": beat_grid,
+            "frame_stats": frame_results.get("frame_stats"),
+        }
+
+    def boundary_refiner(self, video: Video, local: Dict[str, Any]) -> BoundaryRefiner:
+        """
+        Build a BoundaryRefiner from analyze() results and the decoded audio.
+
+        Args:
+            video: Analyzed video
+            local: analyze() result
+
+        Returns:
+            BoundaryRefiner; a no-op when refinement is disabled
+        """
+        if not settings.BOUNDARY_REFINEMENT_ENABLED:
+            return BoundaryRefiner()
+
+        return BoundaryRefiner(
+            frame_stats=local.get("frame_stats"),
+            samples=self.audio_cache.open(video.edit_source_path),
+            sample_rate=self.audio_cache.sample_rate
+        )
+
+    @staticmethod
+    def audio_summary(audio_analysis: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """The local audio analysis without its per-second arrays, for the AI."""
+        if not audio_analysis:
+            return None
+        return {key: value for key, value in audio_analysis.items() if key != "per_second"}
@@ -0,0 +1,221 @@
+"""
+Loudness measurement and single-pass normalization gains.
+
+Measurements run FFmpeg's ebur128 filter over the original audio, so every
+channel is weighted and true peak is taken at the source rate; the mono
+analysis PCM would read stereo content low and miss per-channel peaks.
+"""
+
+import re
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import ffmpeg
+
+from app.core.config import get_settings
+from app.core.exceptions import ProcessingError
+from app.models.clip import Clip
+from app.models.video import Video
+from app.services.ffmpeg_runner import FFmpegRunner
+from app.services.video_processor import VideoProcessorService
+
+settings = get_settings()
+logger = logging.getLogger("clipsmart.loudness")
+
+# ebur128 reports gated-out (silent) programmes at its absolute gate
+ABSOLUTE_GATE_LUFS = -70.0
+# Floor for the true peak of digital silence, which ebur128 reports as -inf
+PEAK_FLOOR_DB = -100.0
+
+# Measurement cached for clips whose source has no audio track
+SILENT = {"integrated_lufs": None, "true_peak_db": PEAK_FLOOR_DB}
+
+# Edges closer than this are the same range
+RANGE_TOLERANCE = 1e-3
+
+SUMMARY_LOUDNESS = re.compile(r"^\s*I:\s+(\S+) LUFS")
+SUMMARY_PEAK = re.compile(r"^\s*Peak:\s+(\S+) dBFS")
+
+
+def parse_ebur128_summary(lines: List[str]) -> Dict[str, Optional[float]]:
+    """
+    Integrated loudness and true peak from the summary ebur128 logs at the end.
+
+    Args:
+        lines: FFmpeg log lines
+
+    Returns:
+        Dict with integrated_lufs (None when silent) and true_peak_db
+    """
+    loudness = None
+    peak = None
+    for line in lines:
+        match = SUMMARY_LOUDNESS.match(line)
+        if match:
+            loudness = float(match.group(1))
+        match = SUMMARY_PEAK.match(line)
+        if match:
+            peak = float(match.group(1))
+
+    if peak is None:
+        raise ProcessingError("ebur128 reported no true peak")
+
+    return {
+        "integrated_lufs": loudness if loudness is not None and loudness > ABSOLUTE_GATE_LUFS else None,
+        "true_peak_db": max(peak, PEAK_FLOOR_DB),
+    }
+
+
+def normalization_gain(
+    loudness_lufs: Optional[float],
+    true_peak_db: Optional[float],
+    target_lufs: Optional[float] = None,
+    ceiling_db: Optional[float] = None
+) -> float:
+    """
+    Linear gain in dB that brings a measured track to the target loudness.
+
+    The gain is capped so the true peak stays under the ceiling; unmeasured
+    or silent tracks are left alone.
+
+    Args:
+        loudness_lufs: Measured integrated loudness
+        true_peak_db: Measured true peak in dBTP
+        target_lufs: Target loudness (default: LOUDNESS_TARGET_LUFS)
+        ceiling_db: True-peak ceiling (default: LOUDNESS_TRUE_PEAK_CEILING)
+
+    Returns:
+        Gain in dB (0.0 when nothing should change)
+    """
+    if not settings.LOUDNESS_NORMALIZATION_ENABLED or loudness_lufs is None:
+        return 0.0
+
+    target_lufs = target_lufs if target_lufs is not None else settings.LOUDNESS_TARGET_LUFS
+    ceiling_db = ceiling_db if ceiling_db is not None else settings.LOUDNESS_TRUE_PEAK_CEILING
+
+    gain = target_lufs - loudness_lufs
+    if true_peak_db is not None:
+        gain = min(gain, ceiling_db - true_peak_db)
+    return round(gain, 2)
+
+
+class LoudnessService:
+    """Measures clips and rendered files once and caches the results."""
+
+    def __init__(
+        self,
+        runner: Optional[FFmpegRunner] = None,
+        processor: Optional[VideoProcessorService] = None
+    ):
+        self.runner = runner or FFmpegRunner(ffmpeg_path=settings.FFMPPEG_PATH)
+        self.processor = processor or VideoProcessorService()
+
+    async def measure(
+        self,
+        path: str,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None
+    ) -> Optional[Dict[str, Optional[float]]]:
+        """
+        Measure the first audio track of a file, or a time range of it.
+
+        Args:
+            path: Media file
+            start_time: Range start in seconds (default: start of file)
+            end_time: Range end in seconds (default: end of file)
+
+        Returns:
+            Dict with integrated_lufs and true_peak_db, or None when the file
+            has no audio or cannot be read
+        """
+        input_kwargs = {}
+        if start_time:
+            input_kwargs['ss'] = start_time
+        if end_time is not None:
+            input_kwargs['t'] = end_time - (start_time or 0.0)
+
+        output = ffmpeg.output(
+            ffmpeg.input(path, **input_kwargs)['a:0'].filter('ebur128', peak='true', framelog='quiet'),
+            '-',
+            format='null'
+        )
+
+        try:
+            return parse_ebur128_summary(await self.runner.run_report(output))
+        except ProcessingError as e:
+            logger.warning(f"Cannot measure {path}: {e.detail}")
+            return None
+
+    async def measure_clips(
+        self,
+        clips: Sequence[Clip],
+        videos: Dict[str, Video],
+        ranges: Optional[Sequence[Tuple[float, float]]] = None
+    ) -> List[float]:
+        """
+        Normalization gain of each clip over the range it is rendered from.
+
+        A clip's own range is measured once and cached in clip.loudness_lufs
+        and clip.true_peak_db; sources without audio are cached as silent
+        (true peak at PEAK_FLOOR_DB, no loudness) so they are never decoded
+        again. Any other range, e.g. beat-snapped edges, is measured for the
+        render at hand. The caller commits.
+
+        Args:
+            clips: Clips in render order
+            videos: Parent videos keyed by ID
+            ranges: (start, end) each clip is rendered from (default: the
+                clips' own ranges)
+
+        Returns:
+            Gain in dB per clip
+        """
+        ranges = ranges or [(clip.start_time, clip.end_time) for clip in clips]
+
+        gains = []
+        for clip, (start_time, end_time) in zip(clips, ranges):
+            own_range = (
+                abs(start_time - clip.start_time) < RANGE_TOLERANCE
+                and abs(end_time - clip.end_time) < RANGE_TOLERANCE
+            )
+            cached = clip.loudness_lufs is not None or clip.true_peak_db is not None
+            silent = clip.loudness_lufs is None and clip.true_peak_db == PEAK_FLOOR_DB
+
+            if cached and (own_range or silent):
+                measurement = {"integrated_lufs": clip.loudness_lufs, "true_peak_db": clip.true_peak_db}
+            else:
+                path = videos[clip.video_id].edit_source_path
+                if await self._has_audio(path):
+                    measurement = await self.measure(path, start_time, end_time)
+                else:
+                    measurement = SILENT
+                if measurement is None:
+                    gains.append(0.0)
+                    continue
+                if own_range or measurement is SILENT:
+                    clip.loudness_lufs = measurement["integrated_lufs"]
+                    clip.true_peak_db = measurement["true_peak_db"]
+
+            gains.append(normalization_gain(measurement["integrated_lufs"], measurement["true_peak_db"]))
+
+        return gains
+
+    async def _has_audio(self, path: str) -> bool:
+        """Whether a file has an audio track, from the probe cache."""
+        try:
+            return (await self.processor.get_video_metadata(path))['has_audio']
+        except ProcessingError:
+            # Let the measurement itself fail
+            return True
+
+    async def measure_file(self, path: str) -> Optional[Dict[str, Optional[float]]]:
+        """
+        Measure a rendered file, e.g. a splice.
+
+        Args:
+            path: Media file
+
+        Returns:
+            Dict with integrated_lufs and true_peak_db, or None without audio
+        """
+        return await self.measure(path)
@@ -0,0 +1,449 @@
+"""
+Range-aware media file responses.
+
+Files are never read into memory: bytes go out through the server's
+zero-copy sendfile extension when it offers one, in bounded chunks
+otherwise, or not through Python at all when a front proxy is configured
+to serve them (X-Accel-Redirect / X-Sendfile).
+"""
+
+import os
+import re
+import logging
+import mimetypes
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote, urlencode
+
+import anyio
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.exceptions import ResourceNotFoundError, ValidationError
+from app.core.security import MEDIA_URL_PREFIX
+
+settings = get_settings()
+logger = logging.getLogger("clipsmart.media_streaming")
+
+OFFLOAD_MODES = {"", "x-accel", "x-sendfile"}
+
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+_RANGE_SPEC = re.compile(r"^\s*(\d*)\s*-\s*(\d*)\s*$")
+
+_URI_ATTRIBUTE = re.compile(r'URI="([^"]*)"')
+
+_MPD_URI_ATTRIBUTE = re.compile(r'\b(initialization|media)="([^"]*)"')
+
+HLS_PLAYLIST_TYPE = "application/vnd.apple.mpegurl"
+DASH_MANIFEST_TYPE = "application/dash+xml"
+
+# Streaming package files (see stream_packager)
+mimetypes.add_type(HLS_PLAYLIST_TYPE, ".m3u8")
+mimetypes.add_type("video/iso.segment", ".m4s")
+mimetypes.add_type(DASH_MANIFEST_TYPE, ".mpd")
+
+# Manifests are revalidated on every load so players pick up re-renders
+MANIFEST_TYPES = {HLS_PLAYLIST_TYPE, DASH_MANIFEST_TYPE}
+MANIFEST_CACHE_CONTROL = "private, no-cache"
+
+
+def media_url(*parts: str) -> str:
+    """URL of a file served by the media endpoint."""
+    return "/".join([MEDIA_URL_PREFIX, *(quote(part) for part in parts)])
+
+
+def media_roots() -> List[str]:
+    """Directories the media endpoint may serve files from."""
+    return [
+        os.path.realpath(path)
+        for path in (settings.UPLOAD_DIR, settings.EXPORT_DIR, settings.THUMBNAIL_DIR)
+    ]
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a Range header into one inclusive byte span.
+
+    Several ranges are coalesced into the span covering all of them; media
+    players only ever ask for one.
+
+    Args:
+        header: Range header value
+        size: File size in bytes
+
+    Returns:
+        (first, last) byte offsets, or None when the header should be
+        ignored (malformed or not in bytes)
+
+    Raises:
+        ValidationError: When no requested range overlaps the file
+    """
+    unit, _, specs = header.partition("=")
+    if unit.strip().lower() != "bytes" or not specs:
+        return None
+
+    spans = []
+    for spec in specs.split(","):
+        match = _RANGE_SPEC.match(spec)
+        if not match or match.groups() == ("", ""):
+            return None
+
+        first, last = match.groups()
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length:
+                spans.append((max(0, size - length), size - 1))
+            continue
+
+        first = int(first)
+        if last and int(last) < first:
+            return None
+        if first < size:
+            spans.append((first, min(int(last), size - 1) if last else size - 1))
+
+    if not spans:
+        raise ValidationError(f"Range not satisfiable: {header}")
+
+    return min(span[0] for span in spans), max(span[1] for span in spans)
+
+
+def playlist_with_query(playlist: str, query: Dict[str, str]) -> str:
+    """
+    Append query parameters to every URI of an HLS playlist.
+
+    Players that cannot send headers (native HLS in Safari) then carry the
+    access token on to variant playlists, init sections and segments.
+
+    Args:
+        playlist: Playlist text
+        query: Parameters to append
+
+    Returns:
+        Rewritten playlist text
+    """
+    suffix = urlencode(query)
+
+    def with_query(uri: str) -> str:
+        return f"{uri}{'&' if '?' in uri else '?'}{suffix}"
+
+    lines = []
+    for line in playlist.splitlines():
+        if line.startswith("#"):
+            line = _URI_ATTRIBUTE.sub(lambda match: f'URI="{with_query(match.group(1))}"', line)
+        elif line.strip():
+            line = with_query(line.strip())
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def manifest_with_query(manifest: str, query: Dict[str, str]) -> str:
+    """
+    Append query parameters to the segment templates of a DASH manifest.
+
+    Args:
+        manifest: MPD text
+        query: Parameters to append
+
+    Returns:
+        Rewritten MPD text
+    """
+    suffix = urlencode(query).replace("&", "&amp;")
+
+    def with_query(match: "re.Match[str]") -> str:
+        name, uri = match.groups()
+        return f'{name}="{uri}{"&amp;" if "?" in uri else "?"}{suffix}"'
+
+    return _MPD_URI_ATTRIBUTE.sub(with_query, manifest)
+
+
+def vtt_with_query(vtt: str, query: Dict[str, str]) -> str:
+    """
+    Append query parameters to the image URIs of a sprite WebVTT index.
+
+    Cue payloads are "<uri>#xywh=..." lines; the query goes before the
+    fragment.
+
+    Args:
+        vtt: WebVTT text
+        query: Parameters to append
+
+    Returns:
+        Rewritten WebVTT text
+    """
+    suffix = urlencode(query)
+
+    lines = vtt.splitlines()
+    for i in range(1, len(lines)):
+        # The payload line follows each cue's timing line
+        if "-->" in lines[i - 1] and lines[i].strip():
+            uri, hash_mark, fragment = lines[i].strip().partition("#")
+            lines[i] = f"{uri}{'&' if '?' in uri else '?'}{suffix}{hash_mark}{fragment}"
+    return "\n".join(lines) + "\n"
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match / If-Range list against an ETag."""
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in header.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def _not_modified_since(header: str, mtime: float) -> bool:
+    """True when an HTTP date is at or after the file's mtime."""
+    try:
+        return int(mtime) <= parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+class MediaFileResponse(Response):
+    """
+    Response for a byte span of a file, streamed without buffering it.
+
+    Sends the span through the ASGI zero-copy extension when the server
+    supports it, otherwise reads it in MEDIA_CHUNK_SIZE chunks.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        first: int,
+        last: int,
+        status_code: int,
+        headers: Dict[str, str],
+        media_type: str,
+        send_body: bool = True
+    ):
+        super().__init__(status_code=status_code, headers=headers, media_type=media_type)
+        self.path = path
+        self.first = first
+        self.count = max(0, last - first + 1)
+        self.send_body = send_body
+        if status_code != 304:
+            self.headers["content-length"] = str(self.count)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+
+        if not self.send_body or not self.count:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            if ZEROCOPY_EXTENSION in scope.get("extensions", {}):
+                await send({
+                    "type": ZEROCOPY_EXTENSION,
+                    "file": file.wrapped,
+                    "offset": self.first,
+                    "count": self.count,
+                    "more_body": False,
+                })
+                return
+
+            await file.seek(self.first)
+            remaining = self.count
+            while remaining:
+                chunk = await file.read(min(settings.MEDIA_CHUNK_SIZE, remaining))
+                if not chunk:
+                    # File shrank underneath us; end the body short
+                    logger.warning(f"Media file truncated while streaming: {self.path}")
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+                    return
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": bool(remaining)})
+
+
+class MediaStreamer:
+    """Builds conditional, range-aware responses for media files."""
+
+    def __init__(self, offload: Optional[str] = None, accel_locations: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            offload: "", "x-accel" or "x-sendfile" (default: MEDIA_OFFLOAD)
+            accel_locations: Local directory -> internal proxy location
+                for X-Accel-Redirect (default: MEDIA_ACCEL_LOCATIONS)
+        """
+        self.offload = (settings.MEDIA_OFFLOAD if offload is None else offload).lower()
+        if self.offload not in OFFLOAD_MODES:
+            raise ValidationError(f"Unsupported media offload mode: {self.offload}")
+
+        locations = settings.MEDIA_ACCEL_LOCATIONS if accel_locations is None else accel_locations
+        self.accel_locations = {
+            os.path.realpath(directory): location.rstrip("/")
+            for directory, location in locations.items()
+        }
+
+    @staticmethod
+    def resolve(path: Optional[str]) -> str:
+        """
+        Resolve a stored media path, refusing anything outside the media roots.
+
+        Raises:
+            ResourceNotFoundError: When the file is missing or not servable
+        """
+        if not path:
+            raise ResourceNotFoundError("Media file not available")
+
+        real_path = os.path.realpath(path)
+        if not any(os.path.commonpath([root, real_path]) == root for root in media_roots()):
+            logger.warning(f"Refusing to serve file outside media roots: {path}")
+            raise ResourceNotFoundError("Media file not available")
+
+        if not os.path.isfile(real_path):
+            raise ResourceNotFoundError("Media file not found")
+
+        return real_path
+
+    @staticmethod
+    def etag(file_stat: os.stat_result) -> str:
+        """Validator that changes whenever a file is rewritten."""
+        return f'"{file_stat.st_size:x}-{file_stat.st_mtime_ns:x}"'
+
+    def _accel_uri(self, path: str) -> Optional[str]:
+        """Internal proxy location of a file, if its directory is mapped."""
+        for directory, location in self.accel_locations.items():
+            if os.path.commonpath([directory, path]) == directory:
+                return location + quote(path[len(directory):])
+        return None
+
+    def response(
+        self,
+        request: Request,
+        path: Optional[str],
+        filename: Optional[str] = None,
+        attachment: bool = False
+    ) -> Response:
+        """
+        Serve a media file honouring Range, If-Range, If-None-Match and
+        If-Modified-Since.
+
+        Args:
+            request: Incoming GET or HEAD request
+            path: Stored file path
+            filename: Name offered to the client (default: the file's own)
+            attachment: Ask the browser to download rather than play
+
+        Returns:
+            200, 206, 304 or 416 response
+
+        Raises:
+            ResourceNotFoundError: When the file is missing or not servable
+        """
+        path = self.resolve(path)
+        file_stat = os.stat(path)
+        size = file_stat.st_size
+        etag = self.etag(file_stat)
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        filename = filename or os.path.basename(path)
+
+        headers = {
+            "accept-ranges": "bytes",
+            "etag": etag,
+            "last-modified": formatdate(file_stat.st_mtime, usegmt=True),
+            "cache-control": (
+                MANIFEST_CACHE_CONTROL if media_type in MANIFEST_TYPES
+                else f"private, max-age={settings.MEDIA_CACHE_MAX_AGE}"
+            ),
+            "content-disposition": (
+                f"{'attachment' if attachment else 'inline'}; filename*=UTF-8''{quote(filename)}"
+            ),
+        }
+
+        # If-None-Match wins over If-Modified-Since when both are sent
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            not_modified = _etag_matches(if_none_match, etag)
+        else:
+            if_modified_since = request.headers.get("if-modified-since")
+            not_modified = bool(if_modified_since) and _not_modified_since(if_modified_since, file_stat.st_mtime)
+
+        if not_modified:
+            headers.pop("content-disposition")
+            return MediaFileResponse(path, 0, -1, 304, headers, media_type, send_body=False)
+
+        # The proxy handles ranges and conditionals itself from here on
+        if self.offload:
+            return self._offload(path, headers, media_type)
+
+        first, last, status_code = 0, size - 1, 200
+        range_header = request.headers.get("range")
+        if range_header and self._range_applies(request.headers.get("if-range"), etag, file_stat.st_mtime):
+            try:
+                span = parse_range(range_header, size)
+            except ValidationError:
+                headers["content-range"] = f"bytes */{size}"
+                return MediaFileResponse(path, 0, -1, 416, headers, media_type, send_body=False)
+
+            if span:
+                first, last = span
+                status_code = 206
+                headers["content-range"] = f"bytes {first}-{last}/{size}"
+
+        return MediaFileResponse(
+            path, first, last, status_code, headers, media_type,
+            send_body=request.method != "HEAD"
+        )
+
+    def rewritten_response(self, path: Optional[str], query: Dict[str, str]) -> Response:
+        """
+        Serve an HLS playlist, DASH manifest or sprite WebVTT index with
+        query parameters appended to the URIs it references.
+
+        These are a few KB, so they are rewritten in memory.
+
+        Raises:
+            ResourceNotFoundError: When the file is missing or not servable
+        """
+        path = self.resolve(path)
+        with open(path, encoding="utf-8") as index:
+            content = index.read()
+
+        if path.endswith(".mpd"):
+            return Response(
+                manifest_with_query(content, query),
+                media_type=DASH_MANIFEST_TYPE,
+                headers={"cache-control": MANIFEST_CACHE_CONTROL}
+            )
+
+        if path.endswith(".vtt"):
+            return Response(
+                vtt_with_query(content, query),
+                media_type="text/vtt",
+                headers={"cache-control": f"private, max-age={settings.MEDIA_CACHE_MAX_AGE}"}
+            )
+
+        return Response(
+            playlist_with_query(content, query),
+            media_type=HLS_PLAYLIST_TYPE,
+            headers={"cache-control": MANIFEST_CACHE_CONTROL}
+        )
+
+    @staticmethod
+    def _range_applies(if_range: Optional[str], etag: str, mtime: float) -> bool:
+        """A Range is honoured unless an If-Range validator is stale."""
+        if not if_range:
+            return True
+        if if_range.strip().startswith(("\"", "W/")):
+            return if_range.strip() == etag
+        return _not_modified_since(if_range, mtime)
+
+    def _offload(self, path: str, headers: Dict[str, str], media_type: str) -> Response:
+        """Hand the file to the front proxy with an empty response body."""
+        if self.offload == "x-sendfile":
+            headers["x-sendfile"] = path
+        else:
+            uri = self._accel_uri(path)
+            if uri is None:
+                logger.warning(f"No X-Accel location maps {path}; streaming it from the app")
+                return MediaFileResponse(path, 0, os.path.getsize(path) - 1, 200, headers, media_type)
+            headers["x-accel-redirect"] = uri
+
+        response = Response(status_code=200, headers=headers, media_type=media_type)
+        # Content-Length would describe the empty body, not the file the proxy sends
+        del response.headers["content-length"]
+        return response
@@ -94,7 +94,8 @@ class MinimaxService:
         sensitivity: float = 0.75,
         min_duration: float = 3.0,
         max_duration: float = 30.0,
-        max_clips: int = 50
+        max_clips: int = 50,
+        candidates: Optional[List[Dict[str, Any]]] = None
     ) -> List[Dict[str, Any]]:
         """
         Extract clips from video based on AI analysis.
@@ -106,6 +107,8 @@ class MinimaxService:
             min_duration: Minimum clip duration in seconds
             max_duration: Maximum clip duration in seconds
             max_clips: Maximum number of clips to extract
+            candidates: Optional locally detected shot segments to rank instead of
+                scanning the whole video
 
         Returns:
             List of clip candidates with timing and scores
@@ -125,6 +128,9 @@ class MinimaxService:
                     "max_clips": max_clips,
                 }
 
+                if candidates:
+                    payload["candidate_segments"] = candidates
+
                 response = await client.post(
                     f"{self.base_url}/extract_clips",
                     json=payload,
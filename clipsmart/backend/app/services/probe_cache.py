@@ -0,0 +1,104 @@
+"""
+Content-addressed cache for FFprobe metadata.
+"""
+
+import os
+import json
+import hashlib
+import logging
+from typing import Any, Dict, Optional
+
+from cachetools import LRUCache
+from redis.exceptions import RedisError
+
+from app.core.cache import get_redis
+from app.core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger("clipsmart.probe_cache")
+
+REDIS_KEY_PREFIX = "clipsmart:probe:"
+
+# Shared by every service instance in the process
+_local_cache: "LRUCache[str, Dict[str, Any]]" = LRUCache(maxsize=settings.PROBE_CACHE_SIZE)
+
+
+def file_signature(path: str) -> str:
+    """
+    Identify a file's content by (real path, size, mtime) without reading it.
+
+    Args:
+        path: Path to file
+
+    Returns:
+        Hex digest identifying this version of the file
+    """
+    stat = os.stat(path)
+    raw = f"{os.path.realpath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class ProbeCache:
+    """In-process LRU of probe results backed by Redis."""
+
+    def __init__(self, ttl: Optional[int] = None):
+        self.ttl = ttl or settings.PROBE_CACHE_TTL
+        self.enabled = settings.ENABLE_CACHING
+
+    async def get(self, path: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up cached metadata for a file.
+
+        Args:
+            path: Path to media file
+
+        Returns:
+            Cached metadata, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        try:
+            key = file_signature(path)
+        except OSError:
+            return None
+
+        metadata = _local_cache.get(key)
+        if metadata is not None:
+            return dict(metadata)
+
+        try:
+            raw = await get_redis().get(REDIS_KEY_PREFIX + key)
+        except (RedisError, OSError) as e:
+            logger.warning(f"Probe cache unavailable: {str(e)}")
+            return None
+
+        if raw is None:
+            return None
+
+        metadata = json.loads(raw)
+        _local_cache[key] = metadata
+        return dict(metadata)
+
+    async def set(self, path: str, metadata: Dict[str, Any]) -> None:
+        """
+        Store metadata for a file.
+
+        Args:
+            path: Path to media file
+            metadata: Metadata to cache
+        """
+        if not self.enabled:
+            return
+
+        try:
+            key = file_signature(path)
+        except OSError:
+            return
+
+        _local_cache[key] = dict(metadata)
+
+        try:
+            await get_redis().set(REDIS_KEY_PREFIX + key, json.dumps(metadata), ex=self.ttl)
+        except (RedisError, OSError) as e:
+            logger.warning(f"Probe cache unavailable: {str(e)}")
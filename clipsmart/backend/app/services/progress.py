@@ -0,0 +1,120 @@
+"""
+Throttled job progress reporting to Redis and the database.
+"""
+
+import json
+import time
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Union
+
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import get_redis
+from app.core.config import get_settings
+from app.services.ffmpeg_runner import FFmpegProgress
+
+settings = get_settings()
+logger = logging.getLogger("clipsmart.progress")
+
+REDIS_KEY_PREFIX = "clipsmart:progress:"
+
+
+def progress_key(kind: str, job_id: str) -> str:
+    """Redis key (and pub/sub channel) for a job's progress."""
+    return f"{REDIS_KEY_PREFIX}{kind}:{job_id}"
+
+
+async def get_progress(kind: str, job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Read the latest published progress for a job.
+
+    Args:
+        kind: Job kind (splice, export)
+        job_id: Job ID
+
+    Returns:
+        Progress snapshot, or None if nothing was published
+    """
+    try:
+        raw = await get_redis().get(progress_key(kind, job_id))
+    except (RedisError, OSError) as e:
+        logger.warning(f"Progress store unavailable: {str(e)}")
+        return None
+
+    return json.loads(raw) if raw else None
+
+
+def row_persister(db: AsyncSession, *rows: Any) -> Callable[[FFmpegProgress], Awaitable[None]]:
+    """
+    Build a persist callback that writes progress onto Splice or Export rows.
+
+    Args:
+        db: Database session owning the rows
+        rows: Splice or Export instances sharing one encode
+
+    Returns:
+        Async callback for JobProgressReporter
+    """
+    async def persist(progress: FFmpegProgress) -> None:
+        for row in rows:
+            row.progress = progress.percent
+            row.eta_seconds = progress.eta
+            row.encode_speed = progress.speed
+        await db.commit()
+
+    return persist
+
+
+class JobProgressReporter:
+    """
+    FFmpeg progress callback that publishes to Redis and persists to the job row.
+
+    Redis gets frequent updates for cheap polling/subscribing; the database
+    row is written far less often.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        job_id: Union[str, Sequence[str]],
+        persist: Optional[Callable[[FFmpegProgress], Awaitable[None]]] = None,
+        publish_interval: Optional[float] = None,
+        persist_interval: Optional[float] = None
+    ):
+        self.kind = kind
+        # Several jobs can share one encode, e.g. a batch export
+        self.job_ids = [job_id] if isinstance(job_id, str) else list(job_id)
+        self.persist = persist
+        self.publish_interval = publish_interval or settings.PROGRESS_PUBLISH_INTERVAL
+        self.persist_interval = persist_interval or settings.PROGRESS_PERSIST_INTERVAL
+        self._last_publish = 0.0
+        self._last_persist = 0.0
+
+    async def __call__(self, progress: FFmpegProgress) -> None:
+        now = time.monotonic()
+
+        if progress.done or now - self._last_publish >= self.publish_interval:
+            self._last_publish = now
+            await self.publish(progress)
+
+        if self.persist and (progress.done or now - self._last_persist >= self.persist_interval):
+            self._last_persist = now
+            await self.persist(progress)
+
+    async def publish(self, progress: FFmpegProgress) -> None:
+        """Publish a snapshot to Redis; failures never interrupt the encode."""
+        payload = progress.to_dict()
+        payload["updated_at"] = datetime.utcnow().isoformat()
+        message = json.dumps(payload)
+
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                for job_id in self.job_ids:
+                    key = progress_key(self.kind, job_id)
+                    pipe.set(key, message, ex=settings.PROGRESS_TTL)
+                    pipe.publish(key, message)
+                await pipe.execute()
+        except (RedisError, OSError) as e:
+            logger.warning(f"Failed to publish progress for {self.kind} {', '.join(self.job_ids)}: {str(e)}")
@@ -0,0 +1,219 @@
+"""
+Smart reframing: smoothed crop-window tracks that follow faces and motion,
+computed once per clip from the low-res frame stream.
+"""
+
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from scipy.ndimage import median_filter, uniform_filter1d
+
+from app.core.config import get_settings
+from app.core.exceptions import ProcessingError
+from app.models.clip import Clip
+from app.models.video import Video
+from app.services.frame_sampler import FrameBatch, FrameSampler, fit_size
+from app.services.visual_features import detect_faces, load_face_detector
+
+settings = get_settings()
+logger = logging.getLogger("clipsmart.reframe")
+
+# Weight of edge energy next to motion energy in the saliency profiles
+EDGE_WEIGHT = 0.5
+
+# How strongly detected faces pull the crop centre away from raw saliency
+FACE_PULL = 0.8
+
+# Spacing of the stored track's keypoints in seconds
+KEY_INTERVAL = 0.5
+
+# Tracks that wander less than this (share of the frame) become static crops
+STATIC_TOLERANCE = 0.03
+
+SALIENCY_FLOOR = 1e-6
+
+
+def _centres(motion: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """
+    Saliency-weighted centre of each row of a batch of 1-D profiles.
+
+    Args:
+        motion: (n, length) motion energy profiles
+        edges: (n, length) edge energy profiles
+
+    Returns:
+        (n,) centres in 0-1; 0.5 for frames with no saliency
+    """
+    saliency = (
+        motion / (motion.sum(axis=1, keepdims=True) + SALIENCY_FLOOR)
+        + EDGE_WEIGHT * edges / (edges.sum(axis=1, keepdims=True) + SALIENCY_FLOOR)
+    )
+    # Squaring favours the strongest region over a wide spread of detail
+    saliency = saliency ** 2
+    positions = (np.arange(saliency.shape[1]) + 0.5) / saliency.shape[1]
+    total = saliency.sum(axis=1)
+    centres = np.full(len(saliency), 0.5)
+    np.divide(saliency @ positions, total, out=centres, where=total > SALIENCY_FLOOR)
+    return centres
+
+
+class CropTracker:
+    """
+    Follows the most salient region of a clip in grayscale FrameBatches.
+
+    Each sampled frame gets a crop centre from its motion and edge energy
+    column/row profiles, pulled towards detected faces. finish() smooths the
+    centres and keeps one keypoint per KEY_INTERVAL, so the stored track is
+    small and independent of the crop's aspect ratio.
+    """
+
+    def __init__(self, origin: float, fps: float, detect_faces: Optional[bool] = None):
+        """
+        Args:
+            origin: Clip start on the source timeline in seconds
+            fps: Sampling rate of the frames
+            detect_faces: Run the OpenCV face detector (default: VISUAL_FACE_DETECTION_ENABLED)
+        """
+        self.origin = origin
+        self.fps = fps
+        self.face_detector = load_face_detector(detect_faces)
+
+        self._previous: Optional[np.ndarray] = None
+        self._times: List[np.ndarray] = []
+        self._x: List[np.ndarray] = []
+        self._y: List[np.ndarray] = []
+
+    def update(self, batch: FrameBatch) -> None:
+        """
+        Locate the salient region of each frame of a batch.
+
+        Args:
+            batch: Grayscale frames from FrameSampler
+        """
+        frames = batch.frames.astype(np.float32)
+
+        previous = frames[:1] if self._previous is None else self._previous[None]
+        motion = np.abs(frames - np.concatenate((previous, frames[:-1])))
+
+        edges = np.zeros_like(frames)
+        edges[:, :, 1:] += np.abs(np.diff(frames, axis=2))
+        edges[:, 1:, :] += np.abs(np.diff(frames, axis=1))
+
+        x = _centres(motion.sum(axis=1), edges.sum(axis=1))
+        y = _centres(motion.sum(axis=2), edges.sum(axis=2))
+
+        if self.face_detector is not None:
+            height, width = batch.frames.shape[1:3]
+            for i, frame in enumerate(batch.frames):
+                faces = detect_faces(self.face_detector, frame)
+                if not len(faces):
+                    continue
+                # Larger faces count for more when several are in shot
+                area = faces[:, 2] * faces[:, 3]
+                face_x = np.average(faces[:, 0] + faces[:, 2] / 2, weights=area) / width
+                face_y = np.average(faces[:, 1] + faces[:, 3] / 2, weights=area) / height
+                x[i] = FACE_PULL * face_x + (1 - FACE_PULL) * x[i]
+                y[i] = FACE_PULL * face_y + (1 - FACE_PULL) * y[i]
+
+        self._times.append(batch.timestamps - self.origin)
+        self._x.append(x)
+        self._y.append(y)
+        self._previous = frames[-1].copy()
+
+    def _smooth(self, values: np.ndarray) -> np.ndarray:
+        """Median filter out detection jitter, then ease the remaining motion."""
+        window = max(1, int(round(settings.REFRAME_SMOOTHING_SECONDS * self.fps)))
+        values = median_filter(values, size=window | 1, mode="nearest")
+        return uniform_filter1d(values, size=window, mode="nearest")
+
+    def finish(self) -> Optional[Dict[str, List[float]]]:
+        """
+        Returns:
+            Track dict of clip-relative keypoint times and normalized crop
+            centres ({"times", "x", "y"}), or None when no frames were seen
+        """
+        if not self._times:
+            return None
+
+        times = np.concatenate(self._times)
+        x = self._smooth(np.concatenate(self._x))
+        y = self._smooth(np.concatenate(self._y))
+
+        if np.ptp(x) < STATIC_TOLERANCE and np.ptp(y) < STATIC_TOLERANCE:
+            return {"times": [0.0], "x": [round(float(x.mean()), 4)], "y": [round(float(y.mean()), 4)]}
+
+        step = max(1, int(round(KEY_INTERVAL * self.fps)))
+        keys = np.arange(0, len(times), step)
+        if keys[-1] != len(times) - 1:
+            keys = np.append(keys, len(times) - 1)
+
+        return {
+            "times": np.round(times[keys], 3).tolist(),
+            "x": np.round(x[keys], 4).tolist(),
+            "y": np.round(y[keys], 4).tolist(),
+        }
+
+
+class ReframeService:
+    """Computes crop tracks once per clip and caches them on the row."""
+
+    async def _sampler(self, video: Video, start_time: float, end_time: float) -> FrameSampler:
+        """Grayscale sampler over a clip's range of the analysis proxy."""
+        kwargs = {
+            "fps": settings.REFRAME_SAMPLE_FPS,
+            "gray": True,
+            "start_time": start_time,
+            "end_time": end_time,
+        }
+        if video.width and video.height:
+            size = fit_size(video.width, video.height, settings.FRAME_SAMPLER_MAX_SIDE)
+            return FrameSampler(
+                video.analysis_source_path,
+                size,
+                source_fps=video.fps or settings.REFRAME_SAMPLE_FPS,
+                **kwargs
+            )
+        return await FrameSampler.for_video(video.analysis_source_path, **kwargs)
+
+    async def track(self, video: Video, start_time: float, end_time: float) -> Optional[Dict[str, List[float]]]:
+        """
+        Compute the crop track of one clip.
+
+        Args:
+            video: Source video
+            start_time: Clip start in seconds
+            end_time: Clip end in seconds
+
+        Returns:
+            Crop track, or None when no frames could be sampled
+        """
+        loop = asyncio.get_running_loop()
+        sampler = await self._sampler(video, start_time, end_time)
+        tracker = CropTracker(start_time, settings.REFRAME_SAMPLE_FPS)
+
+        async for batch in sampler.batches():
+            await loop.run_in_executor(None, tracker.update, batch)
+
+        return tracker.finish()
+
+    async def track_clips(self, clips: Iterable[Clip], videos: Dict[str, Video]) -> None:
+        """
+        Compute crop tracks for clips that have none cached yet.
+
+        Sets clip.crop_track; the caller commits.
+
+        Args:
+            clips: Clips to track
+            videos: Parent videos keyed by ID
+        """
+        for clip in clips:
+            if clip.crop_track is not None:
+                continue
+
+            try:
+                clip.crop_track = await self.track(videos[clip.video_id], clip.start_time, clip.end_time)
+            except ProcessingError as e:
+                # Untracked clips are letterboxed instead
+                logger.warning(f"Cannot reframe clip {clip.id}: {e.detail}")
@@ -0,0 +1,255 @@
+"""
+Local shot-boundary detection on sampled frames.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.core.config import get_settings
+from app.services.frame_sampler import FrameBatch
+
+settings = get_settings()
+logger = logging.getLogger("clipsmart.scene_detector")
+
+HISTOGRAM_BINS = 32
+
+# Weight of the histogram distance in the combined frame difference
+HISTOGRAM_WEIGHT = 0.6
+
+# A cut must stand this far above the typical difference around it
+LOCAL_CONTRAST = 2.5
+
+
+class SceneDetector:
+    """
+    Finds hard cuts from luma histogram and pixel differences between frames.
+
+    Fed grayscale FrameBatches in order (see FrameSampler); each batch is
+    scored with a handful of vectorized NumPy operations, so memory stays
+    at one float per sampled frame however long the video is.
+    """
+
+    def __init__(
+        self,
+        threshold: Optional[float] = None,
+        min_shot_seconds: Optional[float] = None
+    ):
+        """
+        Args:
+            threshold: Minimum combined difference (0-1) for a cut
+            min_shot_seconds: Minimum spacing between cuts
+        """
+        self.threshold = threshold if threshold is not None else settings.SCENE_CUT_THRESHOLD
+        self.min_shot_seconds = min_shot_seconds if min_shot_seconds is not None else settings.SCENE_MIN_SHOT_SECONDS
+
+        self._previous_histogram: Optional[np.ndarray] = None
+        self._previous_frame: Optional[np.ndarray] = None
+        self._scores: List[np.ndarray] = []
+        self._timestamps: List[np.ndarray] = []
+
+    def update(self, batch: FrameBatch) -> None:
+        """
+        Score the differences between consecutive frames of a batch.
+
+        Args:
+            batch: Grayscale frames from FrameSampler
+        """
+        frames = batch.frames
+        count = len(frames)
+        pixels = frames.reshape(count, -1)
+
+        # Per-frame histograms in one bincount: offset each frame's bins
+        bins = (pixels >> 3).astype(np.int32)
+        bins += (np.arange(count, dtype=np.int32) * HISTOGRAM_BINS)[:, None]
+        histograms = np.bincount(bins.ravel(), minlength=count * HISTOGRAM_BINS)
+        histograms = histograms.reshape(count, HISTOGRAM_BINS) / pixels.shape[1]
+
+        if self._previous_histogram is None:
+            previous_histograms = histograms[:1]
+            previous_pixels = pixels[:1]
+        else:
+            previous_histograms = self._previous_histogram[None]
+            previous_pixels = self._previous_frame[None]
+        previous_histograms = np.concatenate((previous_histograms, histograms[:-1]))
+        previous_pixels = np.concatenate((previous_pixels, pixels[:-1]))
+
+        # Histogram distance catches content changes, pixel distance catches
+        # cuts between shots with similar tonal distributions
+        histogram_diff = 0.5 * np.abs(histograms - previous_histograms).sum(axis=1)
+        luma_diff = np.abs(pixels.astype(np.int16) - previous_pixels).mean(axis=1) / 255.0
+
+        self._scores.append(HISTOGRAM_WEIGHT * histogram_diff + (1 - HISTOGRAM_WEIGHT) * luma_diff)
+        self._timestamps.append(batch.timestamps.copy())
+
+        # The batch is a view into a reused buffer; keep copies
+        self._previous_histogram = histograms[-1].copy()
+        self._previous_frame = pixels[-1].copy()
+
+    def finish(self) -> List[Dict[str, float]]:
+        """
+        Pick cuts from the scored differences.
+
+        A frame is a cut when its difference clears the threshold, stands out
+        against the local median (so fast motion is not mistaken for cuts) and
+        is the strongest within min_shot_seconds.
+
+        Returns:
+            Cuts as {"time", "score", "confidence"}, in time order
+        """
+        if not self._scores:
+            return []
+
+        scores = np.concatenate(self._scores)
+        timestamps = np.concatenate(self._timestamps)
+        if len(scores) < 3:
+            return []
+
+        interval = float(np.median(np.diff(timestamps)))
+        radius = max(1, int(round(self.min_shot_seconds / interval)))
+
+        padded = np.pad(scores, radius, mode="edge")
+        windows = sliding_window_view(padded, 2 * radius + 1)
+        local_median = np.median(windows, axis=1)
+        local_max = windows.max(axis=1)
+
+        candidates = (
+            (scores >= self.threshold)
+            & (scores >= LOCAL_CONTRAST * local_median)
+            & (scores >= local_max)
+        )
+        candidates[0] = False
+
+        cuts = []
+        last_time = -np.inf
+        for i in np.flatnonzero(candidates):
+            # Plateaus leave equal maxima side by side; keep the first
+            if timestamps[i] - last_time < self.min_shot_seconds:
+                continue
+            confidence = (scores[i] - local_median[i]) / max(1.0 - local_median[i], 1e-6)
+            cuts.append({
+                "time": round(float(timestamps[i]), 3),
+                "score": round(float(scores[i]), 4),
+                "confidence": round(float(np.clip(confidence, 0.0, 1.0)), 4),
+            })
+            last_time = timestamps[i]
+
+        logger.info(f"Detected {len(cuts)} cuts in {len(scores)} sampled frames")
+        return cuts
+
+
+def snap_to_cuts(
+    start_time: float,
+    end_time: float,
+    cuts: Sequence[Dict[str, Any]],
+    tolerance: Optional[float] = None,
+    min_duration: Optional[float] = None
+) -> Dict[str, float]:
+    """
+    Move clip edges onto the nearest cuts within tolerance.
+
+    An edge is left alone when no cut is close enough or when snapping
+    would shrink the clip below min_duration.
+
+    Args:
+        start_time: Proposed clip start in seconds
+        end_time: Proposed clip end in seconds
+        cuts: Cuts from SceneDetector.finish()
+        tolerance: Maximum distance an edge may move
+        min_duration: Minimum clip duration after snapping
+
+    Returns:
+        Dict with snapped start_time and end_time
+    """
+    tolerance = tolerance if tolerance is not None else settings.SCENE_SNAP_TOLERANCE
+    min_duration = min_duration if min_duration is not None else settings.MIN_CLIP_DURATION
+
+    if not cuts:
+        return {"start_time": start_time, "end_time": end_time}
+
+    times = np.array([cut["time"] for cut in cuts])
+
+    def nearest(t: float) -> Optional[float]:
+        i = int(np.searchsorted(times, t))
+        best = None
+        for j in (i - 1, i):
+            if 0 <= j < len(times) and abs(times[j] - t) <= tolerance:
+                if best is None or abs(times[j] - t) < abs(best - t):
+                    best = float(times[j])
+        return best
+
+    snapped_start = nearest(start_time)
+    snapped_end = nearest(end_time)
+
+    new_start = snapped_start if snapped_start is not None else start_time
+    new_end = snapped_end if snapped_end is not None else end_time
+
+    if new_end - new_start < min_duration:
+        # Keep whichever single snap still leaves a long enough clip
+        if snapped_start is not None and end_time - snapped_start >= min_duration:
+            new_start, new_end = snapped_start, end_time
+        elif snapped_end is not None and snapped_end - start_time >= min_duration:
+            new_start, new_end = start_time, snapped_end
+        else:
+            new_start, new_end = start_time, end_time
+
+    return {"start_time": new_start, "end_time": new_end}
+
+
+def candidate_segments(
+    cuts: Sequence[Dict[str, Any]],
+    duration: float,
+    min_duration: Optional[float] = None,
+    max_duration: Optional[float] = None
+) -> List[Dict[str, float]]:
+    """
+    Turn cuts into clip candidates for the AI to rank.
+
+    Shots shorter than min_duration are merged with the following shots and
+    shots longer than max_duration are split evenly.
+
+    Args:
+        cuts: Cuts from SceneDetector.finish()
+        duration: Video duration in seconds
+        min_duration: Minimum candidate duration
+        max_duration: Maximum candidate duration
+
+    Returns:
+        Candidates as {"start_time", "end_time", "cut_confidence"}
+    """
+    min_duration = min_duration if min_duration is not None else settings.MIN_CLIP_DURATION
+    max_duration = max_duration if max_duration is not None else settings.MAX_CLIP_DURATION
+
+    boundaries = [0.0] + [cut["time"] for cut in cuts if 0 < cut["time"] < duration] + [duration]
+    confidence = {cut["time"]: cut["confidence"] for cut in cuts}
+
+    # Merge short shots into the following ones
+    shots = []
+    start = boundaries[0]
+    for end in boundaries[1:]:
+        if end - start < min_duration:
+            if end < duration:
+                continue
+            if shots:
+                # Fold a short tail into the last shot
+                shots[-1] = (shots[-1][0], end)
+                break
+        shots.append((start, end))
+        start = end
+
+    # Split long shots evenly, never past max_duration
+    candidates = []
+    for start, end in shots:
+        pieces = max(1, int(np.ceil((end - start) / max_duration)))
+        step = (end - start) / pieces
+        for i in range(pieces):
+            piece_start = round(start + i * step, 3)
+            candidates.append({
+                "start_time": piece_start,
+                "end_time": min(round(start + (i + 1) * step, 3), round(piece_start + max_duration, 3)),
+                "cut_confidence": confidence.get(start, 1.0) if i == 0 else 0.0,
+            })
+
+    return candidates
@@ -0,0 +1,134 @@
+"""
+Segment planning and joining for encodes distributed across Celery workers.
+
+A long timeline is cut at keyframes into windows whose video is encoded as
+independent MPEG-TS segments in parallel, then joined by stream copy. The
+audio is encoded once over the whole timeline alongside them and muxed in
+at the join, so it never has per-segment encoder priming or mix changes.
+"""
+
+import os
+import shutil
+import logging
+from typing import List, Optional, Sequence, Tuple
+
+from redis.exceptions import RedisError
+
+from app.core.cache import get_redis
+from app.core.config import get_settings
+from app.services.ffmpeg_runner import FFmpegProgress
+from app.services.keyframe_index import KeyframeIndex
+from app.services.progress import JobProgressReporter
+from app.services.video_processor import VideoProcessorService
+
+settings = get_settings()
+logger = logging.getLogger("clipsmart.segmented_encode")
+
+REDIS_KEY_PREFIX = "clipsmart:segments:"
+
+Window = Tuple[float, float]
+
+
+class SegmentedEncodeService:
+    """Plans, tracks and joins segment-parallel encodes."""
+
+    def __init__(self):
+        self.video_processor = VideoProcessorService()
+
+    @staticmethod
+    def should_distribute(duration: float) -> bool:
+        """Whether an encode of this output duration should be split up."""
+        return (
+            settings.DISTRIBUTED_ENCODE_ENABLED
+            and duration >= settings.DISTRIBUTED_ENCODE_MIN_SECONDS
+        )
+
+    async def plan_windows(
+        self,
+        video_path: str,
+        start: float,
+        end: float,
+        segment_seconds: Optional[float] = None
+    ) -> List[Window]:
+        """
+        Cut [start, end] of a video at keyframes into encode windows.
+
+        Args:
+            video_path: Video whose keyframes define the cut points
+            start: Range start in seconds
+            end: Range end in seconds
+            segment_seconds: Target window length
+
+        Returns:
+            Windows relative to start, covering [0, end - start]
+        """
+        segment_seconds = segment_seconds or settings.DISTRIBUTED_SEGMENT_SECONDS
+
+        index = KeyframeIndex.for_video(video_path)
+        if index is None:
+            index = await self.video_processor.build_keyframe_index(video_path)
+
+        points = [0.0] + [t - start for t in index.split_points(start, end, segment_seconds)] + [end - start]
+        return list(zip(points[:-1], points[1:]))
+
+    @staticmethod
+    def work_dir(kind: str, job_id: str) -> str:
+        """Create and return the scratch directory for one job's segments."""
+        path = os.path.join(settings.SEGMENT_DIR, f"{kind}_{job_id}")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    @staticmethod
+    def segment_path(work_dir: str, index: int, name: str = "segment") -> str:
+        """Path of one encoded segment."""
+        return os.path.join(work_dir, f"{name}_{index:05d}.ts")
+
+    @staticmethod
+    def audio_path(work_dir: str, name: str = "audio") -> str:
+        """Path of the audio track encoded over the whole timeline."""
+        return os.path.join(work_dir, f"{name}.m4a")
+
+    async def join(self, segment_paths: List[str], audio_path: str, output_path: str) -> str:
+        """
+        Join video-only segments and mux the audio track, all by stream copy.
+
+        Args:
+            segment_paths: Segments in timeline order
+            audio_path: Audio track covering the whole timeline
+            output_path: Path for joined output
+
+        Returns:
+            Path to joined video
+        """
+        logger.info(f"Joining {len(segment_paths)} segments into {output_path}")
+        return await self.video_processor.concat_segments(segment_paths, output_path, audio_path=audio_path)
+
+    @staticmethod
+    def cleanup(work_dir: str) -> None:
+        """Remove a job's scratch directory."""
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    @staticmethod
+    async def segment_done(kind: str, job_ids: Sequence[str], total: int) -> None:
+        """
+        Count a finished segment and publish overall progress for the job.
+
+        Args:
+            kind: Job kind (splice, export)
+            job_ids: Jobs sharing the encode
+            total: Number of segments in the encode
+        """
+        key = f"{REDIS_KEY_PREFIX}{kind}:{job_ids[0]}"
+        try:
+            redis = get_redis()
+            done = await redis.incr(key)
+            await redis.expire(key, settings.PROGRESS_TTL)
+        except (RedisError, OSError) as e:
+            logger.warning(f"Failed to count segment for {kind} {job_ids[0]}: {str(e)}")
+            return
+
+        # Joining still remains once every segment is encoded
+        percent = min(done / total * 100, 99.9)
+        await JobProgressReporter(kind, job_ids).publish(
+            FFmpegProgress(out_time=0.0, fps=0.0, speed=0.0, percent=percent)
+        )
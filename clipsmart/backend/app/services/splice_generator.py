@@ -2,8 +2,10 @@
 Splice generation service for creating split-screen videos.
 """
 
+import os
 import logging
-from typing import List, Dict, Any, Optional
+import tempfile
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -12,8 +14,17 @@ from app.models.clip import Clip
 from app.models.splice import Splice, SpliceMode, SpliceStatus, splice_clips
 from app.models.video import Video
 from app.services.minimax import MinimaxService
+from app.services.beat_tracker import plan_beat_timeline
+from app.services.layout_engine import shift_track
+from app.services.local_analysis import LocalAnalysisService
+from app.services.loudness import LoudnessService
+from app.services.reframe import ReframeService
 from app.services.video_processor import VideoProcessorService
-from app.core.exceptions import ProcessingError, ValidationError
+from app.services.ffmpeg_runner import ProgressCallback
+from app.services.progress import JobProgressReporter, row_persister
+from app.services.segmented_encode import SegmentedEncodeService
+from app.services.stream_packager import StreamPackager
+from app.core.exceptions import ExternalAPIError, ProcessingError, ValidationError
 from app.core.config import get_settings
 
 settings = get_settings()
@@ -26,6 +37,11 @@ class SpliceGeneratorService:
     def __init__(self):
         self.minimax = MinimaxService()
         self.video_processor = VideoProcessorService()
+        self.segmented = SegmentedEncodeService()
+        self.loudness = LoudnessService(processor=self.video_processor)
+        self.reframe = ReframeService()
+        self.local_analysis = LocalAnalysisService()
+        self.packager = StreamPackager(self.video_processor)
 
     async def generate_splice(
         self,
@@ -78,6 +94,8 @@ class SpliceGeneratorService:
                 "attention_score": clip.attention_score or 0.5,
                 "engagement_score": clip.engagement_score or 0.5,
                 "virality_score": clip.virality_score or 0.5,
+                "audio_energy_score": clip.audio_energy_score,
+                "visual_score": clip.visual_score,
                 "keywords": clip.keywords or [],
                 "sentiment": clip.sentiment,
             }
@@ -85,16 +103,31 @@ class SpliceGeneratorService:
         ]
 
         # Get AI recommendations
-        recommendations = await self.minimax.generate_splice_recommendations(
-            clips=clips_data,
-            mode=mode.value,
-            target_duration=target_duration,
-            num_clips=num_clips
-        )
+        try:
+            recommendations = await self.minimax.generate_splice_recommendations(
+                clips=clips_data,
+                mode=mode.value,
+                target_duration=target_duration,
+                num_clips=num_clips
+            )
+        except ExternalAPIError as e:
+            logger.warning(f"AI splice selection failed, ranking clips locally: {e.detail}")
+            recommendations = {}
 
         selected_clip_ids = recommendations.get("selected_clips", [])
         ai_rationale = recommendations.get("rationale", "")
 
+        if not selected_clip_ids:
+            selected = await self.select_clips_by_mode(available_clips, mode, num_clips)
+            selected_clip_ids = [clip.id for clip in selected]
+            ai_rationale = f"Selected locally by {mode.value} ranking"
+
+        generation_params = recommendations.get("params") or {}
+        if settings.BEAT_SYNC_ENABLED:
+            timeline = await self._plan_timeline(db, available_clips, selected_clip_ids)
+            if timeline:
+                generation_params = {**generation_params, "timeline": timeline}
+
         # Create splice record
         splice = Splice(
             user_id=user_id,
@@ -104,7 +137,7 @@ class SpliceGeneratorService:
             num_clips=num_clips,
             layout=layout,
             status=SpliceStatus.PENDING,
-            generation_params=recommendations.get("params", {}),
+            generation_params=generation_params,
             ai_rationale=ai_rationale,
         )
 
@@ -157,29 +190,328 @@ class SpliceGeneratorService:
             splice.status = SpliceStatus.PROCESSING
             await db.commit()
 
-            # Get associated clips in order
-            result = await db.execute(
-                select(Clip, splice_clips.c.position)
-                .join(splice_clips, Clip.id == splice_clips.c.clip_id)
-                .where(splice_clips.c.splice_id == splice_id)
-                .order_by(splice_clips.c.position)
-            )
-            clips_with_position = result.all()
-            clips = [clip for clip, _ in clips_with_position]
+            clips, videos = await self._load_splice_clips(db, splice_id)
+            ranges = self._clip_ranges(splice, clips)
 
-            # Get parent videos for clips
-            video_ids = [clip.video_id for clip in clips]
-            result = await db.execute(
-                select(Video).where(Video.id.in_(video_ids))
+            # Loudness is measured over the rendered (beat-snapped) ranges;
+            # it and crop tracks are cached on the row for clips' own ranges
+            gains = [0.0] * len(clips)
+            if settings.LOUDNESS_NORMALIZATION_ENABLED:
+                gains = await self.loudness.measure_clips(clips, videos, ranges)
+            if settings.REFRAME_ENABLED:
+                await self.reframe.track_clips(clips, videos)
+            await db.commit()
+
+            # Generate output path
+            output_path = self._output_path(splice_id)
+
+            sources = [
+                {
+                    "file_path": videos[clip.video_id].edit_source_path,
+                    "start_time": start_time,
+                    "end_time": end_time,
+                    "gain_db": gain_db,
+                    "crop_track": self._crop_track(clip, start_time),
+                }
+                for clip, (start_time, end_time), gain_db in zip(clips, ranges, gains)
+            ]
+
+            # The composited timeline runs as long as the longest clip
+            longest = max(range(len(clips)), key=lambda i: ranges[i][1] - ranges[i][0])
+            longest_start, longest_end = ranges[longest]
+            if settings.SPLICE_SINGLE_PASS_RENDER and self.segmented.should_distribute(
+                longest_end - longest_start
+            ):
+                from app.tasks.segment_tasks import dispatch_splice_segments
+
+                # Cut where the longest clip's source has keyframes
+                windows = await self.segmented.plan_windows(
+                    videos[clips[longest].video_id].edit_source_path,
+                    longest_start,
+                    longest_end
+                )
+                dispatch_splice_segments(
+                    splice_id=splice.id,
+                    sources=sources,
+                    windows=[list(window) for window in windows],
+                    layout=splice.layout,
+                    resolution="1080x1920",
+                    fps=30,
+                    work_dir=self.segmented.work_dir("splice", splice.id)
+                )
+                # Finished by the join task once every segment is encoded
+                return splice
+
+            reporter = JobProgressReporter(
+                "splice",
+                splice.id,
+                persist=row_persister(db, splice)
             )
-            videos = {v.id: v for v in result.scalars().all()}
 
-            # Extract individual clips to temp files
-            import tempfile
-            import os
+            if settings.SPLICE_SINGLE_PASS_RENDER:
+                # Decode sources once and encode the layout directly
+                await self.video_processor.render_from_sources(
+                    sources=sources,
+                    output_path=output_path,
+                    layout=splice.layout,
+                    resolution="1080x1920",
+                    fps=30,
+                    progress=reporter
+                )
+            else:
+                await self._render_from_extracted_clips(
+                    clips=clips,
+                    videos=videos,
+                    ranges=ranges,
+                    gains=gains,
+                    output_path=output_path,
+                    layout=splice.layout,
+                    progress=reporter
+                )
+
+            return await self._finish_render(db, splice, clips, output_path)
+
+        except Exception as e:
+            logger.error(f"Failed to render splice: {str(e)}")
+            splice.status = SpliceStatus.FAILED
+            splice.processing_error = str(e)
+            await db.commit()
+            raise ProcessingError(f"Failed to render splice: {str(e)}")
+
+    async def complete_segmented_render(
+        self,
+        db: AsyncSession,
+        splice_id: str,
+        segment_paths: List[str],
+        audio_path: str
+    ) -> Splice:
+        """
+        Join a distributed render's segments and finish the splice.
 
-            temp_clip_paths = []
-            for clip in clips:
+        Args:
+            db: Database session
+            splice_id: Splice ID
+            segment_paths: Encoded video segments in timeline order
+            audio_path: Audio track of the whole timeline
+
+        Returns:
+            Updated Splice object
+        """
+        result = await db.execute(
+            select(Splice).where(Splice.id == splice_id)
+        )
+        splice = result.scalar_one_or_none()
+
+        if not splice:
+            raise ValidationError(f"Splice not found: {splice_id}")
+
+        try:
+            clips, _ = await self._load_splice_clips(db, splice_id)
+            output_path = await self.segmented.join(segment_paths, audio_path, self._output_path(splice_id))
+            return await self._finish_render(db, splice, clips, output_path)
+
+        except Exception as e:
+            logger.error(f"Failed to render splice: {str(e)}")
+            splice.status = SpliceStatus.FAILED
+            splice.processing_error = str(e)
+            await db.commit()
+            raise ProcessingError(f"Failed to render splice: {str(e)}")
+
+    async def _plan_timeline(
+        self,
+        db: AsyncSession,
+        clips: List[Clip],
+        clip_ids: List[str]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Snap the selected clips' edges onto the beats of their source audio.
+
+        Beat grids are tracked from the cached PCM for videos analyzed before
+        beat tracking existed; that runs far faster than real time.
+
+        Args:
+            db: Database session
+            clips: Available clips
+            clip_ids: Selected clip IDs in splice order
+
+        Returns:
+            List of dicts with clip_id, start_time and end_time in splice
+            order, or None when nothing was selected
+        """
+        clips_by_id = {clip.id: clip for clip in clips}
+        selected = [clips_by_id[clip_id] for clip_id in clip_ids if clip_id in clips_by_id]
+        if not selected:
+            return None
+
+        result = await db.execute(
+            select(Video).where(Video.id.in_({clip.video_id for clip in selected}))
+        )
+        beat_grids = {}
+        for video in result.scalars().all():
+            beat_grids[video.id] = await self.local_analysis.beat_grid(video)
+
+        timeline = plan_beat_timeline(
+            [(clip.start_time, clip.end_time) for clip in selected],
+            [beat_grids.get(clip.video_id) for clip in selected]
+        )
+        return [{"clip_id": clip.id, **edges} for clip, edges in zip(selected, timeline)]
+
+    @staticmethod
+    def _clip_ranges(splice: Splice, clips: List[Clip]) -> List[Tuple[float, float]]:
+        """Each clip's (start, end) in this splice, from the beat-snapped timeline when planned."""
+        timeline = {
+            entry["clip_id"]: entry
+            for entry in (splice.generation_params or {}).get("timeline", [])
+        }
+        return [
+            (timeline[clip.id]["start_time"], timeline[clip.id]["end_time"])
+            if clip.id in timeline else (clip.start_time, clip.end_time)
+            for clip in clips
+        ]
+
+    @staticmethod
+    def _crop_track(clip: Clip, start_time: float) -> Optional[Dict[str, Any]]:
+        """A clip's cached crop track, moved onto its in point in this splice; None to letterbox it."""
+        if not settings.REFRAME_ENABLED:
+            return None
+        return shift_track(clip.crop_track, start_time - clip.start_time)
+
+    @staticmethod
+    def _output_path(splice_id: str) -> str:
+        """Path of a splice's rendered video."""
+        return os.path.join(settings.EXPORT_DIR, f"splice_{splice_id}.mp4")
+
+    async def _load_splice_clips(
+        self,
+        db: AsyncSession,
+        splice_id: str
+    ) -> Tuple[List[Clip], Dict[str, Video]]:
+        """
+        Load a splice's clips in order along with their parent videos.
+
+        Args:
+            db: Database session
+            splice_id: Splice ID
+
+        Returns:
+            Tuple of (clips in splice order, parent videos keyed by ID)
+        """
+        # Get associated clips in order
+        result = await db.execute(
+            select(Clip, splice_clips.c.position)
+            .join(splice_clips, Clip.id == splice_clips.c.clip_id)
+            .where(splice_clips.c.splice_id == splice_id)
+            .order_by(splice_clips.c.position)
+        )
+        clips_with_position = result.all()
+        clips = [clip for clip, _ in clips_with_position]
+
+        # Get parent videos for clips
+        video_ids = [clip.video_id for clip in clips]
+        result = await db.execute(
+            select(Video).where(Video.id.in_(video_ids))
+        )
+        videos = {v.id: v for v in result.scalars().all()}
+
+        return clips, videos
+
+    async def _finish_render(
+        self,
+        db: AsyncSession,
+        splice: Splice,
+        clips: List[Clip],
+        output_path: str
+    ) -> Splice:
+        """
+        Record a rendered splice's output and generate its caption and hashtags.
+
+        Args:
+            db: Database session
+            splice: Splice being rendered
+            clips: Clips in splice order
+            output_path: Path to rendered video
+
+        Returns:
+            Updated Splice object
+        """
+        # Get file size
+        file_size = os.path.getsize(output_path)
+
+        # Update splice record
+        splice.file_path = output_path
+        splice.file_size = file_size
+        splice.status = SpliceStatus.COMPLETED
+        splice.completed_at = datetime.utcnow()
+
+        # Calculate actual duration
+        metadata = await self.video_processor.get_video_metadata(output_path)
+        splice.duration = int(metadata['duration'])
+
+        # Measured once here so exports normalize without another analysis pass
+        if settings.LOUDNESS_NORMALIZATION_ENABLED:
+            measurement = await self.loudness.measure_file(output_path)
+            if measurement:
+                splice.loudness_lufs = measurement["integrated_lufs"]
+                splice.true_peak_db = measurement["true_peak_db"]
+
+        if settings.HLS_PACKAGING_ENABLED:
+            try:
+                package = await self.packager.package([output_path], StreamPackager.output_dir(output_path))
+                urls = StreamPackager.urls(package, "splices", splice.id, "stream")
+            except ProcessingError as e:
+                # The MP4 is still playable; only the streaming preview is missing
+                logger.warning(f"Cannot package preview of splice {splice.id}: {e.detail}")
+                urls = {"hls": None, "dash": None}
+            splice.hls_url = urls["hls"]
+            splice.dash_url = urls["dash"]
+
+        # Generate caption and hashtags
+        content_metadata = {
+            "mode": splice.mode.value,
+            "num_clips": splice.num_clips,
+            "keywords": [kw for clip in clips for kw in (clip.keywords or [])],
+        }
+
+        caption = await self.minimax.generate_caption(content_metadata, platform="tiktok")
+        hashtags = await self.minimax.generate_hashtags(content_metadata, platform="tiktok")
+
+        splice.caption = caption
+        splice.hashtags = hashtags
+
+        await db.commit()
+        await db.refresh(splice)
+
+        logger.info(f"Splice rendered successfully: {splice.id}")
+        return splice
+
+    async def _render_from_extracted_clips(
+        self,
+        clips: List[Clip],
+        videos: Dict[str, Video],
+        ranges: List[Tuple[float, float]],
+        gains: List[float],
+        output_path: str,
+        layout: str,
+        progress: Optional[ProgressCallback] = None
+    ) -> str:
+        """
+        Render a splice by extracting each clip to a temp file first.
+
+        Args:
+            clips: Clips in splice order
+            videos: Parent videos keyed by ID
+            ranges: (start, end) of each clip in this splice
+            gains: Loudness normalization gain of each clip in dB
+            output_path: Path for output video
+            layout: Video layout type
+            progress: Optional callback for compositing progress
+
+        Returns:
+            Path to rendered video
+        """
+        temp_clip_paths = []
+        try:
+            for clip, (start_time, end_time) in zip(clips, ranges):
                 video = videos[clip.video_id]
                 temp_clip = tempfile.NamedTemporaryFile(
                     delete=False,
@@ -187,76 +519,36 @@ class SpliceGeneratorService:
                     dir=settings.UPLOAD_DIR
                 )
                 temp_clip.close()
+                temp_clip_paths.append(temp_clip.name)
 
                 await self.video_processor.extract_clip(
-                    input_path=video.file_path,
+                    input_path=video.edit_source_path,
                     output_path=temp_clip.name,
-                    start_time=clip.start_time,
-                    end_time=clip.end_time,
+                    start_time=start_time,
+                    end_time=end_time,
                     include_audio=True
                 )
 
-                temp_clip_paths.append(temp_clip.name)
-
-            # Generate output path
-            output_filename = f"splice_{splice_id}.mp4"
-            output_path = os.path.join(settings.EXPORT_DIR, output_filename)
-
             # Create split-screen video
-            await self.video_processor.create_split_screen(
+            return await self.video_processor.create_split_screen(
                 clip_paths=temp_clip_paths,
                 output_path=output_path,
-                layout=splice.layout,
+                layout=layout,
                 resolution="1080x1920",
-                fps=30
+                fps=30,
+                progress=progress,
+                gains=gains,
+                crop_tracks=[self._crop_track(clip, start_time) for clip, (start_time, _) in zip(clips, ranges)]
             )
 
+        finally:
             # Clean up temp files
             for temp_path in temp_clip_paths:
                 try:
                     os.remove(temp_path)
-                except:
+                except OSError:
                     pass
 
-            # Get file size
-            file_size = os.path.getsize(output_path)
-
-            # Update splice record
-            splice.file_path = output_path
-            splice.file_size = file_size
-            splice.status = SpliceStatus.COMPLETED
-            splice.completed_at = datetime.utcnow()
-
-            # Calculate actual duration
-            metadata = await self.video_processor.get_video_metadata(output_path)
-            splice.duration = int(metadata['duration'])
-
-            # Generate caption and hashtags
-            content_metadata = {
-                "mode": splice.mode.value,
-                "num_clips": splice.num_clips,
-                "keywords": [kw for clip in clips for kw in (clip.keywords or [])],
-            }
-
-            caption = await self.minimax.generate_caption(content_metadata, platform="tiktok")
-            hashtags = await self.minimax.generate_hashtags(content_metadata, platform="tiktok")
-
-            splice.caption = caption
-            splice.hashtags = hashtags
-
-            await db.commit()
-            await db.refresh(splice)
-
-            logger.info(f"Splice rendered successfully: {splice_id}")
-            return splice
-
-        except Exception as e:
-            logger.error(f"Failed to render splice: {str(e)}")
-            splice.status = SpliceStatus.FAILED
-            splice.processing_error = str(e)
-            await db.commit()
-            raise ProcessingError(f"Failed to render splice: {str(e)}")
-
     async def select_clips_by_mode(
         self,
         clips: List[Clip],
@@ -278,7 +570,7 @@ class SpliceGeneratorService:
             # Group by keywords/topics, select diverse but coherent clips
             sorted_clips = sorted(
                 clips,
-                key=lambda c: (c.attention_score or 0) + (c.engagement_score or 0),
+                key=lambda c: (c.attention_score or 0) + (c.engagement_score or 0) + self.local_score(c),
                 reverse=True
             )
 
@@ -286,7 +578,7 @@ class SpliceGeneratorService:
             # Maximum variety - select clips with different sentiments/topics
             sorted_clips = sorted(
                 clips,
-                key=lambda c: len(c.keywords or []),
+                key=lambda c: (len(c.keywords or []), self.local_score(c)),
                 reverse=True
             )
 
@@ -294,11 +586,28 @@ class SpliceGeneratorService:
             # Highest virality potential
             sorted_clips = sorted(
                 clips,
-                key=lambda c: (c.virality_score or 0),
+                key=lambda c: (c.virality_score or 0, self.local_score(c)),
                 reverse=True
             )
 
         else:
-            sorted_clips = clips
+            sorted_clips = sorted(clips, key=self.local_score, reverse=True)
 
         return sorted_clips[:num_clips]
+
+    @staticmethod
+    def local_score(clip: Clip) -> float:
+        """
+        Rank a clip from on-box analysis alone.
+
+        Averages the audio energy and visual activity scores that are
+        available, so ranking works without an API round trip.
+
+        Args:
+            clip: Clip to score
+
+        Returns:
+            Score in 0-1 (0 without local analysis)
+        """
+        scores = [score for score in (clip.audio_energy_score, clip.visual_score) if score is not None]
+        return sum(scores) / len(scores) if scores else 0.0
@@ -0,0 +1,157 @@
+"""
+HLS/DASH preview packaging by stream copy.
+
+Renders and ingest renditions already have keyframes on a regular grid, so
+they are cut into short fMP4 segments without re-encoding. With DASH
+enabled the DASH muxer writes both manifests over one set of segments.
+
+Every packaging run writes a new version directory, so a re-render gets
+new URLs and players never mix cached files of two renders.
+"""
+
+import os
+import uuid
+import shutil
+import logging
+from typing import Any, Dict, List, Optional
+
+import ffmpeg
+
+from app.core.config import get_settings
+from app.core.exceptions import ProcessingError
+from app.services.ffmpeg_runner import FFmpegRunner
+from app.services.media_streaming import media_url
+from app.services.video_processor import VideoProcessorService
+
+settings = get_settings()
+logger = logging.getLogger("clipsmart.stream_packager")
+
+# Entry points; the DASH muxer also names its HLS master playlist master.m3u8
+HLS_MASTER = "master.m3u8"
+DASH_MANIFEST = "manifest.mpd"
+
+
+class StreamPackager:
+    """Segments renders and renditions into adaptive streaming packages."""
+
+    def __init__(self, processor: Optional[VideoProcessorService] = None, runner: Optional[FFmpegRunner] = None):
+        self.processor = processor or VideoProcessorService()
+        self.runner = runner or self.processor.runner
+
+    @staticmethod
+    def output_dir(media_path: str) -> str:
+        """Directory holding the streaming package versions of a media file, next to it."""
+        return f"{os.path.splitext(media_path)[0]}.stream"
+
+    @staticmethod
+    def urls(package: Dict[str, Optional[str]], *parts: str) -> Dict[str, Optional[str]]:
+        """
+        Media endpoint URLs of a package's entry points.
+
+        Args:
+            package: Result of package()
+            parts: Media URL path of the package versions, e.g. ("splices", id, "stream")
+        """
+        urls = {}
+        for kind, path in package.items():
+            urls[kind] = None
+            if path:
+                # <output_dir>/<version>/<entry point>
+                version = os.path.basename(os.path.dirname(path))
+                urls[kind] = media_url(*parts, version, os.path.basename(path))
+        return urls
+
+    def _hls_output(self, inputs: List[Any], work_dir: str, variants: int, has_audio: bool) -> Any:
+        var_stream_map = " ".join(f"v:{i},a:{i}" if has_audio else f"v:{i}" for i in range(variants))
+        return ffmpeg.output(
+            *inputs,
+            os.path.join(work_dir, "stream_%v.m3u8"),
+            c='copy',
+            format='hls',
+            hls_time=f"{settings.HLS_SEGMENT_SECONDS:g}",
+            hls_playlist_type='vod',
+            hls_segment_type='fmp4',
+            # ffmpeg only expands %v here when there are several variants
+            hls_fmp4_init_filename='init_%v.mp4' if variants > 1 else 'init_0.mp4',
+            hls_segment_filename=os.path.join(work_dir, "segment_%v_%05d.m4s"),
+            master_pl_name=HLS_MASTER,
+            var_stream_map=var_stream_map
+        )
+
+    def _dash_output(self, inputs: List[Any], work_dir: str, has_audio: bool) -> Any:
+        adaptation_sets = "id=0,streams=v id=1,streams=a" if has_audio else "id=0,streams=v"
+        return ffmpeg.output(
+            *inputs,
+            os.path.join(work_dir, DASH_MANIFEST),
+            c='copy',
+            format='dash',
+            seg_duration=f"{settings.HLS_SEGMENT_SECONDS:g}",
+            use_template=1,
+            use_timeline=1,
+            hls_playlist=1,
+            adaptation_sets=adaptation_sets,
+            init_seg_name='init_$RepresentationID$.m4s',
+            media_seg_name='segment_$RepresentationID$_$Number%05d$.m4s'
+        )
+
+    async def package(self, variant_paths: List[str], output_dir: str) -> Dict[str, Optional[str]]:
+        """
+        Package one or more renditions of the same content for streaming.
+
+        Variants must share a keyframe grid (e.g. mezzanine and proxy) so
+        players can switch between them at segment boundaries. The package
+        is written to a scratch directory and renamed to a new version
+        directory when complete; earlier versions are then removed.
+
+        Args:
+            variant_paths: Renditions, lowest bitrate first
+            output_dir: Directory of package versions (see output_dir())
+
+        Returns:
+            Dict with "hls" (master playlist path) and "dash" (manifest
+            path, or None when DASH packaging is disabled)
+        """
+        if not variant_paths:
+            raise ProcessingError("Nothing to package")
+
+        logger.info(f"Packaging {len(variant_paths)} variant(s) into {output_dir}")
+
+        metadata = [await self.processor.get_video_metadata(path) for path in variant_paths]
+        has_audio = all(meta['has_audio'] for meta in metadata)
+
+        inputs = []
+        for path in variant_paths:
+            stream = ffmpeg.input(path)
+            inputs.append(stream.video)
+            if has_audio:
+                inputs.append(stream.audio)
+
+        version = uuid.uuid4().hex[:12]
+        package_dir = os.path.join(output_dir, version)
+        work_dir = f"{package_dir}.tmp"
+        os.makedirs(work_dir)
+
+        try:
+            if settings.DASH_PACKAGING_ENABLED:
+                output = self._dash_output(inputs, work_dir, has_audio)
+            else:
+                output = self._hls_output(inputs, work_dir, len(variant_paths), has_audio)
+
+            await self.runner.run(output)
+
+            os.rename(work_dir, package_dir)
+
+        except ProcessingError as e:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            logger.error(f"FFmpeg error: {e.detail}")
+            raise ProcessingError(f"Failed to package stream: {e.detail}")
+
+        # Superseded versions; a concurrent run's scratch directory is left alone
+        for name in os.listdir(output_dir):
+            if name != version and not name.endswith(".tmp"):
+                shutil.rmtree(os.path.join(output_dir, name), ignore_errors=True)
+
+        return {
+            "hls": os.path.join(package_dir, HLS_MASTER),
+            "dash": os.path.join(package_dir, DASH_MANIFEST) if settings.DASH_PACKAGING_ENABLED else None,
+        }
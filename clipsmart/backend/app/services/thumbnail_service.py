@@ -0,0 +1,284 @@
+"""
+Thumbnail bundle generation: posters, per-clip thumbnails and scrub sprites.
+"""
+
+import os
+import math
+import shutil
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import ffmpeg
+
+from app.core.config import get_settings
+from app.core.exceptions import ProcessingError
+from app.models.clip import Clip
+from app.models.video import Video
+from app.services.ffmpeg_runner import FFmpegRunner
+from app.services.media_streaming import media_url
+
+settings = get_settings()
+logger = logging.getLogger("clipsmart.thumbnails")
+
+# Encoder options per output image format
+IMAGE_FORMATS = {
+    "jpeg": ("jpg", {'vcodec': 'mjpeg', 'q:v': 3}),
+    "webp": ("webp", {'vcodec': 'libwebp', 'quality': 80}),
+}
+
+
+def _timestamp(seconds: float) -> str:
+    """Format seconds as a WebVTT timestamp."""
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{secs:06.3f}"
+
+
+class ThumbnailService:
+    """Renders every still a video needs from a single decode of its proxy."""
+
+    def __init__(self, runner: Optional[FFmpegRunner] = None):
+        self.runner = runner or FFmpegRunner(ffmpeg_path=settings.FFMPPEG_PATH)
+        self.extension, self.encode_kwargs = IMAGE_FORMATS.get(
+            settings.THUMBNAIL_FORMAT, IMAGE_FORMATS["jpeg"]
+        )
+
+    @staticmethod
+    def output_dir(video_id: str) -> str:
+        """Directory holding a video's thumbnails."""
+        return os.path.join(settings.THUMBNAIL_DIR, video_id)
+
+    @staticmethod
+    def url_for(video_id: str, filename: str) -> str:
+        """Public URL of a thumbnail file."""
+        return media_url("videos", video_id, "thumbnails", filename)
+
+    async def generate_video_thumbnails(self, video: Video, clips: Sequence[Clip] = ()) -> Dict[str, Any]:
+        """
+        Render posters, scrub sprites and any clip thumbnails for a video.
+
+        Sets video.thumbnail_url, video.thumbnails and each clip's
+        thumbnail_url; the caller commits.
+
+        Args:
+            video: Video to render thumbnails for
+            clips: Clips of the video that need thumbnails
+
+        Returns:
+            The thumbnails manifest stored on the video
+        """
+        bundle = await self.generate_bundle(
+            video_path=video.analysis_source_path,
+            output_dir=self.output_dir(video.id),
+            duration=video.duration,
+            width=video.width,
+            height=video.height,
+            poster_sizes=settings.THUMBNAIL_POSTER_SIZES,
+            clip_times={clip.id: (clip.start_time + clip.end_time) / 2 for clip in clips},
+            sprites=True
+        )
+
+        manifest = {
+            "posters": {
+                str(size): self.url_for(video.id, name) for size, name in bundle["posters"].items()
+            },
+            "sprites": [self.url_for(video.id, name) for name in bundle["sprites"]],
+            "sprite_vtt": self.url_for(video.id, bundle["sprite_vtt"]) if bundle["sprite_vtt"] else None,
+        }
+
+        video.thumbnails = manifest
+        if bundle["posters"]:
+            # Largest poster doubles as the default thumbnail
+            video.thumbnail_url = self.url_for(video.id, bundle["posters"][max(bundle["posters"])])
+
+        for clip in clips:
+            clip.thumbnail_url = self.url_for(video.id, bundle["clips"][clip.id])
+
+        return manifest
+
+    async def generate_clip_thumbnails(self, video: Video, clips: Sequence[Clip]) -> None:
+        """
+        Render one thumbnail per clip in a single pass and set clip.thumbnail_url.
+
+        Args:
+            video: Parent video
+            clips: Clips needing thumbnails; the caller commits
+        """
+        if not clips:
+            return
+
+        bundle = await self.generate_bundle(
+            video_path=video.analysis_source_path,
+            output_dir=self.output_dir(video.id),
+            duration=video.duration,
+            width=video.width,
+            height=video.height,
+            clip_times={clip.id: (clip.start_time + clip.end_time) / 2 for clip in clips}
+        )
+
+        for clip in clips:
+            clip.thumbnail_url = self.url_for(video.id, bundle["clips"][clip.id])
+
+    async def generate_bundle(
+        self,
+        video_path: str,
+        output_dir: str,
+        duration: float,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        poster_sizes: Sequence[int] = (),
+        clip_times: Optional[Dict[str, float]] = None,
+        sprites: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Render a set of stills with one FFmpeg process.
+
+        The input is decoded once and split into a branch per still, each
+        selecting the first frame at its timestamp, plus a sampled and tiled
+        branch for sprite sheets. FFmpeg stops decoding as soon as every
+        output is complete.
+
+        Args:
+            video_path: Video to decode (ideally the low-res proxy)
+            output_dir: Directory for the images
+            duration: Video duration in seconds
+            width: Video width, for aspect ratio
+            height: Video height, for aspect ratio
+            poster_sizes: Long-side sizes of the mid-video poster
+            clip_times: Timestamp per clip ID for clip thumbnails
+            sprites: Whether to render scrub sprite sheets and their VTT index
+
+        Returns:
+            Dict of file names: posters by size, clips by ID, sprites and sprite_vtt
+        """
+        clip_times = clip_times or {}
+        os.makedirs(output_dir, exist_ok=True)
+        landscape = (width or 16) >= (height or 9)
+
+        bundle = {"posters": {}, "clips": {}, "sprites": [], "sprite_vtt": None}
+
+        # One output per distinct timestamp; clips sharing a frame share a file
+        stills: Dict[float, List[Dict[str, Any]]] = {}
+        if poster_sizes:
+            poster_time = round(duration / 2, 3)
+            for size in poster_sizes:
+                name = f"poster_{size}.{self.extension}"
+                stills.setdefault(poster_time, []).append({"name": name, "size": size})
+                bundle["posters"][size] = name
+        for clip_id, t in clip_times.items():
+            name = f"clip_{clip_id}.{self.extension}"
+            stills.setdefault(round(t, 3), []).append({"name": name, "size": settings.THUMBNAIL_CLIP_SIZE})
+            bundle["clips"][clip_id] = name
+
+        branches = len(stills) + (1 if sprites else 0)
+        if not branches:
+            return bundle
+
+        stream = ffmpeg.input(video_path).video
+        if branches > 1:
+            split = stream.filter_multi_output('split', branches)
+            streams = iter([split[i] for i in range(branches)])
+        else:
+            streams = iter([stream])
+
+        outputs = []
+        copies = []
+        for t, targets in sorted(stills.items()):
+            frame = next(streams).filter('select', f"gte(t,{t})")
+            sizes = sorted({target["size"] for target in targets})
+            if len(sizes) > 1:
+                split = frame.filter_multi_output('split', len(sizes))
+                scaled = [split[i] for i in range(len(sizes))]
+            else:
+                scaled = [frame]
+
+            by_size = {}
+            for size, branch in zip(sizes, scaled):
+                scale = (size, -2) if landscape else (-2, size)
+                by_size[size] = branch.filter('scale', *scale)
+
+            written = {}
+            for target in targets:
+                path = os.path.join(output_dir, target["name"])
+                if target["size"] in written:
+                    # Same frame and size under another name; copied after the run
+                    copies.append((written[target["size"]], path))
+                    continue
+                written[target["size"]] = path
+                outputs.append(ffmpeg.output(
+                    by_size[target["size"]],
+                    path,
+                    vframes=1,
+                    format='image2',
+                    update=1,
+                    **self.encode_kwargs
+                ))
+
+        sprite_plan = None
+        if sprites:
+            sprite_plan = self._sprite_plan(duration, width, height)
+            tiles = (
+                next(streams)
+                .filter('fps', fps=f"1/{sprite_plan['interval']}")
+                .filter('scale', sprite_plan['tile_width'], sprite_plan['tile_height'])
+                .filter('tile', f"{settings.SPRITE_COLUMNS}x{settings.SPRITE_ROWS}")
+            )
+            outputs.append(ffmpeg.output(
+                tiles,
+                os.path.join(output_dir, f"sprite_%03d.{self.extension}"),
+                format='image2',
+                fps_mode='passthrough',
+                **self.encode_kwargs
+            ))
+
+        logger.info(f"Rendering {len(outputs)} thumbnail outputs for {video_path} in one pass")
+
+        try:
+            await self.runner.run(ffmpeg.merge_outputs(*outputs))
+        except ProcessingError as e:
+            logger.error(f"FFmpeg error: {e.detail}")
+            raise ProcessingError(f"Failed to generate thumbnails: {e.detail}")
+
+        for src, dst in copies:
+            shutil.copyfile(src, dst)
+
+        if sprite_plan is not None:
+            bundle["sprites"], bundle["sprite_vtt"] = self._write_sprite_vtt(output_dir, duration, sprite_plan)
+
+        return bundle
+
+    @staticmethod
+    def _sprite_plan(duration: float, width: Optional[int], height: Optional[int]) -> Dict[str, Any]:
+        """Sampling interval and tile geometry for sprite sheets."""
+        interval = max(settings.SPRITE_INTERVAL, duration / settings.SPRITE_MAX_TILES)
+        tile_width = settings.SPRITE_TILE_WIDTH
+        tile_height = int(tile_width * (height or 9) / (width or 16)) // 2 * 2
+        return {
+            "interval": round(interval, 3),
+            "tile_width": tile_width,
+            "tile_height": tile_height,
+            "tiles": max(1, math.ceil(duration / interval)),
+        }
+
+    def _write_sprite_vtt(self, output_dir: str, duration: float, plan: Dict[str, Any]) -> Tuple[List[str], str]:
+        """Write the WebVTT index mapping time ranges to sprite tiles."""
+        per_sheet = settings.SPRITE_COLUMNS * settings.SPRITE_ROWS
+        sheets = math.ceil(plan["tiles"] / per_sheet)
+        names = [f"sprite_{i + 1:03d}.{self.extension}" for i in range(sheets)]
+
+        lines = ["WEBVTT", ""]
+        for i in range(plan["tiles"]):
+            start = i * plan["interval"]
+            end = min(start + plan["interval"], duration)
+            sheet, cell = divmod(i, per_sheet)
+            row, col = divmod(cell, settings.SPRITE_COLUMNS)
+            x, y = col * plan["tile_width"], row * plan["tile_height"]
+            lines.append(f"{_timestamp(start)} --> {_timestamp(end)}")
+            lines.append(f"{names[sheet]}#xywh={x},{y},{plan['tile_width']},{plan['tile_height']}")
+            lines.append("")
+
+        vtt_name = "sprites.vtt"
+        with open(os.path.join(output_dir, vtt_name), "w") as f:
+            f.write("\n".join(lines))
+
+        return names, vtt_name
@@ -1,22 +1,82 @@
 """
-Video processing service using FFmpeg and OpenCV.
+Video processing service using FFmpeg.
 """
 
 import os
+import asyncio
+import re
+import math
 import logging
+import shutil
 import subprocess
+import tempfile
 import json
+from fractions import Fraction
 from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
-import cv2
 import ffmpeg
 
 from app.core.config import get_settings
 from app.core.exceptions import ProcessingError
+from app.services.ffmpeg_runner import FFmpegRunner, ProgressCallback
+from app.services.keyframe_index import KeyframeIndex
+from app.services.layout_engine import compose, fit_frame, shift_track
+from app.services.probe_cache import ProbeCache
+from app.services.clip_cache import ClipCache
 
 settings = get_settings()
 logger = logging.getLogger("clipsmart.video_processor")
 
+# Platform-specific encoder settings (H.264/AAC everywhere)
+PLATFORM_ENCODE_PRESETS = {
+    # TikTok prefers H.264, AAC, specific bitrate
+    "tiktok": {'crf': 23, 'b:v': '2M', 'b:a': '128k'},
+    "youtube_shorts": {'crf': 22, 'b:v': '3M', 'b:a': '192k'},
+    "instagram_reels": {'crf': 23, 'b:v': '2.5M', 'b:a': '128k'},
+}
+
+# How far before a clip's end to seek when only its final frame is needed
+FINAL_FRAME_SEEK_BACK = 0.5
+
+# Source formats that can be smart-cut: edges are re-encoded with libx264/aac
+# and must stay decodable when joined with stream-copied packets.
+SMART_CUT_VIDEO_CODECS = {"h264"}
+SMART_CUT_AUDIO_CODECS = {"aac"}
+SMART_CUT_PIXEL_FORMATS = {"yuv420p", "yuvj420p"}
+SMART_CUT_H264_PROFILES = {
+    "Constrained Baseline": "baseline",
+    "Baseline": "baseline",
+    "Main": "main",
+    "High": "high",
+}
+
+# H.264 SPS/PPS fields that must agree between re-encoded edges and copied
+# GOPs, as named by the trace_headers bitstream filter: profile, level,
+# references, entropy coder, SAR, colour and timing
+SMART_CUT_SEAM_FIELDS = (
+    "profile_idc",
+    "level_idc",
+    "chroma_format_idc",
+    "frame_mbs_only_flag",
+    "max_num_ref_frames",
+    "entropy_coding_mode_flag",
+    "aspect_ratio_idc",
+    "sar_width",
+    "sar_height",
+    "video_full_range_flag",
+    "colour_primaries",
+    "transfer_characteristics",
+    "matrix_coefficients",
+    "num_units_in_tick",
+    "time_scale",
+)
+
+# A trace_headers line: "[trace_headers @ 0x...] <bit offset>  <name>  <bits> = <value>"
+H264_TRACE_FIELD = re.compile(r"\]\s+\d+\s+(\w+)\s+[01]+\s+=\s+(-?\d+)$")
+
+# Outputs that get fast-start or fragmented MP4 muxing
+MP4_EXTENSIONS = {".mp4", ".m4v", ".mov"}
+
 
 class VideoProcessorService:
     """Service for video processing operations."""
@@ -25,6 +85,9 @@ class VideoProcessorService:
         self.ffmpeg_path = settings.FFMPPEG_PATH
         self.upload_dir = Path(settings.UPLOAD_DIR)
         self.export_dir = Path(settings.EXPORT_DIR)
+        self.runner = FFmpegRunner(ffmpeg_path=self.ffmpeg_path)
+        self.probe_cache = ProbeCache()
+        self.clip_cache = ClipCache()
 
         # Ensure directories exist
         self.upload_dir.mkdir(parents=True, exist_ok=True)
@@ -40,10 +103,20 @@ class VideoProcessorService:
         Returns:
             Dictionary with video metadata
         """
+        cached = await self.probe_cache.get(video_path)
+        if cached is not None:
+            return cached
+
         logger.info(f"Extracting metadata from: {video_path}")
 
         try:
-            probe = ffmpeg.probe(video_path)
+            # Cap how much of the file is scanned; container headers suffice
+            probe = await self.runner.probe(video_path, [
+                "-probesize", str(settings.FFPROBE_PROBESIZE),
+                "-analyzeduration", str(settings.FFPROBE_ANALYZEDURATION),
+                "-show_format",
+                "-show_streams",
+            ])
 
             # Get video stream
             video_stream = next(
@@ -68,23 +141,150 @@ class VideoProcessorService:
                 'height': int(video_stream['height']),
                 'fps': eval(video_stream['r_frame_rate']),
                 'codec': video_stream['codec_name'],
+                'pix_fmt': video_stream.get('pix_fmt'),
+                'profile': video_stream.get('profile'),
                 'has_audio': audio_stream is not None,
+                'audio_codec': audio_stream.get('codec_name') if audio_stream else None,
+                'sample_rate': int(audio_stream.get('sample_rate', 0)) if audio_stream else None,
+                'channels': audio_stream.get('channels') if audio_stream else None,
             }
 
             logger.info(f"Metadata extracted: {metadata}")
+            await self.probe_cache.set(video_path, metadata)
             return metadata
 
-        except ffmpeg.Error as e:
-            logger.error(f"FFprobe error: {e.stderr.decode() if e.stderr else str(e)}")
+        except (ProcessingError, KeyError, ValueError) as e:
+            logger.error(f"FFprobe error: {str(e)}")
             raise ProcessingError(f"Failed to extract video metadata: {str(e)}")
 
+    async def build_keyframe_index(self, video_path: str) -> KeyframeIndex:
+        """
+        Build and persist the keyframe index for a video.
+
+        Args:
+            video_path: Path to video file
+
+        Returns:
+            The built KeyframeIndex
+        """
+        logger.info(f"Building keyframe index for: {video_path}")
+
+        try:
+            index = await KeyframeIndex.build(video_path, runner=self.runner)
+            index.save(KeyframeIndex.path_for(video_path))
+            return index
+
+        except (ProcessingError, OSError) as e:
+            detail = e.detail if isinstance(e, ProcessingError) else str(e)
+            logger.error(f"Keyframe index error: {detail}")
+            raise ProcessingError(f"Failed to build keyframe index: {detail}")
+
+    async def create_ingest_renditions(
+        self,
+        input_path: str,
+        mezzanine_path: str,
+        proxy_path: str
+    ) -> Tuple[str, str]:
+        """
+        Normalize an upload into a mezzanine and an analysis proxy in one decode.
+
+        The mezzanine is constant frame rate H.264/AAC with a short fixed GOP,
+        so clip edges land near keyframes and smart cuts can stream-copy most
+        of a clip. The proxy is a small low-bitrate copy on the same GOP grid
+        for analysis, previews and scrubbing.
+
+        With VIRTUAL_CLIPS_ENABLED both are fragmented MP4 with one fragment
+        per GOP, so clips can be played from them by byte range.
+
+        Args:
+            input_path: Path to uploaded video
+            mezzanine_path: Path for mezzanine output
+            proxy_path: Path for proxy output
+
+        Returns:
+            Tuple of (mezzanine path, proxy path)
+        """
+        logger.info(f"Creating ingest renditions for: {input_path}")
+
+        metadata = await self.get_video_metadata(input_path)
+
+        # Constant frame rate at the source's nominal rate (e.g. 30000/1001)
+        fps = Fraction(min(metadata['fps'], settings.MEZZANINE_MAX_FPS)).limit_denominator(1001)
+        gop = max(1, round(float(fps) * settings.MEZZANINE_GOP_SECONDS))
+        gop_kwargs = {
+            'g': gop,
+            'keyint_min': gop,
+            'sc_threshold': 0,  # no scene-cut keyframes; keep the grid fixed
+            'pix_fmt': 'yuv420p',
+        }
+
+        # One fragment per GOP lets clips be played as byte ranges (virtual clips)
+        if settings.VIRTUAL_CLIPS_ENABLED:
+            movflags = '+frag_keyframe+empty_moov+default_base_moof+global_sidx'
+        else:
+            movflags = '+faststart'
+
+        # Short side becomes PROXY_HEIGHT, e.g. 640x360 or 360x640
+        if metadata['width'] >= metadata['height']:
+            proxy_size = (-2, settings.PROXY_HEIGHT)
+        else:
+            proxy_size = (settings.PROXY_HEIGHT, -2)
+
+        try:
+            stream = ffmpeg.input(input_path)
+            video = stream.video.filter('fps', fps=str(fps))
+            videos = video.filter_multi_output('split', 2)
+
+            mezzanine_streams = [videos[0]]
+            proxy_streams = [videos[1].filter('scale', *proxy_size)]
+            mezzanine_audio = {}
+            proxy_audio = {}
+            if metadata['has_audio']:
+                audios = stream.audio.filter_multi_output('asplit', 2)
+                mezzanine_streams.append(audios[0])
+                proxy_streams.append(audios[1])
+                mezzanine_audio = {'acodec': 'aac', 'ar': 48000, 'b:a': '192k'}
+                proxy_audio = {'acodec': 'aac', 'ar': 48000, 'b:a': '64k'}
+
+            mezzanine = ffmpeg.output(
+                *mezzanine_streams,
+                mezzanine_path,
+                vcodec='libx264',
+                preset=settings.MEZZANINE_PRESET,
+                crf=settings.MEZZANINE_CRF,
+                profile='high',
+                movflags=movflags,
+                **gop_kwargs,
+                **mezzanine_audio
+            )
+            proxy = ffmpeg.output(
+                *proxy_streams,
+                proxy_path,
+                vcodec='libx264',
+                preset='veryfast',
+                crf=settings.PROXY_CRF,
+                movflags=movflags,
+                **gop_kwargs,
+                **proxy_audio
+            )
+
+            await self.runner.run(ffmpeg.merge_outputs(mezzanine, proxy))
+
+            logger.info(f"Ingest renditions created: {mezzanine_path}, {proxy_path}")
+            return mezzanine_path, proxy_path
+
+        except ProcessingError as e:
+            logger.error(f"FFmpeg error: {e.detail}")
+            raise ProcessingError(f"Failed to create ingest renditions: {e.detail}")
+
     async def extract_clip(
         self,
         input_path: str,
         output_path: str,
         start_time: float,
         end_time: float,
-        include_audio: bool = True
+        include_audio: bool = True,
+        smart_cut: Optional[bool] = None
     ) -> str:
         """
         Extract a clip from a video.
@@ -95,12 +295,82 @@ class VideoProcessorService:
             start_time: Start time in seconds
             end_time: End time in seconds
             include_audio: Whether to include audio
+            smart_cut: Stream-copy whole GOPs and re-encode only the edges
+                (default: SMART_CUT_ENABLED)
 
         Returns:
-            Path to extracted clip
+            Path to extracted clip (copied or reflinked from the clip cache
+            on a hit)
         """
         logger.info(f"Extracting clip: {start_time}s - {end_time}s")
 
+        if smart_cut is None:
+            smart_cut = settings.SMART_CUT_ENABLED
+
+        cache_key = None
+        if self.clip_cache.enabled:
+            try:
+                # Hashing a source the first time reads all of it
+                cache_key = await asyncio.get_running_loop().run_in_executor(
+                    None,
+                    self.clip_cache.key_for,
+                    input_path,
+                    start_time,
+                    end_time,
+                    {
+                        "audio": include_audio,
+                        "smart_cut": smart_cut,
+                        "smart_cut_min_copy": settings.SMART_CUT_MIN_COPY_SECONDS,
+                        # movflags and keyframe grid follow the fragment/HLS settings
+                        "container": self._container_kwargs(output_path),
+                    }
+                )
+            except OSError as e:
+                logger.warning(f"Clip cache unavailable for {input_path}: {str(e)}")
+
+        if cache_key and self.clip_cache.fetch(cache_key, output_path):
+            return output_path
+
+        await self._render_clip(input_path, output_path, start_time, end_time, include_audio, smart_cut)
+
+        if cache_key:
+            self.clip_cache.store(cache_key, output_path)
+
+        return output_path
+
+    async def _render_clip(
+        self,
+        input_path: str,
+        output_path: str,
+        start_time: float,
+        end_time: float,
+        include_audio: bool,
+        smart_cut: bool
+    ) -> str:
+        """
+        Encode a clip, by smart cut where possible and full re-encode otherwise.
+
+        Args:
+            input_path: Path to input video
+            output_path: Path for output clip
+            start_time: Start time in seconds
+            end_time: End time in seconds
+            include_audio: Whether to include audio
+            smart_cut: Try stream-copying whole GOPs first
+
+        Returns:
+            Path to extracted clip
+        """
+        if smart_cut:
+            try:
+                if await self._smart_cut_clip(
+                    input_path, output_path, start_time, end_time, include_audio
+                ):
+                    logger.info(f"Clip extracted with smart cut: {output_path}")
+                    return output_path
+            except ProcessingError as e:
+                logger.warning(f"Smart cut failed, falling back to re-encode: {e.detail}")
+
         try:
             duration = end_time - start_time
 
@@ -114,7 +384,8 @@ class VideoProcessorService:
                     vcodec='libx264',
                     acodec='aac',
                     preset='fast',
-                    crf=23
+                    crf=23,
+                    **self._container_kwargs(output_path)
                 )
             else:
                 stream = ffmpeg.output(
@@ -123,18 +394,312 @@ class VideoProcessorService:
                     vcodec='libx264',
                     preset='fast',
                     crf=23,
-                    an=None  # No audio
+                    an=None,  # No audio
+                    **self._container_kwargs(output_path)
                 )
 
             # Run FFmpeg
-            ffmpeg.run(stream, overwrite_output=True, quiet=True)
+            await self.runner.run(stream)
 
             logger.info(f"Clip extracted successfully: {output_path}")
             return output_path
 
-        except ffmpeg.Error as e:
-            logger.error(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
-            raise ProcessingError(f"Failed to extract clip: {str(e)}")
+        except ProcessingError as e:
+            logger.error(f"FFmpeg error: {e.detail}")
+            raise ProcessingError(f"Failed to extract clip: {e.detail}")
+
+    async def _smart_cut_clip(
+        self,
+        input_path: str,
+        output_path: str,
+        start_time: float,
+        end_time: float,
+        include_audio: bool
+    ) -> bool:
+        """
+        Extract a clip by stream-copying the GOPs fully inside the range.
+
+        Only the partial GOPs before the first and after the last keyframe
+        in [start_time, end_time] are re-encoded. Segments are written as
+        video-only MPEG-TS so parameter sets travel in-band, then joined by
+        stream copy. Audio is encoded once over the whole range and muxed
+        against the joined video, so no encoder priming or AAC frame
+        boundary falls at a seam.
+
+        The edges are encoded with the source's profile, level, reference
+        count, entropy coder, colour description and timing, and their
+        parameter sets are checked against the source's before joining, so
+        a decoder never switches stream configuration at a seam.
+
+        Args:
+            input_path: Path to input video
+            output_path: Path for output clip
+            start_time: Start time in seconds
+            end_time: End time in seconds
+            include_audio: Whether to include audio
+
+        Returns:
+            True if the clip was written, False if the source does not allow
+            a clean splice and the caller should re-encode instead
+        """
+        metadata = await self.get_video_metadata(input_path)
+
+        if metadata['codec'] not in SMART_CUT_VIDEO_CODECS:
+            return False
+        if metadata.get('pix_fmt') not in SMART_CUT_PIXEL_FORMATS:
+            return False
+        if include_audio and metadata['has_audio'] and metadata.get('audio_codec') not in SMART_CUT_AUDIO_CODECS:
+            return False
+
+        index = KeyframeIndex.for_video(input_path)
+        if index is not None:
+            inner = index.keyframes_between(start_time, end_time)
+        else:
+            keyframes = await self._probe_keyframes(input_path, start_time, end_time)
+            inner = [t for t in keyframes if start_time <= t <= end_time]
+        if len(inner) < 2:
+            return False
+
+        copy_start, copy_end = inner[0], inner[-1]
+        if copy_end - copy_start < settings.SMART_CUT_MIN_COPY_SECONDS:
+            return False
+
+        source_headers = await self._h264_headers(input_path)
+        if 'profile_idc' not in source_headers:
+            return False
+
+        encode_kwargs = {
+            'vcodec': 'libx264',
+            'preset': 'fast',
+            'crf': 23,
+            'pix_fmt': metadata['pix_fmt'],
+            **self._smart_cut_encode_kwargs(source_headers),
+        }
+        profile = SMART_CUT_H264_PROFILES.get(metadata.get('profile'))
+        if profile:
+            encode_kwargs['profile:v'] = profile
+
+        with_audio = include_audio and metadata['has_audio']
+
+        # Skip edge segments shorter than a frame
+        min_edge = 1.0 / (metadata['fps'] or 30.0)
+
+        work_dir = tempfile.mkdtemp(dir=settings.UPLOAD_DIR)
+        head = os.path.join(work_dir, 'head.ts')
+        tail = os.path.join(work_dir, 'tail.ts')
+        try:
+            segments = []
+
+            if copy_start - start_time > min_edge:
+                await self.runner.run(ffmpeg.output(
+                    ffmpeg.input(input_path, ss=start_time, t=copy_start - start_time),
+                    head,
+                    format='mpegts',
+                    an=None,
+                    **encode_kwargs
+                ))
+                segments.append(head)
+
+            body = os.path.join(work_dir, 'body.ts')
+            await self.runner.run(ffmpeg.output(
+                ffmpeg.input(input_path, ss=copy_start, t=copy_end - copy_start),
+                body,
+                format='mpegts',
+                avoid_negative_ts='make_zero',
+                vcodec='copy',
+                an=None
+            ))
+            segments.append(body)
+
+            if end_time - copy_end > min_edge:
+                await self.runner.run(ffmpeg.output(
+                    ffmpeg.input(input_path, ss=copy_end, t=end_time - copy_end),
+                    tail,
+                    format='mpegts',
+                    an=None,
+                    **encode_kwargs
+                ))
+                segments.append(tail)
+
+            for edge in (head, tail):
+                if edge not in segments:
+                    continue
+                mismatched = self._seam_mismatch(source_headers, await self._h264_headers(edge))
+                if mismatched:
+                    logger.info(
+                        f"Smart cut edge differs from {input_path} in {', '.join(mismatched)}; re-encoding"
+                    )
+                    return False
+
+            audio_path = None
+            if with_audio:
+                audio_path = os.path.join(work_dir, 'audio.m4a')
+                await self.runner.run(ffmpeg.output(
+                    ffmpeg.input(input_path, ss=start_time, t=end_time - start_time).audio,
+                    audio_path,
+                    acodec='aac',
+                    ar=metadata.get('sample_rate') or 48000,
+                    ac=metadata.get('channels') or 2
+                ))
+
+            await self.concat_segments(
+                segments, output_path, include_audio=False, audio_path=audio_path
+            )
+            return True
+
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    async def _h264_headers(self, path: str) -> Dict[str, int]:
+        """
+        Fields of the first SPS and PPS of a file's H.264 stream.
+
+        Read from the bitstream by the trace_headers filter, which also sees
+        the in-band parameter sets of MPEG-TS segments.
+
+        Args:
+            path: Path to media file
+
+        Returns:
+            Syntax element values by trace_headers name (first occurrence)
+        """
+        output = ffmpeg.output(
+            ffmpeg.input(path)['v:0'],
+            '-',
+            format='null',
+            c='copy',
+            **{'bsf:v': 'trace_headers', 'frames:v': 1}
+        )
+
+        fields = {}
+        for line in await self.runner.run_report(output):
+            match = H264_TRACE_FIELD.search(line)
+            if match:
+                fields.setdefault(match.group(1), int(match.group(2)))
+        return fields
+
+    @staticmethod
+    def _smart_cut_encode_kwargs(headers: Dict[str, int]) -> Dict[str, Any]:
+        """
+        libx264 options reproducing a source's stream parameters.
+
+        Args:
+            headers: Source SPS/PPS fields from _h264_headers()
+
+        Returns:
+            Extra ffmpeg.output() keyword arguments
+        """
+        kwargs = {
+            'level': f"{headers['level_idc'] / 10:g}",
+            'coder': 'cabac' if headers.get('entropy_coding_mode_flag') else 'cavlc',
+        }
+        if headers.get('max_num_ref_frames'):
+            kwargs['refs'] = headers['max_num_ref_frames']
+        if 'video_full_range_flag' in headers:
+            kwargs['color_range'] = 2 if headers['video_full_range_flag'] else 1
+        if 'colour_primaries' in headers:
+            # Numeric H.273 codes, as ffmpeg's colour options take them
+            kwargs['color_primaries'] = headers['colour_primaries']
+            kwargs['color_trc'] = headers['transfer_characteristics']
+            kwargs['colorspace'] = headers['matrix_coefficients']
+        if headers.get('num_units_in_tick') and headers.get('time_scale'):
+            # H.264 ticks are fields: two per frame
+            kwargs['r'] = f"{headers['time_scale']}/{2 * headers['num_units_in_tick']}"
+        return kwargs
+
+    @staticmethod
+    def _seam_mismatch(source: Dict[str, int], edge: Dict[str, int]) -> List[str]:
+        """Names of the SMART_CUT_SEAM_FIELDS an edge segment does not share with its source."""
+        return [field for field in SMART_CUT_SEAM_FIELDS if source.get(field) != edge.get(field)]
+
+    async def _probe_keyframes(
+        self,
+        video_path: str,
+        start_time: float,
+        end_time: float
+    ) -> List[float]:
+        """
+        Find video keyframe timestamps around a time range from packet flags.
+
+        Args:
+            video_path: Path to video file
+            start_time: Range start in seconds
+            end_time: Range end in seconds
+
+        Returns:
+            Sorted keyframe timestamps
+        """
+        probe = await self.runner.probe(video_path, [
+            "-select_streams", "v:0",
+            "-show_entries", "packet=pts_time,flags",
+            "-read_intervals", f"{max(start_time - 1.0, 0.0)}%{end_time + 1.0}",
+        ])
+
+        keyframes = []
+        for packet in probe.get('packets', []):
+            if 'K' not in packet.get('flags', ''):
+                continue
+            try:
+                keyframes.append(float(packet['pts_time']))
+            except (KeyError, ValueError):
+                continue
+
+        return sorted(keyframes)
+
+    async def concat_segments(
+        self,
+        segment_paths: List[str],
+        output_path: str,
+        include_audio: bool = True,
+        audio_path: Optional[str] = None
+    ) -> str:
+        """
+        Join segments with identical codec parameters by stream copy.
+
+        Args:
+            segment_paths: Ordered list of segment files
+            output_path: Path for joined output
+            include_audio: Whether segments carry audio
+            audio_path: Audio track covering the whole output, muxed onto
+                video-only segments instead of joining per-segment audio
+
+        Returns:
+            Path to joined video
+        """
+        list_file = tempfile.NamedTemporaryFile(
+            mode='w',
+            delete=False,
+            suffix='.txt',
+            dir=settings.UPLOAD_DIR
+        )
+        try:
+            with list_file:
+                for path in segment_paths:
+                    escaped = os.path.abspath(path).replace("'", "'\\''")
+                    list_file.write(f"file '{escaped}'\n")
+
+            joined = ffmpeg.input(list_file.name, format='concat', safe=0)
+            streams = [joined]
+            output_kwargs = {'c': 'copy'}
+            if audio_path:
+                # One continuous track, already in MP4 (ASC) framing
+                streams = [joined.video, ffmpeg.input(audio_path).audio]
+            elif include_audio:
+                output_kwargs['bsf:a'] = 'aac_adtstoasc'
+
+            await self.runner.run(ffmpeg.output(
+                *streams,
+                output_path,
+                **output_kwargs,
+                **self._container_kwargs(output_path, encode=False)
+            ))
+            return output_path
+
+        finally:
+            try:
+                os.remove(list_file.name)
+            except OSError:
+                pass
 
     async def generate_thumbnail(
         self,
@@ -148,7 +713,8 @@ class VideoProcessorService:
         Args:
             video_path: Path to video file
             output_path: Path for output thumbnail
-            timestamp: Timestamp in seconds (default: middle of video)
+            timestamp: Timestamp in seconds, used exactly (default: keyframe
+                nearest the middle of the video)
 
         Returns:
             Path to generated thumbnail
@@ -156,10 +722,16 @@ class VideoProcessorService:
         logger.info(f"Generating thumbnail for: {video_path}")
 
         try:
-            # If no timestamp specified, use middle of video
+            index = KeyframeIndex.for_video(video_path)
+
+            # If no timestamp specified, use the keyframe nearest the middle
+            # of the video so only a single frame has to be decoded
             if timestamp is None:
-                metadata = await self.get_video_metadata(video_path)
-                timestamp = metadata['duration'] / 2
+                if index is not None and index.duration:
+                    timestamp = index.nearest_keyframe(index.duration / 2)
+                else:
+                    metadata = await self.get_video_metadata(video_path)
+                    timestamp = metadata['duration'] / 2
 
             # Extract frame
             stream = ffmpeg.input(video_path, ss=timestamp)
@@ -171,14 +743,150 @@ class VideoProcessorService:
                 vcodec='mjpeg'
             )
 
-            ffmpeg.run(stream, overwrite_output=True, quiet=True)
+            await self.runner.run(stream)
 
             logger.info(f"Thumbnail generated: {output_path}")
             return output_path
 
-        except ffmpeg.Error as e:
-            logger.error(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
-            raise ProcessingError(f"Failed to generate thumbnail: {str(e)}")
+        except ProcessingError as e:
+            logger.error(f"FFmpeg error: {e.detail}")
+            raise ProcessingError(f"Failed to generate thumbnail: {e.detail}")
+
+    @staticmethod
+    def _container_kwargs(output_path: str, encode: bool = True) -> Dict[str, Any]:
+        """
+        Muxer options so MP4 outputs play from their first bytes.
+
+        MP4s get the moov atom up front (+faststart), or are written as
+        fragmented CMAF with a global sidx when FRAGMENTED_MP4_ENABLED.
+        Encodes get keyframes forced onto the fragment grid, or onto the
+        HLS segment grid when previews are packaged, so either can be cut
+        by stream copy; MPEG-TS segments of distributed encodes included.
+
+        Args:
+            output_path: Output file
+            encode: Whether the video is encoded rather than stream-copied
+
+        Returns:
+            Extra ffmpeg.output() keyword arguments
+        """
+        kwargs = {}
+        if settings.FRAGMENTED_MP4_ENABLED:
+            keyframe_interval = settings.FRAGMENT_DURATION_SECONDS
+        elif settings.HLS_PACKAGING_ENABLED:
+            keyframe_interval = settings.HLS_SEGMENT_SECONDS
+        else:
+            keyframe_interval = None
+        if encode and keyframe_interval:
+            kwargs['force_key_frames'] = f"expr:gte(t,n_forced*{keyframe_interval:g})"
+
+        if os.path.splitext(output_path)[1].lower() not in MP4_EXTENSIONS:
+            return kwargs
+        if not settings.FRAGMENTED_MP4_ENABLED:
+            kwargs['movflags'] = '+faststart'
+        else:
+            kwargs['movflags'] = '+cmaf+frag_keyframe+empty_moov+default_base_moof+global_sidx'
+        return kwargs
+
+    @staticmethod
+    def _apply_gain(audio: Any, gain_db: Optional[float]) -> Any:
+        """Apply a linear gain, skipping the filter when there is nothing to do."""
+        if not gain_db:
+            return audio
+        return audio.filter('volume', f"{gain_db}dB")
+
+    def _compose_layout(
+        self,
+        videos: List[Any],
+        audios: List[Any],
+        layout: str,
+        width: int,
+        height: int,
+        crop_tracks: Optional[List[Optional[Dict[str, Any]]]] = None,
+        audio_durations: Optional[List[float]] = None
+    ) -> Tuple[Any, Any]:
+        """
+        Build the compositing graph for a set of video/audio streams.
+
+        Args:
+            videos: ffmpeg-python video streams, one per clip
+            audios: ffmpeg-python audio streams, one per clip
+            layout: Layout type (split_screen, grid, pip, spotlight)
+            width: Output width
+            height: Output height
+            crop_tracks: Optional reframing crop track per clip
+            audio_durations: Length of each audio stream in seconds, so the
+                mix level holds when a shorter clip drops out (default:
+                all streams run to the end)
+
+        Returns:
+            Tuple of (video stream, audio stream)
+        """
+        joined = compose(videos, layout, width, height, crop_tracks=crop_tracks)
+        return joined, self._mix_audio(audios, layout, audio_durations)
+
+    def _mix_audio(self, audios: List[Any], layout: str, durations: Optional[List[float]] = None) -> Any:
+        """
+        Mix the clips' audio of a layout into one track.
+
+        Args:
+            audios: ffmpeg-python audio streams, one per clip
+            layout: Layout type, selecting LAYOUT_AUDIO_WEIGHTS
+            durations: Length of each audio stream in seconds
+
+        Returns:
+            Mixed audio stream
+        """
+        if len(audios) == 1:
+            return audios[0]
+
+        # Weighted mix (e.g. top clip over bottom clip in split screen); the
+        # tracks arrive loudness-normalized, so scale the sum back down by
+        # the combined power of the inputs playing instead of letting amix
+        # divide by the count
+        layout_weights = settings.LAYOUT_AUDIO_WEIGHTS.get(layout) or [1.0]
+        weights = [layout_weights[min(i, len(layout_weights) - 1)] for i in range(len(audios))]
+        audio = ffmpeg.filter(
+            audios,
+            'amix',
+            inputs=len(audios),
+            weights=' '.join(f"{weight:g}" for weight in weights),
+            normalize=0
+        )
+
+        return self._mix_compensation(audio, weights, durations)
+
+    def _mix_compensation(self, audio: Any, weights: List[float], durations: Optional[List[float]]) -> Any:
+        """
+        Scale a normalize=0 amix down by the combined power of its active inputs.
+
+        amix keeps summing the remaining inputs once a shorter one ends, so
+        the gain steps at every input's end instead of being fixed for the
+        whole mix.
+
+        Args:
+            audio: amix output
+            weights: amix weight of each input
+            durations: Length of each input in seconds, or None when all
+                inputs run to the end
+
+        Returns:
+            Audio stream with the compensation applied
+        """
+        def gain(active: List[float]) -> float:
+            return 1 / math.sqrt(sum(w * w for w in active))
+
+        if durations is None or len(set(durations)) == 1:
+            return self._apply_gain(audio, round(20 * math.log10(gain(weights)), 2))
+
+        # Nested if() from the last span (only the longest inputs) backwards;
+        # until each end, every input at least that long is still playing
+        ends = sorted(set(durations))
+        expression = f"{gain([w for w, d in zip(weights, durations) if d >= ends[-1]]):.4f}"
+        for end in reversed(ends[:-1]):
+            active = [w for w, d in zip(weights, durations) if d >= end]
+            expression = f"if(lt(t,{end:.3f}),{gain(active):.4f},{expression})"
+        return audio.filter('volume', expression, eval='frame')
 
     async def create_split_screen(
         self,
@@ -186,7 +894,10 @@ class VideoProcessorService:
         output_path: str,
         layout: str = "split_screen",
         resolution: str = "1080x1920",
-        fps: int = 30
+        fps: int = 30,
+        progress: Optional[ProgressCallback] = None,
+        gains: Optional[List[float]] = None,
+        crop_tracks: Optional[List[Optional[Dict[str, Any]]]] = None
     ) -> str:
         """
         Create a split-screen video from multiple clips.
@@ -194,9 +905,12 @@ class VideoProcessorService:
         Args:
             clip_paths: List of paths to clip files
             output_path: Path for output video
-            layout: Layout type (split_screen, grid, etc.)
+            layout: Layout type (split_screen, grid, pip, spotlight)
             resolution: Output resolution (WxH)
             fps: Output frame rate
+            progress: Optional callback for encode progress
+            gains: Optional per-clip loudness normalization gains in dB
+            crop_tracks: Optional per-clip reframing crop tracks
 
         Returns:
             Path to generated split-screen video
@@ -206,84 +920,329 @@ class VideoProcessorService:
         try:
             width, height = map(int, resolution.split('x'))
 
-            if layout == "split_screen" and len(clip_paths) == 2:
-                # Vertical split screen (top/bottom)
-                input1 = ffmpeg.input(clip_paths[0])
-                input2 = ffmpeg.input(clip_paths[1])
+            durations = [
+                (await self.get_video_metadata(path))['duration'] for path in clip_paths
+            ]
+            duration = max(durations, default=None)
+
+            gains = gains or [0.0] * len(clip_paths)
+            inputs = [ffmpeg.input(path) for path in clip_paths]
+            joined, audio = self._compose_layout(
+                [inp.video for inp in inputs],
+                [self._apply_gain(inp.audio, gain) for inp, gain in zip(inputs, gains)],
+                layout,
+                width,
+                height,
+                crop_tracks=crop_tracks,
+                audio_durations=durations
+            )
 
-                # Scale both clips to half height
-                v1 = input1.video.filter('scale', width, height // 2)
-                v2 = input2.video.filter('scale', width, height // 2)
+            output = ffmpeg.output(
+                joined,
+                audio,
+                output_path,
+                vcodec='libx264',
+                acodec='aac',
+                preset='medium',
+                crf=23,
+                r=fps,
+                **self._container_kwargs(output_path)
+            )
 
-                # Stack vertically
-                joined = ffmpeg.filter([v1, v2], 'vstack')
+            await self.runner.run(output, progress=progress, duration=duration)
 
-                # Mix audio
-                a1 = input1.audio
-                a2 = input2.audio
-                audio = ffmpeg.filter([a1, a2], 'amix', inputs=2)
+            logger.info(f"Split-screen video created: {output_path}")
+            return output_path
 
-                # Output
-                output = ffmpeg.output(
-                    joined,
-                    audio,
-                    output_path,
-                    vcodec='libx264',
-                    acodec='aac',
-                    preset='medium',
-                    crf=23,
-                    r=fps
-                )
+        except ProcessingError as e:
+            logger.error(f"FFmpeg error: {e.detail}")
+            raise ProcessingError(f"Failed to create split-screen: {e.detail}")
 
-                ffmpeg.run(output, overwrite_output=True, quiet=True)
-
-            elif layout == "grid":
-                # Grid layout for multiple clips
-                # This is simplified - in production, you'd calculate grid dimensions
-                inputs = [ffmpeg.input(path) for path in clip_paths[:4]]
-
-                # Scale all to quarter size
-                scaled = [
-                    inp.video.filter('scale', width // 2, height // 2)
-                    for inp in inputs
-                ]
-
-                # Create 2x2 grid
-                if len(scaled) >= 2:
-                    top = ffmpeg.filter([scaled[0], scaled[1]], 'hstack')
-                if len(scaled) >= 4:
-                    bottom = ffmpeg.filter([scaled[2], scaled[3]], 'hstack')
-                    joined = ffmpeg.filter([top, bottom], 'vstack')
-                else:
-                    joined = top
+    def _source_audio(self, inp: Any, source: Dict[str, Any]) -> Any:
+        """A source's clip audio, cut to the clip and loudness-normalized."""
+        return self._apply_gain(
+            inp.audio
+            .filter('atrim', duration=source['end_time'] - source['start_time'])
+            .filter('asetpts', 'PTS-STARTPTS'),
+            source.get('gain_db')
+        )
+
+    async def render_from_sources(
+        self,
+        sources: List[Dict[str, Any]],
+        output_path: str,
+        layout: str = "split_screen",
+        resolution: str = "1080x1920",
+        fps: int = 30,
+        progress: Optional[ProgressCallback] = None,
+        window: Optional[Tuple[float, float]] = None
+    ) -> str:
+        """
+        Render a split-screen video in a single pass straight from source videos.
 
-                # Mix audio from all clips
-                audios = [inp.audio for inp in inputs]
-                audio = ffmpeg.filter(audios, 'amix', inputs=len(audios))
+        Each source is seeked on the input side and cut with trim/atrim inside
+        the filtergraph, so clips are decoded once and encoded once with no
+        intermediate files.
 
-                # Output
-                output = ffmpeg.output(
-                    joined,
-                    audio,
-                    output_path,
-                    vcodec='libx264',
-                    acodec='aac',
-                    preset='medium',
-                    crf=23,
-                    r=fps
-                )
+        Args:
+            sources: List of dicts with file_path, start_time, end_time and
+                optionally gain_db (loudness normalization gain) and crop_track
+                (reframing track)
+            output_path: Path for output video
+            layout: Layout type (split_screen, grid, pip, spotlight)
+            resolution: Output resolution (WxH)
+            fps: Output frame rate
+            progress: Optional callback for encode progress
+            window: Optional (start, end) of the output timeline to render,
+                used to encode a splice as independent segments; the
+                segment is video-only, its audio comes from
+                render_audio_from_sources()
 
-                ffmpeg.run(output, overwrite_output=True, quiet=True)
+        Returns:
+            Path to generated split-screen video
+        """
+        logger.info(f"Rendering split-screen video from {len(sources)} sources")
 
+        try:
+            width, height = map(int, resolution.split('x'))
+
+            if window is None:
+                videos = []
+                audios = []
+                crop_tracks = [source.get('crop_track') for source in sources]
+                for source in sources:
+                    duration = source['end_time'] - source['start_time']
+                    inp = ffmpeg.input(source['file_path'], ss=source['start_time'], t=duration)
+
+                    videos.append(
+                        inp.video
+                        .trim(duration=duration)
+                        .setpts('PTS-STARTPTS')
+                    )
+                    audios.append(self._source_audio(inp, source))
+
+                joined, audio = self._compose_layout(
+                    videos,
+                    audios,
+                    layout,
+                    width,
+                    height,
+                    crop_tracks,
+                    [source['end_time'] - source['start_time'] for source in sources]
+                )
+                streams = [joined, audio]
             else:
-                raise ProcessingError(f"Unsupported layout: {layout}")
+                videos, crop_tracks = self._window_streams(sources, *window)
+                streams = [compose(videos, layout, width, height, crop_tracks=crop_tracks)]
 
-            logger.info(f"Split-screen video created: {output_path}")
+            output = ffmpeg.output(
+                *streams,
+                output_path,
+                vcodec='libx264',
+                acodec='aac',
+                preset='medium',
+                crf=23,
+                r=fps,
+                **self._container_kwargs(output_path)
+            )
+
+            # Mixed audio runs as long as the longest clip
+            duration = max(
+                (source['end_time'] - source['start_time'] for source in sources),
+                default=None
+            )
+            if window is not None:
+                duration = window[1] - window[0]
+            await self.runner.run(output, progress=progress, duration=duration)
+
+            logger.info(f"Split-screen video rendered: {output_path}")
+            return output_path
+
+        except ProcessingError as e:
+            logger.error(f"FFmpeg error: {e.detail}")
+            raise ProcessingError(f"Failed to render split-screen: {e.detail}")
+
+    async def render_audio_from_sources(
+        self,
+        sources: List[Dict[str, Any]],
+        output_path: str,
+        layout: str = "split_screen"
+    ) -> str:
+        """
+        Mix and encode the audio of a split-screen render on its own.
+
+        Segmented renders encode their windows video-only and take the audio
+        from here, encoded once over the whole timeline, so the joined file
+        has no AAC priming gaps or mix level changes at the joins.
+
+        Args:
+            sources: Same sources as render_from_sources()
+            output_path: Path for the audio track (.m4a)
+            layout: Layout type, selecting the mix weights
+
+        Returns:
+            Path to the encoded audio
+        """
+        logger.info(f"Rendering split-screen audio from {len(sources)} sources")
+
+        try:
+            audios = []
+            for source in sources:
+                duration = source['end_time'] - source['start_time']
+                inp = ffmpeg.input(source['file_path'], ss=source['start_time'], t=duration)
+                audios.append(self._source_audio(inp, source))
+
+            audio = self._mix_audio(
+                audios,
+                layout,
+                [source['end_time'] - source['start_time'] for source in sources]
+            )
+            await self.runner.run(ffmpeg.output(audio, output_path, acodec='aac'))
+
+            logger.info(f"Split-screen audio rendered: {output_path}")
             return output_path
 
-        except ffmpeg.Error as e:
-            logger.error(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
-            raise ProcessingError(f"Failed to create split-screen: {str(e)}")
+        except ProcessingError as e:
+            logger.error(f"FFmpeg error: {e.detail}")
+            raise ProcessingError(f"Failed to render split-screen audio: {e.detail}")
+
+    @staticmethod
+    def _range_kwargs(start_time: Optional[float], end_time: Optional[float]) -> Dict[str, Any]:
+        """Input options limiting decoding to [start_time, end_time)."""
+        kwargs = {}
+        if start_time:
+            kwargs['ss'] = start_time
+        if end_time is not None:
+            kwargs['t'] = end_time - (start_time or 0.0)
+        return kwargs
+
+    async def _range_duration(
+        self,
+        input_path: str,
+        start_time: Optional[float],
+        end_time: Optional[float]
+    ) -> float:
+        """Length of the encoded range, for progress reporting."""
+        if end_time is None:
+            end_time = (await self.get_video_metadata(input_path))['duration']
+        return end_time - (start_time or 0.0)
+
+    def _window_streams(
+        self,
+        sources: List[Dict[str, Any]],
+        window_start: float,
+        window_end: float
+    ) -> Tuple[List[Any], List[Optional[Dict[str, Any]]]]:
+        """
+        Build per-source video streams covering one window of the composited
+        timeline.
+
+        Matches the full render: a clip that ends early holds its last frame.
+
+        Args:
+            sources: List of dicts with file_path, start_time and end_time
+            window_start: Window start on the output timeline
+            window_end: Window end on the output timeline
+
+        Returns:
+            Tuple of (video streams, crop tracks shifted onto the window)
+        """
+        videos = []
+        crop_tracks = []
+        for source in sources:
+            length = source['end_time'] - source['start_time']
+
+            if window_start < length:
+                duration = min(window_end, length) - window_start
+                inp = ffmpeg.input(
+                    source['file_path'],
+                    ss=source['start_time'] + window_start,
+                    t=duration
+                )
+                video = inp.video.trim(duration=duration).setpts('PTS-STARTPTS')
+                if length < window_end:
+                    video = video.filter('tpad', stop_mode='clone', stop_duration=window_end - length)
+                crop_tracks.append(shift_track(source.get('crop_track'), window_start))
+            else:
+                # Clip already ended: hold its final frame for the whole window
+                inp = ffmpeg.input(
+                    source['file_path'],
+                    ss=source['start_time'] + max(length - FINAL_FRAME_SEEK_BACK, 0.0),
+                    t=FINAL_FRAME_SEEK_BACK
+                )
+                video = (
+                    inp.video
+                    .filter('reverse')
+                    .trim(end_frame=1)
+                    .setpts('PTS-STARTPTS')
+                    .filter('tpad', stop_mode='clone', stop_duration=window_end - window_start)
+                )
+                # The held frame sits at the clip's end
+                crop_tracks.append(shift_track(source.get('crop_track'), length))
+
+            videos.append(video)
+
+        return videos, crop_tracks
+
+    def _platform_chain(
+        self,
+        video: Any,
+        audio: Optional[Any],
+        output_path: str,
+        platform: str,
+        resolution: str,
+        fps: int,
+        watermark: Optional[str] = None,
+        gain_db: Optional[float] = None
+    ) -> Any:
+        """
+        Build the scale/watermark/encode chain for one platform rendition.
+
+        Args:
+            video: Decoded video stream
+            audio: Decoded audio stream, or None for a video-only output
+            output_path: Path for output video
+            platform: Target platform
+            resolution: Output resolution
+            fps: Output frame rate
+            watermark: Optional watermark text
+            gain_db: Optional loudness normalization gain in dB
+
+        Returns:
+            ffmpeg-python output node
+        """
+        width, height = map(int, resolution.split('x'))
+
+        # Fit to target resolution without stretching
+        video = fit_frame(video, width, height)
+
+        # Add watermark if specified
+        if watermark:
+            video = video.drawtext(
+                text=watermark,
+                x='(w-text_w)/2',
+                y='h-th-10',
+                fontsize=24,
+                fontcolor='white',
+                shadowcolor='black',
+                shadowx=2,
+                shadowy=2
+            )
+
+        # Platform-specific optimizations, generic otherwise
+        preset = PLATFORM_ENCODE_PRESETS.get(platform, {'crf': 23})
+        streams = [video] if audio is None else [video, self._apply_gain(audio, gain_db)]
+
+        return ffmpeg.output(
+            *streams,
+            output_path,
+            vcodec='libx264',
+            acodec='aac',
+            preset='medium',
+            r=fps,
+            **preset,
+            **self._container_kwargs(output_path)
+        )
 
     async def optimize_for_platform(
         self,
@@ -292,7 +1251,12 @@ class VideoProcessorService:
         platform: str,
         resolution: str = "1080x1920",
         fps: int = 30,
-        watermark: Optional[str] = None
+        watermark: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        gain_db: Optional[float] = None,
+        include_audio: bool = True
     ) -> str:
         """
         Optimize video for specific platform.
@@ -304,6 +1268,13 @@ class VideoProcessorService:
             resolution: Output resolution
             fps: Output frame rate
             watermark: Optional watermark text
+            progress: Optional callback for encode progress
+            start_time: Optional start of the input range to encode
+            end_time: Optional end of the input range to encode
+            gain_db: Optional loudness normalization gain in dB, from a
+                cached measurement so no analysis pass is needed
+            include_audio: Whether to encode audio; segments of a
+                distributed export are video-only (see encode_platform_audio())
 
         Returns:
             Path to optimized video
@@ -311,90 +1282,146 @@ class VideoProcessorService:
         logger.info(f"Optimizing video for {platform}")
 
         try:
-            width, height = map(int, resolution.split('x'))
+            stream = ffmpeg.input(input_path, **self._range_kwargs(start_time, end_time))
+            output = self._platform_chain(
+                stream.video,
+                stream.audio if include_audio else None,
+                output_path,
+                platform,
+                resolution,
+                fps,
+                watermark,
+                gain_db
+            )
 
-            stream = ffmpeg.input(input_path)
+            duration = None
+            if progress is not None:
+                duration = await self._range_duration(input_path, start_time, end_time)
 
-            # Scale to target resolution
-            video = stream.video.filter('scale', width, height)
-
-            # Add watermark if specified
-            if watermark:
-                video = video.drawtext(
-                    text=watermark,
-                    x='(w-text_w)/2',
-                    y='h-th-10',
-                    fontsize=24,
-                    fontcolor='white',
-                    shadowcolor='black',
-                    shadowx=2,
-                    shadowy=2
-                )
+            await self.runner.run(output, progress=progress, duration=duration)
 
-            # Platform-specific optimizations
-            if platform == "tiktok":
-                # TikTok prefers H.264, AAC, specific bitrate
-                output = ffmpeg.output(
-                    video,
-                    stream.audio,
-                    output_path,
-                    vcodec='libx264',
-                    acodec='aac',
-                    preset='medium',
-                    crf=23,
-                    r=fps,
-                    **{'b:v': '2M', 'b:a': '128k'}
-                )
+            logger.info(f"Video optimized for {platform}: {output_path}")
+            return output_path
 
-            elif platform == "youtube_shorts":
-                # YouTube Shorts optimization
-                output = ffmpeg.output(
-                    video,
-                    stream.audio,
-                    output_path,
-                    vcodec='libx264',
-                    acodec='aac',
-                    preset='medium',
-                    crf=22,
-                    r=fps,
-                    **{'b:v': '3M', 'b:a': '192k'}
-                )
+        except ProcessingError as e:
+            logger.error(f"FFmpeg error: {e.detail}")
+            raise ProcessingError(f"Failed to optimize video: {e.detail}")
 
-            elif platform == "instagram_reels":
-                # Instagram Reels optimization
-                output = ffmpeg.output(
-                    video,
-                    stream.audio,
-                    output_path,
-                    vcodec='libx264',
-                    acodec='aac',
-                    preset='medium',
-                    crf=23,
-                    r=fps,
-                    **{'b:v': '2.5M', 'b:a': '128k'}
-                )
+    async def optimize_for_platforms(
+        self,
+        input_path: str,
+        renditions: List[Dict[str, Any]],
+        watermark: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        include_audio: bool = True
+    ) -> List[str]:
+        """
+        Write several platform renditions from a single decode.
 
-            else:
-                # Generic optimization
-                output = ffmpeg.output(
-                    video,
-                    stream.audio,
-                    output_path,
-                    vcodec='libx264',
-                    acodec='aac',
-                    preset='medium',
-                    crf=23,
-                    r=fps
+        The input is decoded once and fanned out with split/asplit into one
+        scale/encode chain per rendition, all in the same FFmpeg process.
+
+        Args:
+            input_path: Path to input video
+            renditions: List of dicts with output_path, platform, resolution, fps
+                and optionally gain_db
+            watermark: Optional watermark text
+            progress: Optional callback for encode progress
+            start_time: Optional start of the input range to encode
+            end_time: Optional end of the input range to encode
+            include_audio: Whether to encode audio (see optimize_for_platform())
+
+        Returns:
+            Paths to optimized videos, in rendition order
+        """
+        if len(renditions) == 1:
+            rendition = renditions[0]
+            path = await self.optimize_for_platform(
+                input_path=input_path,
+                output_path=rendition['output_path'],
+                platform=rendition['platform'],
+                resolution=rendition['resolution'],
+                fps=rendition['fps'],
+                watermark=watermark,
+                progress=progress,
+                start_time=start_time,
+                end_time=end_time,
+                gain_db=rendition.get('gain_db'),
+                include_audio=include_audio
+            )
+            return [path]
+
+        logger.info(f"Optimizing video for {len(renditions)} renditions in one pass")
+
+        try:
+            stream = ffmpeg.input(input_path, **self._range_kwargs(start_time, end_time))
+            videos = stream.video.filter_multi_output('split', len(renditions))
+            audios = stream.audio.filter_multi_output('asplit', len(renditions)) if include_audio else None
+
+            outputs = [
+                self._platform_chain(
+                    videos[i],
+                    audios[i] if audios is not None else None,
+                    rendition['output_path'],
+                    rendition['platform'],
+                    rendition['resolution'],
+                    rendition['fps'],
+                    watermark,
+                    rendition.get('gain_db')
                 )
+                for i, rendition in enumerate(renditions)
+            ]
 
-            ffmpeg.run(output, overwrite_output=True, quiet=True)
+            duration = None
+            if progress is not None:
+                duration = await self._range_duration(input_path, start_time, end_time)
 
-            logger.info(f"Video optimized for {platform}: {output_path}")
-            return output_path
+            await self.runner.run(
+                ffmpeg.merge_outputs(*outputs),
+                progress=progress,
+                duration=duration
+            )
+
+            logger.info(f"Video optimized for {len(renditions)} renditions")
+            return [rendition['output_path'] for rendition in renditions]
+
+        except ProcessingError as e:
+            logger.error(f"FFmpeg error: {e.detail}")
+            raise ProcessingError(f"Failed to optimize video: {e.detail}")
+
+    async def encode_platform_audio(self, input_path: str, tracks: List[Dict[str, Any]]) -> List[str]:
+        """
+        Encode the audio of several renditions from a single decode, for
+        distributed exports whose segments are video-only.
+
+        Args:
+            input_path: Path to input video
+            tracks: List of dicts with output_path (.m4a) and optionally gain_db
+
+        Returns:
+            Paths to the encoded audio, in track order
+        """
+        logger.info(f"Encoding audio for {len(tracks)} renditions")
+
+        try:
+            audios = ffmpeg.input(input_path).audio.filter_multi_output('asplit', len(tracks))
+            outputs = [
+                ffmpeg.output(
+                    self._apply_gain(audios[i], track.get('gain_db')),
+                    track['output_path'],
+                    acodec='aac'
+                )
+                for i, track in enumerate(tracks)
+            ]
+            await self.runner.run(ffmpeg.merge_outputs(*outputs))
+
+            return [track['output_path'] for track in tracks]
 
-        except ffmpeg.Error as e:
-            logger.error(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
-            raise ProcessingError(f"Failed to optimize video: {str(e)}")
+        except ProcessingError as e:
+            logger.error(f"FFmpeg error: {e.detail}")
+            raise ProcessingError(f"Failed to encode audio: {e.detail}")
 
     async def extract_audio(self, video_path: str, output_path: str) -> str:
         """
@@ -414,11 +1441,11 @@ class VideoProcessorService:
             audio = stream.audio
             output = ffmpeg.output(audio, output_path, acodec='libmp3lame', ar=44100)
 
-            ffmpeg.run(output, overwrite_output=True, quiet=True)
+            await self.runner.run(output)
 
             logger.info(f"Audio extracted: {output_path}")
             return output_path
 
-        except ffmpeg.Error as e:
-            logger.error(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
-            raise ProcessingError(f"Failed to extract audio: {str(e)}")
+        except ProcessingError as e:
+            logger.error(f"FFmpeg error: {e.detail}")
+            raise ProcessingError(f"Failed to extract audio: {e.detail}")
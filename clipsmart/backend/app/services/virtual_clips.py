@@ -0,0 +1,128 @@
+"""
+Virtual clips: clip previews played straight out of a video's fragmented
+renditions through byte-range HLS playlists, with no encode and no copy.
+"""
+
+import math
+import logging
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+from app.core.config import get_settings
+from app.core.exceptions import ProcessingError, ResourceNotFoundError, ValidationError
+from app.models.video import Video
+from app.services.keyframe_index import KeyframeIndex
+from app.services.media_streaming import media_url
+
+settings = get_settings()
+logger = logging.getLogger("clipsmart.virtual_clips")
+
+RENDITIONS = ("proxy", "mezzanine")
+
+
+def clip_playlist(index: KeyframeIndex, start_time: float, end_time: float, media_uri: str) -> str:
+    """
+    HLS media playlist of the fragments covering a clip.
+
+    Segments are whole fragments, so playback may begin up to one GOP
+    before the clip; EXT-X-START moves the playhead to the clip's start.
+
+    Args:
+        index: Fragment-aware keyframe index of the rendition
+        start_time: Clip start in seconds
+        end_time: Clip end in seconds
+        media_uri: URI every byte range points into
+
+    Returns:
+        Playlist text
+    """
+    ranges = index.fragment_ranges(start_time, end_time, settings.HLS_SEGMENT_SECONDS)
+    if not ranges:
+        raise ProcessingError("Rendition is not fragmented MP4")
+
+    target_duration = max(1, math.ceil(max(span_end - span_start for span_start, span_end, _, _ in ranges)))
+    lines = [
+        "#EXTM3U",
+        "#EXT-X-VERSION:7",
+        f"#EXT-X-TARGETDURATION:{target_duration}",
+        "#EXT-X-MEDIA-SEQUENCE:0",
+        "#EXT-X-PLAYLIST-TYPE:VOD",
+        "#EXT-X-INDEPENDENT-SEGMENTS",
+        f"#EXT-X-START:TIME-OFFSET={max(0.0, start_time - ranges[0][0]):.3f},PRECISE=YES",
+        f'#EXT-X-MAP:URI="{media_uri}",BYTERANGE="{index.init_size}@0"',
+    ]
+    for span_start, span_end, offset, length in ranges:
+        lines += [
+            f"#EXTINF:{span_end - span_start:.3f},",
+            f"#EXT-X-BYTERANGE:{length}@{offset}",
+            media_uri,
+        ]
+    lines.append("#EXT-X-ENDLIST")
+
+    return "\n".join(lines) + "\n"
+
+
+class VirtualClipService:
+    """Builds byte-range playlists for clips of fragmented renditions."""
+
+    @staticmethod
+    def rendition_path(video: Video, rendition: str = "proxy") -> Optional[str]:
+        """Path of the rendition virtual clips play from."""
+        if rendition not in RENDITIONS:
+            raise ValidationError(f"Unsupported rendition: {rendition}")
+        return video.analysis_source_path if rendition == "proxy" else video.edit_source_path
+
+    @classmethod
+    def available(cls, video: Video, rendition: str = "proxy") -> bool:
+        """
+        Whether a video's rendition was ingested as fragmented MP4 and
+        indexed, so its clips can be previewed without extraction.
+
+        Only reads the persisted keyframe index; never probes the file.
+        """
+        media_path = cls.rendition_path(video, rendition)
+        index = KeyframeIndex.for_video(media_path) if media_path else None
+        return index is not None and index.fragmented
+
+    @staticmethod
+    def preview_url(clip_id: str) -> str:
+        """Media endpoint URL of a clip's byte-range playlist."""
+        return media_url("clips", clip_id, "playlist.m3u8")
+
+    def playlist(
+        self,
+        video: Video,
+        start_time: float,
+        end_time: float,
+        rendition: str = "proxy",
+        query: Optional[Dict[str, str]] = None
+    ) -> str:
+        """
+        Byte-range playlist of a clip served from its video's rendition.
+
+        Args:
+            video: Parent video
+            start_time: Clip start in seconds
+            end_time: Clip end in seconds
+            rendition: "proxy" or "mezzanine"
+            query: Extra query parameters for the media URI (e.g. token)
+
+        Returns:
+            Playlist text
+
+        Raises:
+            ResourceNotFoundError: When the rendition has no current keyframe
+                index (ingest still running)
+            ProcessingError: When the rendition is not fragmented MP4
+        """
+        media_path = self.rendition_path(video, rendition)
+        index = KeyframeIndex.for_video(media_path) if media_path else None
+        if index is None:
+            raise ResourceNotFoundError("Rendition has not been indexed yet")
+        if not index.fragmented:
+            raise ProcessingError(
+                "Video renditions are not fragmented; re-ingest it with VIRTUAL_CLIPS_ENABLED"
+            )
+
+        media_uri = f"{media_url('videos', video.id)}?{urlencode({'rendition': rendition, **(query or {})})}"
+        return clip_playlist(index, start_time, end_time, media_uri)
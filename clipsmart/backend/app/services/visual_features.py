@@ -0,0 +1,216 @@
+"""
+Local visual activity features on sampled frames: motion energy,
+brightness, contrast and face presence.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from app.core.config import get_settings
+from app.services.frame_sampler import FrameBatch
+
+settings = get_settings()
+logger = logging.getLogger("clipsmart.visual_features")
+
+# OpenCV Haar cascade for frontal faces, and the smallest face it reports
+FACE_CASCADE = "haarcascade_frontalface_default.xml"
+FACE_MIN_SIZE = 20
+
+# Luma standard deviation (0-1) at which a shot counts as fully contrasted
+REFERENCE_CONTRAST = 0.2
+
+# Weights of the visual score parts; face presence drops out when disabled
+MOTION_WEIGHT = 0.6
+FACE_WEIGHT = 0.25
+EXPOSURE_WEIGHT = 0.15
+
+
+def _round(values: np.ndarray, digits: int) -> List[float]:
+    return np.round(values, digits).tolist()
+
+
+def load_face_detector(enabled: Optional[bool] = None) -> Optional[Any]:
+    """
+    Load OpenCV's frontal face detector.
+
+    Args:
+        enabled: Whether faces should be detected (default: VISUAL_FACE_DETECTION_ENABLED)
+
+    Returns:
+        CascadeClassifier, or None when disabled or unavailable
+    """
+    enabled = enabled if enabled is not None else settings.VISUAL_FACE_DETECTION_ENABLED
+    if not enabled:
+        return None
+    if not hasattr(cv2, "CascadeClassifier"):
+        # OpenCV builds without the objdetect module
+        logger.warning("OpenCV face detector unavailable, continuing without face detection")
+        return None
+    return cv2.CascadeClassifier(cv2.data.haarcascades + FACE_CASCADE)
+
+
+def detect_faces(detector: Any, frame: np.ndarray) -> np.ndarray:
+    """
+    Detect faces in a grayscale frame.
+
+    Returns:
+        (n, 4) array of x, y, width, height boxes in pixels
+    """
+    faces = detector.detectMultiScale(
+        frame,
+        scaleFactor=1.1,
+        minNeighbors=5,
+        minSize=(FACE_MIN_SIZE, FACE_MIN_SIZE)
+    )
+    return np.asarray(faces, dtype=np.float64).reshape(-1, 4)
+
+
+class VisualFeatureExtractor:
+    """
+    Computes per-second visual activity from grayscale FrameBatches.
+
+    Motion is the mean absolute luma change between consecutive sampled
+    frames; brightness and contrast are the luma mean and standard deviation.
+    Per-frame values are reduced to one value per second in finish(), so the
+    stored result stays a handful of short arrays per video.
+    """
+
+    def __init__(self, detect_faces: Optional[bool] = None):
+        """
+        Args:
+            detect_faces: Run the OpenCV face detector (default: VISUAL_FACE_DETECTION_ENABLED)
+        """
+        self.face_detector = load_face_detector(detect_faces)
+
+        self._previous: Optional[np.ndarray] = None
+        self._motion: List[np.ndarray] = []
+        self._brightness: List[np.ndarray] = []
+        self._contrast: List[np.ndarray] = []
+        self._timestamps: List[np.ndarray] = []
+        self._faces: Dict[int, int] = {}
+
+    def update(self, batch: FrameBatch) -> None:
+        """
+        Measure the frames of a batch.
+
+        Args:
+            batch: Grayscale frames from FrameSampler
+        """
+        pixels = batch.frames.reshape(len(batch), -1)
+
+        previous = pixels[:1] if self._previous is None else self._previous[None]
+        previous = np.concatenate((previous, pixels[:-1]))
+        self._motion.append(np.abs(pixels.astype(np.int16) - previous).mean(axis=1) / 255)
+
+        self._brightness.append(pixels.mean(axis=1) / 255)
+        self._contrast.append(pixels.std(axis=1) / 255)
+        self._timestamps.append(batch.timestamps.copy())
+        self._previous = pixels[-1].copy()
+
+        if self.face_detector is not None:
+            # One detection per second is enough for presence
+            for frame, timestamp in zip(batch.frames, batch.timestamps):
+                second = int(timestamp)
+                if second in self._faces:
+                    continue
+                self._faces[second] = len(detect_faces(self.face_detector, frame))
+
+    def finish(self) -> Optional[Dict[str, Any]]:
+        """
+        Returns:
+            Summary values and a "per_second" dict of feature arrays, or None
+            when no frames were seen
+        """
+        if not self._timestamps:
+            return None
+
+        seconds = np.concatenate(self._timestamps).astype(np.int64)
+        length = int(seconds.max()) + 1
+        counts = np.maximum(np.bincount(seconds, minlength=length), 1)
+
+        def per_second(values: List[np.ndarray]) -> np.ndarray:
+            return np.bincount(seconds, weights=np.concatenate(values), minlength=length) / counts
+
+        motion = per_second(self._motion)
+        brightness = per_second(self._brightness)
+        contrast = per_second(self._contrast)
+
+        features = {
+            "mean_motion": round(float(motion.mean()), 4),
+            "mean_brightness": round(float(brightness.mean()), 3),
+            "mean_contrast": round(float(contrast.mean()), 3),
+            "per_second": {
+                "motion": _round(motion, 4),
+                "brightness": _round(brightness, 3),
+                "contrast": _round(contrast, 3),
+            },
+        }
+
+        if self.face_detector is not None:
+            faces = np.zeros(length, dtype=np.int64)
+            for second, count in self._faces.items():
+                faces[second] = count
+            features["face_ratio"] = round(float((faces > 0).mean()), 3)
+            features["per_second"]["faces"] = faces.tolist()
+
+        return features
+
+
+def clip_visual_features(
+    visual_features: Optional[Dict[str, Any]],
+    start_time: float,
+    end_time: float
+) -> Optional[Dict[str, float]]:
+    """
+    Aggregate a video's per-second visual features over a clip.
+
+    The visual score combines the percentile (midrank) of the clip's motion
+    among the video's seconds, the share of seconds with a face and how
+    well exposed the clip is.
+
+    Args:
+        visual_features: Local analysis from VisualFeatureExtractor.finish()
+        start_time: Clip start in seconds
+        end_time: Clip end in seconds
+
+    Returns:
+        Dict of clip-level features including a 0-1 visual_score, or None
+        without local visual analysis
+    """
+    per_second = (visual_features or {}).get("per_second")
+    if not per_second:
+        return None
+
+    first = max(0, int(start_time))
+    last = max(first + 1, int(np.ceil(end_time)))
+
+    motion = np.asarray(per_second["motion"])
+    window = motion[first:last]
+    if not len(window):
+        return None
+
+    brightness = float(np.mean(per_second["brightness"][first:last]))
+    contrast = float(np.mean(per_second["contrast"][first:last]))
+    # Midrank at the stored precision, so ties count half
+    level = round(float(window.mean()), 4)
+    motion_rank = float(((motion < level).sum() + 0.5 * (motion == level).sum()) / len(motion))
+    exposure = min(1.0, contrast / REFERENCE_CONTRAST)
+
+    features = {
+        "motion": level,
+        "brightness": round(brightness, 3),
+        "contrast": round(contrast, 3),
+    }
+
+    if "faces" in per_second:
+        face_ratio = float((np.asarray(per_second["faces"][first:last]) > 0).mean())
+        features["face_ratio"] = round(face_ratio, 3)
+        score = MOTION_WEIGHT * motion_rank + FACE_WEIGHT * face_ratio + EXPOSURE_WEIGHT * exposure
+    else:
+        score = (MOTION_WEIGHT * motion_rank + EXPOSURE_WEIGHT * exposure) / (MOTION_WEIGHT + EXPOSURE_WEIGHT)
+
+    features["visual_score"] = round(score, 4)
+    return features
@@ -6,6 +6,14 @@ from app.tasks.celery_app import celery_app
 from app.tasks.video_tasks import process_video_task, analyze_video_task
 from app.tasks.splice_tasks import render_splice_task
 from app.tasks.export_tasks import create_export_task
+from app.tasks.segment_tasks import (
+    encode_splice_segment_task,
+    encode_export_segment_task,
+    encode_splice_audio_task,
+    encode_export_audio_task,
+    join_splice_segments_task,
+    join_export_segments_task,
+)
 
 __all__ = [
     "celery_app",
@@ -13,4 +21,10 @@ __all__ = [
     "analyze_video_task",
     "render_splice_task",
     "create_export_task",
+    "encode_splice_segment_task",
+    "encode_export_segment_task",
+    "encode_splice_audio_task",
+    "encode_export_audio_task",
+    "join_splice_segments_task",
+    "join_export_segments_task",
 ]
@@ -16,6 +16,7 @@ celery_app = Celery(
         "app.tasks.video_tasks",
         "app.tasks.splice_tasks",
         "app.tasks.export_tasks",
+        "app.tasks.segment_tasks",
     ]
 )
 
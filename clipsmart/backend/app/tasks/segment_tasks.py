@@ -0,0 +1,327 @@
+"""
+Celery tasks for segment-parallel encoding.
+
+Each window of a long splice or export is encoded video-only by its own task
+while one more task encodes the audio over the whole timeline; a chord
+callback joins the segments and muxes the audio once all of them are done.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from celery import chord
+
+from app.tasks.celery_app import celery_app
+
+logger = logging.getLogger("clipsmart.tasks.segment")
+
+
+def dispatch_splice_segments(
+    splice_id: str,
+    sources: List[Dict[str, Any]],
+    windows: List[List[float]],
+    layout: str,
+    resolution: str,
+    fps: int,
+    work_dir: str
+) -> None:
+    """
+    Start a distributed splice render: one task per window and one for the
+    audio, then a join.
+    """
+    from app.services.segmented_encode import SegmentedEncodeService
+
+    total = len(windows) + 1
+    header = [
+        encode_splice_segment_task.s(
+            splice_id,
+            total,
+            sources,
+            list(window),
+            layout,
+            resolution,
+            fps,
+            SegmentedEncodeService.segment_path(work_dir, i)
+        )
+        for i, window in enumerate(windows)
+    ]
+    # Last in the header, so its result comes last in the join's arguments
+    header.append(encode_splice_audio_task.s(
+        splice_id,
+        total,
+        sources,
+        layout,
+        SegmentedEncodeService.audio_path(work_dir)
+    ))
+    callback = join_splice_segments_task.s(splice_id, work_dir).on_error(
+        fail_segmented_encode_task.s("splice", [splice_id], work_dir)
+    )
+    chord(header)(callback)
+
+    logger.info(f"Dispatched {len(windows)} segments for splice {splice_id}")
+
+
+def dispatch_export_segments(
+    export_ids: List[str],
+    input_path: str,
+    renditions: List[Dict[str, Any]],
+    watermark: Optional[str],
+    windows: List[List[float]],
+    work_dir: str
+) -> None:
+    """
+    Start a distributed export: one task per window and one for the audio of
+    every rendition, then a join per rendition.
+    """
+    from app.services.segmented_encode import SegmentedEncodeService
+
+    total = len(windows) + 1
+    header = [
+        encode_export_segment_task.s(
+            export_ids,
+            total,
+            input_path,
+            [
+                {
+                    **rendition,
+                    "output_path": SegmentedEncodeService.segment_path(work_dir, i, export_id),
+                }
+                for export_id, rendition in zip(export_ids, renditions)
+            ],
+            watermark,
+            list(window)
+        )
+        for i, window in enumerate(windows)
+    ]
+    # Last in the header, so its result comes last in the join's arguments
+    header.append(encode_export_audio_task.s(
+        export_ids,
+        total,
+        input_path,
+        [
+            {
+                "output_path": SegmentedEncodeService.audio_path(work_dir, export_id),
+                "gain_db": rendition.get("gain_db"),
+            }
+            for export_id, rendition in zip(export_ids, renditions)
+        ]
+    ))
+    callback = join_export_segments_task.s(export_ids, work_dir).on_error(
+        fail_segmented_encode_task.s("export", export_ids, work_dir)
+    )
+    chord(header)(callback)
+
+    logger.info(f"Dispatched {len(windows)} segments for exports {', '.join(export_ids)}")
+
+
+@celery_app.task(name="encode_splice_segment")
+def encode_splice_segment_task(
+    splice_id: str,
+    total: int,
+    sources: List[Dict[str, Any]],
+    window: List[float],
+    layout: str,
+    resolution: str,
+    fps: int,
+    output_path: str
+) -> str:
+    """
+    Render the video of one window of a splice's timeline.
+    """
+    logger.info(f"Encoding splice {splice_id} segment {window[0]:.2f}-{window[1]:.2f}")
+
+    from app.services.segmented_encode import SegmentedEncodeService
+    from app.services.video_processor import VideoProcessorService
+    import asyncio
+
+    async def _encode():
+        await VideoProcessorService().render_from_sources(
+            sources=sources,
+            output_path=output_path,
+            layout=layout,
+            resolution=resolution,
+            fps=fps,
+            window=(window[0], window[1])
+        )
+        await SegmentedEncodeService.segment_done("splice", [splice_id], total)
+        return output_path
+
+    return asyncio.run(_encode())
+
+
+@celery_app.task(name="encode_splice_audio")
+def encode_splice_audio_task(
+    splice_id: str,
+    total: int,
+    sources: List[Dict[str, Any]],
+    layout: str,
+    output_path: str
+) -> str:
+    """
+    Mix and encode a splice's audio over its whole timeline.
+    """
+    logger.info(f"Encoding splice {splice_id} audio")
+
+    from app.services.segmented_encode import SegmentedEncodeService
+    from app.services.video_processor import VideoProcessorService
+    import asyncio
+
+    async def _encode():
+        await VideoProcessorService().render_audio_from_sources(
+            sources=sources,
+            output_path=output_path,
+            layout=layout
+        )
+        await SegmentedEncodeService.segment_done("splice", [splice_id], total)
+        return output_path
+
+    return asyncio.run(_encode())
+
+
+@celery_app.task(name="encode_export_segment")
+def encode_export_segment_task(
+    export_ids: List[str],
+    total: int,
+    input_path: str,
+    renditions: List[Dict[str, Any]],
+    watermark: Optional[str],
+    window: List[float]
+) -> List[str]:
+    """
+    Encode the video of one window of a splice for every export rendition.
+    """
+    logger.info(f"Encoding export segment {window[0]:.2f}-{window[1]:.2f} for {len(renditions)} renditions")
+
+    from app.services.segmented_encode import SegmentedEncodeService
+    from app.services.video_processor import VideoProcessorService
+    import asyncio
+
+    async def _encode():
+        paths = await VideoProcessorService().optimize_for_platforms(
+            input_path=input_path,
+            renditions=renditions,
+            watermark=watermark,
+            start_time=window[0],
+            end_time=window[1],
+            include_audio=False
+        )
+        await SegmentedEncodeService.segment_done("export", export_ids, total)
+        return paths
+
+    return asyncio.run(_encode())
+
+
+@celery_app.task(name="encode_export_audio")
+def encode_export_audio_task(
+    export_ids: List[str],
+    total: int,
+    input_path: str,
+    tracks: List[Dict[str, Any]]
+) -> List[str]:
+    """
+    Encode the whole audio track of every export rendition.
+    """
+    logger.info(f"Encoding export audio for {len(tracks)} renditions")
+
+    from app.services.segmented_encode import SegmentedEncodeService
+    from app.services.video_processor import VideoProcessorService
+    import asyncio
+
+    async def _encode():
+        paths = await VideoProcessorService().encode_platform_audio(input_path, tracks)
+        await SegmentedEncodeService.segment_done("export", export_ids, total)
+        return paths
+
+    return asyncio.run(_encode())
+
+
+@celery_app.task(name="join_splice_segments")
+def join_splice_segments_task(results: List[str], splice_id: str, work_dir: str):
+    """
+    Join a splice's encoded segments with its audio and finish the splice.
+    """
+    # Header results: one segment per window, then the audio track
+    *segment_paths, audio_path = results
+    logger.info(f"Joining {len(segment_paths)} segments for splice {splice_id}")
+
+    from app.core.database import AsyncSessionLocal
+    from app.services.segmented_encode import SegmentedEncodeService
+    from app.services.splice_generator import SpliceGeneratorService
+    import asyncio
+
+    async def _join():
+        async with AsyncSessionLocal() as db:
+            service = SpliceGeneratorService()
+            await service.complete_segmented_render(
+                db=db,
+                splice_id=splice_id,
+                segment_paths=segment_paths,
+                audio_path=audio_path
+            )
+
+    try:
+        asyncio.run(_join())
+    finally:
+        SegmentedEncodeService.cleanup(work_dir)
+
+
+@celery_app.task(name="join_export_segments")
+def join_export_segments_task(results: List[List[str]], export_ids: List[str], work_dir: str):
+    """
+    Join each export rendition's encoded segments with its audio and finish
+    the exports.
+    """
+    # Header results: per window one segment per rendition, then the audio tracks
+    *segment_paths, audio_paths = results
+    logger.info(f"Joining {len(segment_paths)} segments for exports {', '.join(export_ids)}")
+
+    from app.core.database import AsyncSessionLocal
+    from app.services.export_service import ExportService
+    from app.services.segmented_encode import SegmentedEncodeService
+    import asyncio
+
+    async def _join():
+        async with AsyncSessionLocal() as db:
+            service = ExportService()
+            # Header results are per window; regroup them per rendition
+            await service.complete_segmented_exports(
+                db=db,
+                export_ids=export_ids,
+                segment_paths=[list(paths) for paths in zip(*segment_paths)],
+                audio_paths=audio_paths
+            )
+
+    try:
+        asyncio.run(_join())
+    finally:
+        SegmentedEncodeService.cleanup(work_dir)
+
+
+@celery_app.task(name="fail_segmented_encode")
+def fail_segmented_encode_task(request, exc, traceback, kind: str, job_ids: List[str], work_dir: str):
+    """
+    Mark a distributed encode as failed when any segment task fails.
+    """
+    logger.error(f"Distributed {kind} encode failed for {', '.join(job_ids)}: {exc}")
+
+    from app.core.database import AsyncSessionLocal
+    from app.models.export import Export, ExportStatus
+    from app.models.splice import Splice, SpliceStatus
+    from app.services.segmented_encode import SegmentedEncodeService
+    from sqlalchemy import select
+    import asyncio
+
+    model, failed = (Splice, SpliceStatus.FAILED) if kind == "splice" else (Export, ExportStatus.FAILED)
+
+    async def _fail():
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(model).where(model.id.in_(job_ids)))
+            for row in result.scalars().all():
+                row.status = failed
+                row.processing_error = str(exc)
+            await db.commit()
+
+    try:
+        asyncio.run(_fail())
+    finally:
+        SegmentedEncodeService.cleanup(work_dir)
@@ -11,16 +11,26 @@ logger = logging.getLogger("clipsmart.tasks.video")
 @celery_app.task(name="process_video")
 def process_video_task(video_id: str):
     """
-    Process a video (extract metadata, generate thumbnail).
+    Process a video (create mezzanine and proxy, index keyframes, generate thumbnails).
     """
     logger.info(f"Processing video: {video_id}")
 
     # Import here to avoid circular dependencies
     from app.core.database import AsyncSessionLocal
     from app.services.video_processor import VideoProcessorService
-    from app.models.video import Video
+    from app.services.thumbnail_service import ThumbnailService
+    from app.services.audio_cache import AudioCache
+    from app.services.stream_packager import StreamPackager
+    from app.services.virtual_clips import VirtualClipService
+    from app.models.video import Video, VideoStatus
+    from app.models.clip import Clip
+    from app.core.config import get_settings
+    from app.core.exceptions import ProcessingError
     from sqlalchemy import select
     import asyncio
+    import os
+
+    settings = get_settings()
 
     async def _process():
         async with AsyncSessionLocal() as db:
@@ -36,20 +46,71 @@ def process_video_task(video_id: str):
             try:
                 processor = VideoProcessorService()
 
-                # Generate thumbnail
-                thumbnail_path = f"/tmp/clipsmart/thumbnails/{video_id}.jpg"
-                await processor.generate_thumbnail(
-                    video_path=video.file_path,
-                    output_path=thumbnail_path
+                # Normalize once at ingest so later steps never decode the raw upload
+                if settings.INGEST_RENDITIONS_ENABLED:
+                    base_path = os.path.splitext(video.file_path)[0]
+                    mezzanine_path, proxy_path = await processor.create_ingest_renditions(
+                        input_path=video.file_path,
+                        mezzanine_path=f"{base_path}.mezzanine.mp4",
+                        proxy_path=f"{base_path}.proxy.mp4"
+                    )
+                    video.mezzanine_path = mezzanine_path
+                    video.proxy_path = proxy_path
+                    await db.commit()
+
+                    # Adaptive preview: proxy and mezzanine share a GOP grid
+                    if settings.HLS_PACKAGING_ENABLED:
+                        packager = StreamPackager(processor)
+                        try:
+                            package = await packager.package(
+                                [proxy_path, mezzanine_path],
+                                StreamPackager.output_dir(video.file_path)
+                            )
+                            urls = StreamPackager.urls(package, "videos", video.id, "stream")
+                            video.hls_url = urls["hls"]
+                            video.dash_url = urls["dash"]
+                            await db.commit()
+                        except ProcessingError as e:
+                            logger.warning(f"Cannot package preview of video {video_id}: {e.detail}")
+
+                # Index keyframes once so later cuts and seeks skip re-probing
+                await processor.build_keyframe_index(video.edit_source_path)
+                if settings.VIRTUAL_CLIPS_ENABLED and video.proxy_path:
+                    # Virtual clip previews play from the proxy by default
+                    await processor.build_keyframe_index(video.proxy_path)
+
+                # Decode audio once for every numeric audio analysis
+                try:
+                    await AudioCache().build(video.edit_source_path)
+                except ProcessingError as e:
+                    # Silent videos have nothing to decode
+                    logger.warning(f"No decoded audio for video {video_id}: {e.detail}")
+
+                # Posters, scrub sprites and clip thumbnails in one pass over the proxy
+                result = await db.execute(
+                    select(Clip).where(Clip.video_id == video.id)
                 )
+                clips = result.scalars().all()
+                await ThumbnailService().generate_video_thumbnails(video, clips)
 
-                video.thumbnail_url = f"/static/thumbnails/{video_id}.jpg"
+                # Re-ingest may have changed whether clips can play in place
+                previews = VirtualClipService.available(video)
+                for clip in clips:
+                    clip.preview_url = VirtualClipService.preview_url(clip.id) if previews else None
+
+                # Ready for analysis
+                if video.status == VideoStatus.UPLOADING:
+                    video.status = VideoStatus.UPLOADED
                 await db.commit()
 
                 logger.info(f"Video processed: {video_id}")
 
             except Exception as e:
                 logger.error(f"Failed to process video {video_id}: {str(e)}")
+                if video.status == VideoStatus.UPLOADING:
+                    video.status = VideoStatus.FAILED
+                    video.processing_error = str(e)
+                    await db.commit()
                 raise
 
     asyncio.run(_process())
@@ -64,10 +125,16 @@ def analyze_video_task(video_id: str):
 
     from app.core.database import AsyncSessionLocal
     from app.services.minimax import MinimaxService
-    from app.services.video_processor import VideoProcessorService
+    from app.services.local_analysis import LocalAnalysisService
+    from app.services.audio_analyzer import clip_energy_score
+    from app.services.visual_features import clip_visual_features
+    from app.services.scene_detector import candidate_segments, snap_to_cuts
+    from app.services.thumbnail_service import ThumbnailService
+    from app.services.virtual_clips import VirtualClipService
     from app.models.video import Video, VideoStatus
     from app.models.clip import Clip
     from app.core.config import get_settings
+    from app.core.exceptions import ProcessingError
     from sqlalchemy import select
     from datetime import datetime
     import asyncio
@@ -91,28 +158,49 @@ def analyze_video_task(video_id: str):
 
                 minimax = MinimaxService()
 
+                # Local scene and audio analysis feed both the AI and clip scoring
+                local_analysis = LocalAnalysisService()
+                local = await local_analysis.analyze(video)
+
                 # Analyze with AI
                 analysis_result = await minimax.analyze_video(
-                    video_path=video.file_path
+                    video_path=video.analysis_source_path,
+                    audio_features=LocalAnalysisService.audio_summary(local['audio_analysis'])
                 )
 
+                # Local shot boundaries narrow what the AI has to look at
+                candidates = None
+                if local['scene_cuts'] is not None:
+                    candidates = candidate_segments(local['scene_cuts'], video.duration)
+
                 # Extract clips
                 clips_data = await minimax.extract_clips(
-                    video_path=video.file_path,
+                    video_path=video.analysis_source_path,
                     analysis_result=analysis_result,
                     sensitivity=settings.CLIP_SENSITIVITY_DEFAULT,
                     min_duration=settings.MIN_CLIP_DURATION,
                     max_duration=settings.MAX_CLIP_DURATION,
-                    max_clips=settings.MAX_CLIPS_PER_VIDEO
+                    max_clips=settings.MAX_CLIPS_PER_VIDEO,
+                    candidates=candidates
                 )
 
                 # Save clips
+                clips = []
+                refiner = local_analysis.boundary_refiner(video, local)
                 for clip_data in clips_data:
+                    # Land AI-proposed edges on real cuts, then trim dead air and black frames
+                    edges = snap_to_cuts(clip_data['start_time'], clip_data['end_time'], video.scene_cuts or [])
+                    edges = refiner.refine(edges['start_time'], edges['end_time'])
+                    if edges is None:
+                        continue
+                    visual = clip_visual_features(
+                        local['visual_features'], edges['start_time'], edges['end_time']
+                    )
                     clip = Clip(
                         video_id=video.id,
-                        start_time=clip_data['start_time'],
-                        end_time=clip_data['end_time'],
-                        duration=clip_data['end_time'] - clip_data['start_time'],
+                        start_time=edges['start_time'],
+                        end_time=edges['end_time'],
+                        duration=edges['end_time'] - edges['start_time'],
                         attention_score=clip_data.get('attention_score'),
                         engagement_score=clip_data.get('engagement_score'),
                         virality_score=clip_data.get('virality_score'),
@@ -120,19 +208,36 @@ def analyze_video_task(video_id: str):
                         entities=clip_data.get('entities'),
                         sentiment=clip_data.get('sentiment'),
                         caption=clip_data.get('caption'),
+                        audio_energy_score=clip_energy_score(
+                            local['audio_analysis'], edges['start_time'], edges['end_time']
+                        ),
+                        visual_score=(visual or {}).get('visual_score'),
+                        visual_features=visual,
                     )
                     db.add(clip)
+                    clips.append(clip)
+
+                # Clip IDs are needed for thumbnail names and preview URLs
+                await db.flush()
+                if VirtualClipService.available(video):
+                    for clip in clips:
+                        clip.preview_url = VirtualClipService.preview_url(clip.id)
+                try:
+                    await ThumbnailService().generate_clip_thumbnails(video, clips)
+                except ProcessingError as e:
+                    # Clips are usable without stills
+                    logger.warning(f"No clip thumbnails for video {video_id}: {e.detail}")
 
                 # Update video
                 video.analysis_result = analysis_result
                 video.transcript = analysis_result.get('transcript')
-                video.audio_analysis = analysis_result.get('audio_analysis')
+                video.audio_analysis = local['audio_analysis'] or analysis_result.get('audio_analysis')
                 video.status = VideoStatus.ANALYZED
                 video.analyzed_at = datetime.utcnow()
 
                 await db.commit()
 
-                logger.info(f"Video analyzed: {video_id}, extracted {len(clips_data)} clips")
+                logger.info(f"Video analyzed: {video_id}, extracted {len(clips)} clips")
 
             except Exception as e:
                 logger.error(f"Failed to analyze video {video_id}: {str(e)}")
@@ -0,0 +1,8 @@
+"""
+Test configuration: placeholder credentials so Settings can load without a .env.
+"""
+
+import os
+
+for name in ("MINIMAX_API_KEY", "SUPABASE_URL", "SUPABASE_SERVICE_ROLE_KEY", "SUPABASE_ANON_KEY"):
+    os.environ.setdefault(name, "test")
@@ -0,0 +1,68 @@
+"""
+Tests for clip boundary refinement.
+"""
+
+import numpy as np
+
+from app.services.boundary_refiner import BoundaryRefiner
+
+SAMPLE_RATE = 16000
+STEP = 0.1
+DURATION = 60.0
+
+
+def _frame_stats(black=(), frozen=()):
+    """Per-step frame flags; black/frozen are (start, end) second ranges."""
+    timestamps = np.arange(0, DURATION, STEP)
+    flags = {"black": np.zeros(len(timestamps), bool), "frozen": np.zeros(len(timestamps), bool)}
+    for name, spans in (("black", black), ("frozen", frozen)):
+        for start, end in spans:
+            flags[name][(timestamps >= start) & (timestamps < end)] = True
+    return {"timestamps": timestamps, **flags}
+
+
+def _audio(loud=()):
+    """Silence with a 200 Hz tone over the (start, end) second ranges in loud."""
+    t = np.arange(int(DURATION * SAMPLE_RATE)) / SAMPLE_RATE
+    samples = np.zeros(len(t), np.float32)
+    for start, end in loud:
+        span = (t >= start) & (t < end)
+        samples[span] = 0.3 * np.sin(2 * np.pi * 200 * t[span])
+    return samples
+
+
+def _refiner(frame_stats, samples):
+    return BoundaryRefiner(frame_stats=frame_stats, samples=samples, sample_rate=SAMPLE_RATE, step=STEP)
+
+
+def test_static_frame_with_speech_survives():
+    refiner = _refiner(_frame_stats(frozen=[(0, DURATION)]), _audio(loud=[(0, DURATION)]))
+
+    assert refiner.refine(10, 40) == {"start_time": 10, "end_time": 40}
+
+
+def test_silent_footage_with_motion_survives():
+    refiner = _refiner(_frame_stats(), _audio())
+
+    assert refiner.refine(10, 40) == {"start_time": 10, "end_time": 40}
+
+
+def test_trims_silent_black_edges():
+    refiner = _refiner(
+        _frame_stats(black=[(10, 12), (37, 40)]),
+        _audio(loud=[(12, 37)])
+    )
+
+    assert refiner.refine(10, 40) == {"start_time": 12.0, "end_time": 37.0}
+
+
+def test_drops_mostly_silent_frozen_clip():
+    refiner = _refiner(_frame_stats(frozen=[(10, 40)]), _audio(loud=[(10, 12)]))
+
+    assert refiner.refine(10, 40) is None
+
+
+def test_keeps_clip_without_audio():
+    refiner = _refiner(_frame_stats(black=[(0, DURATION)]), None)
+
+    assert refiner.refine(10, 40) == {"start_time": 10, "end_time": 40}
@@ -0,0 +1,153 @@
+"""
+Tests for the on-disk clip rendition cache.
+"""
+
+import os
+
+import pytest
+
+from app.core.config import get_settings
+from app.services import clip_cache
+from app.services.clip_cache import ClipCache
+
+settings = get_settings()
+
+PARAMS = {"audio": True, "smart_cut": True}
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CLIP_CACHE_ENABLED", True)
+    return ClipCache(cache_dir=str(tmp_path / "cache"), max_bytes=10_000)
+
+
+def _write(path, data):
+    path.write_bytes(data)
+    return str(path)
+
+
+def _entries(cache):
+    return sorted(
+        name
+        for _, _, files in os.walk(cache.cache_dir)
+        for name in files
+    )
+
+
+class TestKeys:
+    def test_same_content_gives_the_same_key(self, cache, tmp_path):
+        original = _write(tmp_path / "a.mp4", b"video" * 1000)
+        key = cache.key_for(original, 1.0, 5.0, PARAMS)
+
+        # A copy under another name with another mtime is the same source
+        copy = _write(tmp_path / "b.mp4", b"video" * 1000)
+        os.utime(copy, ns=(1, 1))
+
+        assert cache.key_for(copy, 1.0, 5.0, PARAMS) == key
+        assert cache.key_for(original, 1.0, 5.0, dict(reversed(list(PARAMS.items())))) == key
+
+    def test_touching_a_source_keeps_its_key(self, cache, tmp_path):
+        source = _write(tmp_path / "a.mp4", b"video" * 1000)
+        key = cache.key_for(source, 1.0, 5.0, PARAMS)
+
+        os.utime(source, ns=(10**18, 10**18))
+
+        assert cache.key_for(source, 1.0, 5.0, PARAMS) == key
+
+    def test_any_changed_byte_misses(self, cache, tmp_path):
+        data = bytearray(b"video" * 1_000_000)
+        source = _write(tmp_path / "a.mp4", bytes(data))
+        key = cache.key_for(source, 1.0, 5.0, PARAMS)
+
+        # Same size, one byte changed in the middle of the file
+        data[len(data) // 2 + 7] ^= 0xFF
+        _write(tmp_path / "a.mp4", bytes(data))
+        os.utime(source, ns=(2, 2))
+
+        assert cache.key_for(source, 1.0, 5.0, PARAMS) != key
+
+    def test_range_params_and_version_are_part_of_the_key(self, cache, tmp_path, monkeypatch):
+        source = _write(tmp_path / "a.mp4", b"video" * 1000)
+        key = cache.key_for(source, 1.0, 5.0, PARAMS)
+
+        assert cache.key_for(source, 1.0, 5.5, PARAMS) != key
+        assert cache.key_for(source, 1.0, 5.0, {**PARAMS, "audio": False}) != key
+
+        monkeypatch.setattr(clip_cache, "CLIP_ENCODE_VERSION", clip_cache.CLIP_ENCODE_VERSION + 1)
+        assert cache.key_for(source, 1.0, 5.0, PARAMS) != key
+
+    def test_source_is_read_once_per_version(self, cache, tmp_path, monkeypatch):
+        source = _write(tmp_path / "a.mp4", b"video" * 1000)
+        reads = []
+        real_open = open
+
+        def counting_open(path, *args, **kwargs):
+            if path == source:
+                reads.append(path)
+            return real_open(path, *args, **kwargs)
+
+        monkeypatch.setattr("builtins.open", counting_open)
+        for end in (5.0, 6.0, 7.0):
+            cache.key_for(source, 1.0, end, PARAMS)
+
+        assert len(reads) == 1
+
+
+class TestStore:
+    def test_store_then_fetch(self, cache, tmp_path):
+        rendered = _write(tmp_path / "clip.mp4", b"clip" * 100)
+        cache.store("ab" * 32, rendered)
+
+        output = tmp_path / "out.mp4"
+        assert cache.fetch("ab" * 32, str(output))
+        assert output.read_bytes() == b"clip" * 100
+        assert not cache.fetch("cd" * 32, str(tmp_path / "miss.mp4"))
+
+    def test_publish_is_atomic(self, cache, tmp_path, monkeypatch):
+        key = "ab" * 32
+        cache.store(key, _write(tmp_path / "old.mp4", b"old" * 100))
+
+        def failing_clone(src, dst):
+            with open(dst, "wb") as f:
+                f.write(b"partial")
+            raise OSError("disk full")
+
+        monkeypatch.setattr(ClipCache, "_clone", staticmethod(failing_clone))
+        cache.store(key, _write(tmp_path / "new.mp4", b"new" * 100))
+
+        # The failed write left neither a temp file nor a partial entry
+        assert _entries(cache) == [f"{key}.mp4"]
+        with open(cache._entry_path(key), "rb") as f:
+            assert f.read() == b"old" * 100
+
+    def test_fetched_copy_is_independent_of_the_entry(self, cache, tmp_path):
+        key = "ab" * 32
+        cache.store(key, _write(tmp_path / "clip.mp4", b"clip" * 100))
+        output = tmp_path / "out.mp4"
+        cache.fetch(key, str(output))
+
+        output.write_bytes(b"edited")
+
+        with open(cache._entry_path(key), "rb") as f:
+            assert f.read() == b"clip" * 100
+
+
+class TestEviction:
+    def test_least_recently_used_entries_go_first(self, cache, tmp_path):
+        keys = [f"{i:02d}" * 32 for i in range(3)]
+        for i, key in enumerate(keys):
+            cache.store(key, _write(tmp_path / f"{i}.mp4", bytes(3000)))
+            os.utime(cache._entry_path(key), (1000 + i, 1000 + i))
+
+        # Reading the oldest entry makes it the most recent
+        assert cache.fetch(keys[0], str(tmp_path / "out.mp4"))
+
+        cache.store("ff" * 32, _write(tmp_path / "new.mp4", bytes(3000)))
+
+        assert _entries(cache) == sorted(f"{key}.mp4" for key in (keys[0], keys[2], "ff" * 32))
+        total = sum(
+            os.path.getsize(os.path.join(root, name))
+            for root, _, files in os.walk(cache.cache_dir)
+            for name in files
+        )
+        assert total <= cache.max_bytes
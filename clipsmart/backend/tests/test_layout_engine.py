@@ -0,0 +1,79 @@
+"""
+Tests for multi-clip layout geometry and compositing.
+"""
+
+import shutil
+import subprocess
+
+import ffmpeg
+import pytest
+
+from app.core.config import get_settings
+from app.services.layout_engine import _overlaps, compose, compute_layout
+
+settings = get_settings()
+
+WIDTH, HEIGHT = 320, 240
+
+# Solid colours and their RGB values after a yuv420p round trip (within tolerance)
+COLORS = {"red": (255, 0, 0), "blue": (0, 0, 255), "lime": (0, 255, 0)}
+
+
+@pytest.mark.parametrize("count", [2, 3])
+def test_pip_geometry(count):
+    cells = compute_layout("pip", count, WIDTH, HEIGHT)
+
+    assert len(cells) == count
+    main, *insets = cells
+    assert (main.x, main.y, main.width, main.height) == (0, 0, WIDTH, HEIGHT)
+    for cell in insets:
+        assert cell.x >= 0 and cell.y >= 0
+        assert cell.x + cell.width <= WIDTH and cell.y + cell.height <= HEIGHT
+        assert cell.width % 2 == 0 and cell.height % 2 == 0
+        assert _overlaps(cell, main)
+    assert not any(_overlaps(a, b) for i, a in enumerate(insets) for b in insets[i + 1:])
+
+
+@pytest.mark.parametrize("layout", ["split_screen", "grid", "spotlight"])
+def test_tiled_layouts_do_not_overlap(layout):
+    cells = compute_layout(layout, 4, WIDTH, HEIGHT)
+    assert not any(_overlaps(a, b) for i, a in enumerate(cells) for b in cells[i + 1:])
+
+
+@pytest.mark.skipif(shutil.which(settings.FFMPPEG_PATH) is None, reason="FFmpeg not installed")
+def test_pip_insets_draw_over_the_main_clip():
+    names = list(COLORS)
+    videos = [
+        ffmpeg.input(f"color=c={name}:s=640x480:d=0.2", format="lavfi").video
+        for name in names
+    ]
+    stream = ffmpeg.output(
+        compose(videos, "pip", WIDTH, HEIGHT),
+        "pipe:",
+        format="rawvideo",
+        pix_fmt="rgb24",
+        frames=1
+    )
+    args = ffmpeg.compile(stream, cmd=settings.FFMPPEG_PATH)
+    # Insets cover the main clip, so they must not share its xstack
+    graph = args[args.index("-filter_complex") + 1]
+    assert "xstack" not in graph and graph.count("overlay") == len(names) - 1
+
+    frame = subprocess.run(
+        args + ["-v", "error"],
+        check=True,
+        capture_output=True
+    ).stdout
+    assert len(frame) == WIDTH * HEIGHT * 3
+
+    def pixel(x, y):
+        offset = (y * WIDTH + x) * 3
+        return tuple(frame[offset:offset + 3])
+
+    def close(actual, expected):
+        return all(abs(a - e) <= 24 for a, e in zip(actual, expected))
+
+    cells = compute_layout("pip", len(names), WIDTH, HEIGHT)
+    assert close(pixel(4, 4), COLORS[names[0]])
+    for name, cell in zip(names[1:], cells[1:]):
+        assert close(pixel(cell.x + cell.width // 2, cell.y + cell.height // 2), COLORS[name])
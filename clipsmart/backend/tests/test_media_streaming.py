@@ -0,0 +1,126 @@
+"""
+Tests for media byte ranges and signed media URL authorization.
+"""
+
+import asyncio
+from datetime import timedelta
+from email.utils import formatdate
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.core.exceptions import ValidationError
+from app.core.security import (
+    create_access_token,
+    create_media_token,
+    get_media_user,
+    media_scope,
+    sign_media_url,
+)
+from app.services.media_streaming import MediaStreamer, media_url, parse_range
+
+SIZE = 1000
+MTIME = 1_700_000_000.0
+ETAG = '"3e8-5f5e100"'
+
+
+class TestParseRange:
+    @pytest.mark.parametrize("header, span", [
+        ("bytes=0-99", (0, 99)),
+        ("bytes=100-", (100, 999)),
+        ("bytes=-100", (900, 999)),
+        ("bytes=-5000", (0, 999)),
+        ("bytes=900-5000", (900, 999)),
+        ("BYTES = 10 - 20", (10, 20)),
+        # Several ranges coalesce into the span covering them
+        ("bytes=0-9, 500-509", (0, 509)),
+        ("bytes=5000-6000, 10-20", (10, 20)),
+    ])
+    def test_spans(self, header, span):
+        assert parse_range(header, SIZE) == span
+
+    @pytest.mark.parametrize("header", [
+        "items=0-9",
+        "bytes=",
+        "bytes=-",
+        "bytes=abc-def",
+        "bytes=20-10",
+        "bytes=0-9,junk",
+    ])
+    def test_ignored_headers(self, header):
+        assert parse_range(header, SIZE) is None
+
+    @pytest.mark.parametrize("header", ["bytes=1000-", "bytes=2000-3000", "bytes=-0"])
+    def test_unsatisfiable(self, header):
+        with pytest.raises(ValidationError):
+            parse_range(header, SIZE)
+
+
+class TestRangeApplies:
+    def test_without_if_range(self):
+        assert MediaStreamer._range_applies(None, ETAG, MTIME)
+        assert MediaStreamer._range_applies("", ETAG, MTIME)
+
+    def test_matching_etag(self):
+        assert MediaStreamer._range_applies(ETAG, ETAG, MTIME)
+
+    def test_stale_or_weak_etag(self):
+        assert not MediaStreamer._range_applies('"other"', ETAG, MTIME)
+        # If-Range requires a strong match
+        assert not MediaStreamer._range_applies(f"W/{ETAG}", ETAG, MTIME)
+
+    def test_dates(self):
+        assert MediaStreamer._range_applies(formatdate(MTIME, usegmt=True), ETAG, MTIME)
+        assert MediaStreamer._range_applies(formatdate(MTIME + 60, usegmt=True), ETAG, MTIME)
+        assert not MediaStreamer._range_applies(formatdate(MTIME - 60, usegmt=True), ETAG, MTIME)
+        assert not MediaStreamer._range_applies("not a date", ETAG, MTIME)
+
+
+def _request(path):
+    return Request({"type": "http", "method": "GET", "path": path, "headers": [], "query_string": b""})
+
+
+def _authorize(path, token):
+    # Media tokens are checked without touching the database
+    return asyncio.run(get_media_user(_request(path), credentials=None, token=token, db=None))
+
+
+class TestMediaTokens:
+    def test_scope_covers_a_resource_and_its_files(self):
+        assert media_scope(media_url("videos", "v1")) == "videos/v1"
+        assert media_scope(media_url("videos", "v1", "thumbnails", "poster.jpg")) == "videos/v1"
+        assert media_scope(f"{media_url('clips', 'c1', 'playlist.m3u8')}?rendition=proxy") == "clips/c1"
+        assert media_scope(media_url("videos")) is None
+        assert media_scope("https://cdn.example.com/video.mp4") is None
+
+    def test_signed_url_authorizes_its_resource(self):
+        url = sign_media_url(media_url("videos", "v1"))
+        token = parse_qs(urlsplit(url).query)["token"][0]
+
+        assert _authorize(media_url("videos", "v1", "stream", "master.m3u8"), token) is None
+
+    def test_signing_leaves_other_urls_alone(self):
+        assert sign_media_url(None) is None
+        assert sign_media_url("https://cdn.example.com/video.mp4") == "https://cdn.example.com/video.mp4"
+        assert "&token=" in sign_media_url(f"{media_url('exports', 'e1')}?download=true")
+
+    @pytest.mark.parametrize("token", [
+        create_media_token("videos/v2"),
+        create_media_token("clips/v1"),
+        create_media_token("videos/v1", expires_delta=timedelta(seconds=-10)),
+        # Session tokens are not accepted in the query string
+        create_access_token({"sub": "user-1"}),
+        "garbage",
+        None,
+    ])
+    def test_rejected_tokens(self, token):
+        with pytest.raises(HTTPException) as e:
+            _authorize(media_url("videos", "v1"), token)
+
+        assert e.value.status_code == 401
+
+    def test_paths_outside_a_resource_are_rejected(self):
+        with pytest.raises(HTTPException):
+            _authorize(media_url("videos"), create_media_token("videos/"))
@@ -0,0 +1,84 @@
+"""
+Tests for turning detected shot cuts into clip candidates and snapped edges.
+"""
+
+import pytest
+
+from app.services.scene_detector import candidate_segments, snap_to_cuts
+
+
+def _cuts(*times, confidence=0.9):
+    return [{"time": t, "score": 1.0, "confidence": confidence} for t in times]
+
+
+def _spans(candidates):
+    return [(c["start_time"], c["end_time"]) for c in candidates]
+
+
+class TestCandidateSegments:
+    def test_one_candidate_per_shot(self):
+        candidates = candidate_segments(_cuts(20.0, 45.0), 60.0, min_duration=10, max_duration=30)
+
+        assert _spans(candidates) == [(0.0, 20.0), (20.0, 45.0), (45.0, 60.0)]
+        assert [c["cut_confidence"] for c in candidates] == [1.0, 0.9, 0.9]
+
+    def test_short_shots_merge_into_the_following_ones(self):
+        candidates = candidate_segments(_cuts(3.0, 6.0, 25.0), 50.0, min_duration=10, max_duration=30)
+
+        assert _spans(candidates) == [(0.0, 25.0), (25.0, 50.0)]
+
+    def test_short_tail_folds_into_the_last_shot(self):
+        candidates = candidate_segments(_cuts(20.0), 24.0, min_duration=10, max_duration=30)
+
+        assert _spans(candidates) == [(0.0, 24.0)]
+
+    def test_video_shorter_than_min_duration_is_one_candidate(self):
+        assert _spans(candidate_segments([], 4.0, min_duration=10, max_duration=30)) == [(0.0, 4.0)]
+
+    def test_long_shots_split_evenly_within_max_duration(self):
+        candidates = candidate_segments(_cuts(10.0), 100.0, min_duration=5, max_duration=40)
+
+        assert _spans(candidates) == [(0.0, 10.0), (10.0, 40.0), (40.0, 70.0), (70.0, 100.0)]
+        # Only the piece starting on the cut inherits its confidence
+        assert [c["cut_confidence"] for c in candidates[1:]] == [0.9, 0.0, 0.0]
+
+    def test_cuts_outside_the_video_are_ignored(self):
+        candidates = candidate_segments(_cuts(0.0, 30.0, 60.0, 75.0), 60.0, min_duration=10, max_duration=60)
+
+        assert _spans(candidates) == [(0.0, 30.0), (30.0, 60.0)]
+
+    @pytest.mark.parametrize("duration", [37.3, 61.0, 239.9])
+    def test_candidates_tile_the_video(self, duration):
+        candidates = candidate_segments(_cuts(4.2, 11.0, 33.3, 34.0, 90.5), duration, min_duration=5, max_duration=30)
+
+        assert candidates[0]["start_time"] == 0.0
+        assert candidates[-1]["end_time"] == pytest.approx(duration, abs=1e-3)
+        for previous, following in zip(candidates, candidates[1:]):
+            assert following["start_time"] == pytest.approx(previous["end_time"], abs=1e-3)
+        assert all(c["end_time"] - c["start_time"] <= 30 + 1e-3 for c in candidates)
+
+
+class TestSnapToCuts:
+    def test_edges_move_to_the_nearest_cut_within_tolerance(self):
+        snapped = snap_to_cuts(10.4, 29.7, _cuts(5.0, 10.0, 11.0, 30.0), tolerance=1.0, min_duration=5)
+
+        assert snapped == {"start_time": 10.0, "end_time": 30.0}
+
+    def test_edges_without_a_close_cut_stay(self):
+        snapped = snap_to_cuts(12.5, 25.0, _cuts(10.0, 30.0), tolerance=1.0, min_duration=5)
+
+        assert snapped == {"start_time": 12.5, "end_time": 25.0}
+
+    def test_no_cuts(self):
+        assert snap_to_cuts(1.0, 9.0, [], tolerance=1.0, min_duration=5) == {"start_time": 1.0, "end_time": 9.0}
+
+    def test_snapping_never_shrinks_below_min_duration(self):
+        # Both snaps would leave 4 s; the start snap alone keeps 5.5 s
+        snapped = snap_to_cuts(10.5, 15.0, _cuts(9.5, 14.0), tolerance=1.0, min_duration=5)
+
+        assert snapped == {"start_time": 9.5, "end_time": 15.0}
+
+    def test_edges_stay_when_any_snap_is_too_short(self):
+        snapped = snap_to_cuts(10.0, 14.0, _cuts(10.8, 13.2), tolerance=1.0, min_duration=4)
+
+        assert snapped == {"start_time": 10.0, "end_time": 14.0}
@@ -0,0 +1,91 @@
+"""
+Tests for segment-parallel encoding: video segments joined with one audio track.
+"""
+
+import asyncio
+import shutil
+import subprocess
+from fractions import Fraction
+
+import pytest
+
+from app.core.config import get_settings
+from app.services.segmented_encode import SegmentedEncodeService
+
+settings = get_settings()
+
+pytestmark = pytest.mark.skipif(shutil.which(settings.FFMPPEG_PATH) is None, reason="FFmpeg not installed")
+
+
+def _source(path, seconds, frequency):
+    subprocess.run(
+        [
+            settings.FFMPPEG_PATH, "-v", "error", "-y",
+            "-f", "lavfi", "-i", f"testsrc=size=320x240:rate=25:duration={seconds}",
+            "-f", "lavfi", "-i", f"sine=frequency={frequency}:sample_rate=48000:duration={seconds}",
+            "-c:v", "libx264", "-g", "25", "-c:a", "aac", "-shortest", str(path),
+        ],
+        check=True
+    )
+    return str(path)
+
+
+def _packets(path, stream):
+    """(pts, duration) in seconds of every packet of one stream, from framecrc."""
+    output = subprocess.run(
+        [settings.FFMPPEG_PATH, "-v", "error", "-i", str(path), "-map", f"0:{stream}", "-c", "copy", "-f", "framecrc", "-"],
+        check=True,
+        capture_output=True,
+        text=True
+    ).stdout
+
+    time_base = None
+    packets = []
+    for line in output.splitlines():
+        if line.startswith("#tb 0:"):
+            time_base = Fraction(line.split(":", 1)[1].strip())
+        elif line and not line.startswith("#"):
+            _, _, pts, duration, *_ = (field.strip() for field in line.split(","))
+            packets.append((int(pts) * time_base, int(duration) * time_base))
+    return packets
+
+
+def test_joined_splice_has_continuous_audio(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    sources = [
+        {"file_path": _source(tmp_path / "a.mp4", 3, 440), "start_time": 0.0, "end_time": 3.0, "gain_db": -2.0},
+        {"file_path": _source(tmp_path / "b.mp4", 5, 660), "start_time": 0.5, "end_time": 5.0},
+    ]
+    # Window edges fall inside the shorter clip, at its end, and after it
+    windows = [(0.0, 2.0), (2.0, 3.0), (3.0, 4.5)]
+
+    service = SegmentedEncodeService()
+
+    async def render():
+        segments = []
+        for i, window in enumerate(windows):
+            segments.append(await service.video_processor.render_from_sources(
+                sources,
+                SegmentedEncodeService.segment_path(str(tmp_path), i),
+                resolution="320x480",
+                fps=25,
+                window=window
+            ))
+        audio_path = await service.video_processor.render_audio_from_sources(
+            sources, SegmentedEncodeService.audio_path(str(tmp_path))
+        )
+        return await service.join(segments, audio_path, str(tmp_path / "joined.mp4"))
+
+    joined = asyncio.run(render())
+
+    audio = _packets(joined, "a")
+    assert all(
+        next_pts == pts + duration
+        for (pts, duration), (next_pts, _) in zip(audio, audio[1:])
+    )
+
+    audio_end = float(audio[-1][0] + audio[-1][1])
+    video = _packets(joined, "v")
+    video_end = float(max(pts + duration for pts, duration in video))
+    assert audio_end == pytest.approx(4.5, abs=0.05)
+    assert video_end == pytest.approx(4.5, abs=0.05)
@@ -0,0 +1,109 @@
+"""
+Tests for smart-cut clip extraction across re-encoded/copied GOP seams.
+"""
+
+import asyncio
+import shutil
+import subprocess
+from fractions import Fraction
+
+import pytest
+
+from app.core.config import get_settings
+from app.services.video_processor import SMART_CUT_SEAM_FIELDS, VideoProcessorService
+
+settings = get_settings()
+
+pytestmark = pytest.mark.skipif(
+    shutil.which(settings.FFMPPEG_PATH) is None or shutil.which(settings.FFPROBE_PATH) is None,
+    reason="FFmpeg/FFprobe not installed"
+)
+
+
+def _source(path):
+    """6 s at 25 fps with a keyframe every second and non-default stream parameters."""
+    subprocess.run(
+        [
+            settings.FFMPPEG_PATH, "-v", "error", "-y",
+            "-f", "lavfi", "-i", "testsrc=size=320x240:rate=25:duration=6",
+            "-f", "lavfi", "-i", "sine=frequency=440:sample_rate=48000:duration=6",
+            "-vf", "setsar=4/3", "-pix_fmt", "yuv420p",
+            "-c:v", "libx264", "-profile:v", "main", "-level", "3.1", "-coder", "cavlc",
+            "-x264-params", "ref=3:keyint=25:min-keyint=25:scenecut=0",
+            "-color_primaries", "bt709", "-color_trc", "bt709", "-colorspace", "bt709",
+            "-c:a", "aac", "-shortest", str(path),
+        ],
+        check=True
+    )
+    return str(path)
+
+
+def _packets(path, stream):
+    """(pts, duration) in seconds of every packet of one stream, from framecrc."""
+    output = subprocess.run(
+        [settings.FFMPPEG_PATH, "-v", "error", "-i", str(path), "-map", f"0:{stream}", "-c", "copy", "-f", "framecrc", "-"],
+        check=True,
+        capture_output=True,
+        text=True
+    ).stdout
+
+    time_base = None
+    packets = []
+    for line in output.splitlines():
+        if line.startswith("#tb 0:"):
+            time_base = Fraction(line.split(":", 1)[1].strip())
+        elif line and not line.startswith("#"):
+            _, _, pts, duration, *_ = (field.strip() for field in line.split(","))
+            packets.append((int(pts) * time_base, int(duration) * time_base))
+    return packets
+
+
+def test_clip_crossing_both_seams(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    source = _source(tmp_path / "source.mp4")
+    output = str(tmp_path / "clip.mp4")
+    processor = VideoProcessorService()
+
+    async def cut():
+        # Re-encoded head 0.5-1.0, copied GOPs 1.0-4.0, re-encoded tail 4.0-4.6
+        written = await processor._smart_cut_clip(source, output, 0.5, 4.6, include_audio=True)
+        return written, await processor._h264_headers(source), await processor._h264_headers(output)
+
+    written, source_headers, output_headers = asyncio.run(cut())
+
+    assert written
+    assert {field: output_headers.get(field) for field in SMART_CUT_SEAM_FIELDS} == {
+        field: source_headers.get(field) for field in SMART_CUT_SEAM_FIELDS
+    }
+
+    decode = subprocess.run(
+        [settings.FFMPPEG_PATH, "-v", "error", "-i", output, "-map", "0:v", "-f", "framecrc", "-"],
+        capture_output=True,
+        text=True
+    )
+    assert decode.returncode == 0
+    assert decode.stderr == ""
+    frames = [line for line in decode.stdout.splitlines() if line and not line.startswith("#")]
+    assert abs(len(frames) - 4.1 * 25) <= 2
+
+
+def test_clip_audio_is_continuous_across_seams(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    source = _source(tmp_path / "source.mp4")
+    output = str(tmp_path / "clip.mp4")
+    processor = VideoProcessorService()
+
+    written = asyncio.run(processor._smart_cut_clip(source, output, 0.5, 4.6, include_audio=True))
+    assert written
+
+    audio = _packets(output, "a")
+    assert all(
+        next_pts == pts + duration
+        for (pts, duration), (next_pts, _) in zip(audio, audio[1:])
+    )
+
+    audio_end = float(audio[-1][0] + audio[-1][1])
+    video = _packets(output, "v")
+    video_end = float(max(pts + duration for pts, duration in video))
+    assert audio_end == pytest.approx(4.1, abs=0.05)
+    assert video_end == pytest.approx(4.1, abs=0.05)